@@ -0,0 +1,63 @@
+"""
+Availability Engine Benchmark
+Event ingest and free-slot queries at thousands of calendars
+
+Usage:
+    python benchmarks/bench_availability.py [calendars] [events_per_day] [days]
+"""
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from availability import AvailabilityEngine  # noqa: E402
+
+
+def generate_events(rng, day: date, count: int):
+    """Random 15-120 minute meetings between 8:00 and 18:00"""
+    for _ in range(count):
+        start = datetime.combine(day, datetime.min.time()) + timedelta(
+            minutes=rng.randrange(8 * 60, 18 * 60, 5)
+        )
+        yield start, start + timedelta(minutes=rng.choice((15, 30, 30, 45, 60, 90, 120)))
+
+
+def main():
+    calendars = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    events_per_day = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    days = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    rng = random.Random(42)
+    engine = AvailabilityEngine(resolution_minutes=5)
+    first_day = date(2026, 1, 5)
+    day_list = [first_day + timedelta(days=i) for i in range(days)]
+    resource_ids = [f"user-{i}" for i in range(calendars)]
+
+    start = time.perf_counter()
+    total_events = 0
+    for resource_id in resource_ids:
+        for day in day_list:
+            engine.add_busy_many(resource_id, generate_events(rng, day, events_per_day))
+            total_events += events_per_day
+    elapsed = time.perf_counter() - start
+    print(f"ingest: {total_events:,} events for {calendars:,} calendars "
+          f"in {elapsed:.2f}s ({total_events / elapsed:,.0f} events/s)")
+
+    for attendees in (2, 10, 50, 500):
+        queries = max(200, 20000 // attendees)
+        groups = [rng.sample(resource_ids, attendees) for _ in range(64)]
+        found = 0
+        start = time.perf_counter()
+        for i in range(queries):
+            slots = engine.find_slots(groups[i % len(groups)], day_list[i % days], 30, 15)
+            found += len(slots)
+        elapsed = time.perf_counter() - start
+        print(f"find_slots: {attendees:>4} attendees  {queries / elapsed:>10,.0f} queries/s  "
+              f"({elapsed * 1e6 / queries:,.1f} µs/query, avg {found / queries:.1f} slots)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Widget Compression Benchmark
+Wire bytes and CPU per message with and without the preset dictionary
+
+Replays the bench_widget_delta click flow (full renders and widget_patch
+deltas) and a full-render-only flow through FrameCompressor at several
+thresholds and levels. The dictionary is built from a default-context
+render, as the server does at start-up.
+
+Usage:
+    python benchmarks/bench_compression.py
+"""
+import os
+import sys
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from compression import FrameCompressor, PresetDictionary, build_dictionary, decode_frame  # noqa: E402
+from json_patch import WidgetDeltaEncoder  # noqa: E402
+from widget_populator import WidgetPopulator  # noqa: E402
+from bench_widget_render import load_schema  # noqa: E402
+from bench_widget_delta import click_flow  # noqa: E402
+
+
+def flows(populator: WidgetPopulator):
+    schedule = load_schema("schedule_meeting")
+    dates = [d["value"] for d in populator._get_next_dates(5)]
+
+    delta_encoder = WidgetDeltaEncoder()
+    deltas, fulls = [], []
+    for context in click_flow(dates):
+        rendered = populator.render_schedule_meeting_widget(schedule, context)
+        deltas.append(delta_encoder.encode("bench-session", rendered.widget, rendered.payload))
+        fulls.append(WidgetDeltaEncoder().encode("bench-session", rendered.widget, rendered.payload))
+    return {"deltas": deltas, "full renders": fulls}
+
+
+def dictionary_for(populator: WidgetPopulator) -> PresetDictionary:
+    context = {"timezone": "Eastern Time (ET)", "timezone_abbr": "ET"}
+    samples = []
+    for name, render in (
+        ("timezone_selector", populator.render_timezone_selector_widget),
+        ("schedule_meeting", populator.render_schedule_meeting_widget),
+    ):
+        rendered = render(load_schema(name), context)
+        samples.append(WidgetDeltaEncoder().encode("", rendered.widget, rendered.payload).encode("utf-8"))
+    return PresetDictionary(build_dictionary(samples))
+
+
+def plain_deflate(messages, level: int) -> int:
+    """permessage-deflate without context takeover, for comparison"""
+    total = 0
+    for message in messages:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        total += len(compressor.compress(message.encode("utf-8")) + compressor.flush())
+    return total
+
+
+def main():
+    populator = WidgetPopulator()
+    dictionary = dictionary_for(populator)
+    print(f"dictionary: {len(dictionary.data)} bytes (id {dictionary.id:08x})\n")
+
+    for flow_name, messages in flows(populator).items():
+        raw = sum(len(m.encode("utf-8")) for m in messages)
+        print(f"{flow_name}: {len(messages)} messages, {raw / len(messages):,.0f} bytes avg raw")
+        print(f"  plain deflate (level 6):     {raw / plain_deflate(messages, 6):.2f}x")
+
+        for threshold in (0, 64, 256, 1024):
+            for level in (1, 6, 9):
+                compressor = FrameCompressor(threshold=threshold, level=level)
+                compressor.set_dictionary(dictionary)
+                for _ in range(200):
+                    for message in messages:
+                        frame = compressor.encode(message)
+                        if isinstance(frame, bytes):
+                            assert decode_frame(frame, dictionary) == message
+                stats = compressor.stats()
+                print(
+                    f"  dict threshold={threshold:<5} level={level}: {stats['ratio']:.2f}x  "
+                    f"{stats['wire_bytes'] / stats['messages']:>6,.0f} bytes/msg  "
+                    f"{stats['compressed'] / stats['messages']:>4.0%} compressed  "
+                    f"{stats['us_per_compressed']:>6.1f} µs CPU each"
+                )
+        print()
+
+
+if __name__ == "__main__":
+    main()
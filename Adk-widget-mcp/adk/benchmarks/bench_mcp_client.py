@@ -0,0 +1,74 @@
+"""
+MCP Client Benchmark
+Tool calls per second through the pooled MCP client
+
+Usage:
+    python benchmarks/bench_mcp_client.py [--transport stdio|http] [--pool 1,2,4]
+                                          [--concurrency 32] [--seconds 5]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mcp_client import MCPClient  # noqa: E402
+
+
+async def run(transport: str, pool_size: int, concurrency: int, seconds: float, tool: str, url: str):
+    client = MCPClient(
+        transport=transport,
+        pool_size=pool_size,
+        server_url=url,
+        health_check_interval=0
+    )
+    await client.start()
+
+    calls = 0
+    errors = 0
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async def worker():
+        nonlocal calls, errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            result = await client.call_tool(tool, {})
+            latencies.append(time.perf_counter() - start)
+            if result.get("success"):
+                calls += 1
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0
+    print(
+        f"pool={pool_size:<3} concurrency={concurrency:<4} "
+        f"{calls / elapsed:>10,.0f} calls/s  p50={p50:.2f}ms  p99={p99:.2f}ms  errors={errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transport", default="stdio", choices=["stdio", "http"])
+    parser.add_argument("--url", default="http://localhost:8001/mcp")
+    parser.add_argument("--pool", default="1,2,4")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--tool", default="get_schedule_meeting_widget")
+    args = parser.parse_args()
+
+    for pool_size in (int(p) for p in args.pool.split(",")):
+        asyncio.run(run(args.transport, pool_size, args.concurrency, args.seconds, args.tool, args.url))
+
+
+if __name__ == "__main__":
+    main()
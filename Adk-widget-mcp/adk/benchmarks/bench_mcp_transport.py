@@ -0,0 +1,107 @@
+"""
+MCP Transport Benchmark
+Per-call latency of the widget tools in-process against over stdio
+
+Three paths to the same tool:
+- direct: the tool function called as plain Python (no protocol)
+- memory: full MCP JSON-RPC over in-memory streams, same process
+- stdio: MCPClient against a spawned server (what the agent uses)
+
+Calls are sequential, so the numbers are per-call latency, not throughput
+(see bench_mcp_client.py for that).
+
+Usage:
+    python benchmarks/bench_mcp_transport.py [--calls 500] [--tool get_schedule_meeting_widget]
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mcp_client import MCPClient  # noqa: E402
+
+MCP_SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "mcp-server")
+
+
+def load_server():
+    """Import mcp-server/main.py under its own name (adk has a main.py too)"""
+    sys.path.insert(0, MCP_SERVER_DIR)
+    spec = importlib.util.spec_from_file_location("widget_mcp_server", os.path.join(MCP_SERVER_DIR, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def summarize(latencies) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "calls_per_s": round(len(latencies) / sum(latencies)),
+        "p50_us": round(latencies[len(latencies) // 2] * 1e6, 1),
+        "p99_us": round(latencies[int(len(latencies) * 0.99) - 1] * 1e6, 1)
+    }
+
+
+async def timed(call, calls: int) -> list:
+    await call()
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run_async(calls: int, tool: str) -> dict:
+    from mcp.shared.memory import create_connected_server_and_client_session
+
+    server = load_server()
+    # The server logs every request at INFO; over stdio that cost lands in another process
+    logging.getLogger("mcp").setLevel(logging.WARNING)
+    results = {}
+
+    # fastmcp 2.x's @mcp.tool() wraps the function in a FunctionTool
+    func = getattr(server, tool).fn
+
+    async def direct():
+        func()
+
+    results["direct"] = summarize(await timed(direct, calls))
+
+    async with create_connected_server_and_client_session(server.mcp._mcp_server) as session:
+        async def memory():
+            await session.call_tool(tool, {})
+
+        results["memory"] = summarize(await timed(memory, calls))
+
+    client = MCPClient(transport="stdio", pool_size=1, health_check_interval=0)
+    await client.start()
+    try:
+        async def stdio():
+            await client.call_tool(tool, {})
+
+        results["stdio"] = summarize(await timed(stdio, calls))
+    finally:
+        await client.close()
+    return results
+
+
+def run(calls: int = 500, tool: str = "get_schedule_meeting_widget") -> dict:
+    return asyncio.run(run_async(calls, tool))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--tool", default="get_schedule_meeting_widget")
+    args = parser.parse_args()
+    print(json.dumps(run(args.calls, args.tool), indent=2))
+
+
+if __name__ == "__main__":
+    main()
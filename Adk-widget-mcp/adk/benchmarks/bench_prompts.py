@@ -0,0 +1,210 @@
+"""
+Prompt Size Benchmark
+Replays recorded (or synthetic) agent calls through every instruction variant
+
+For each variant this reports tokens per call against the original
+prompt (full instruction plus pretty-printed session), checks that the
+compact context decodes back to the exact session, and applies an
+optional token budget. With --model-url each prompt is also sent to a
+Gemini-compatible endpoint (e.g. mock-llm/) and the tool it calls is
+compared with the one the action needs.
+
+Record real traffic with PROMPT_RECORD_FILE=data/prompt_calls.jsonl.
+
+Usage:
+    python benchmarks/bench_prompts.py [--recording data/prompt_calls.jsonl] [--sessions 200]
+                                       [--budget 600] [--model-url http://127.0.0.1:8090]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from prompt_builder import (  # noqa: E402
+    INSTRUCTION_VARIANTS, SYSTEM_INSTRUCTION, PromptBudgetError, PromptBuilder, count_tokens
+)
+from session_manager import DEFAULT_CONTEXT  # noqa: E402
+
+TOOL_FOR_ACTION = {
+    "connect": "get_schedule_meeting_widget",
+    "select_date": "get_schedule_meeting_widget",
+    "select_time": "get_schedule_meeting_widget",
+    "change_timezone": "get_timezone_selector_widget",
+    "confirm_timezone": "get_schedule_meeting_widget",
+    "cancel_timezone": "get_schedule_meeting_widget",
+    "refresh": "get_schedule_meeting_widget",
+}
+
+DATES = [("MON Sep 22", "2025-09-22"), ("TUE Sep 23", "2025-09-23"), ("WED Sep 24", "2025-09-24")]
+TIMES = [("9:00 AM", "09:00"), ("1:45 PM", "13:45"), ("4:30 PM", "16:30")]
+ZONES = [("Pacific Time (PT)", "PT"), ("Central Time (CT)", "CT"), ("Mountain Time (MT)", "MT")]
+
+
+def legacy_message(action: str, context: dict, data: dict) -> str:
+    """The per-call message as it was built before PromptBuilder"""
+    context_str = json.dumps(context, indent=2)
+    messages = {
+        "connect": f"User connected and wants to schedule a meeting.\nSession: {context_str}\n\nPlease fetch the schedule meeting widget.",
+        "select_date": f"User selected date: {data.get('label') if data else 'unknown'}.\nSession: {context_str}\n\nRefresh the schedule widget.",
+        "select_time": f"User selected time: {data.get('label') if data else 'unknown'}.\nSession: {context_str}\n\nRefresh the schedule widget.",
+        "change_timezone": f"User wants to change timezone (FOLLOW-UP ACTION).\nSession: {context_str}\n\nShow timezone selector. PRESERVE date/time selections!",
+        "confirm_timezone": f"User confirmed new timezone: {data.get('timezone') if data else 'unknown'}.\nSession: {context_str}\n\nShow schedule widget. RESTORE previous selections!",
+        "cancel_timezone": f"User cancelled timezone change.\nSession: {context_str}\n\nShow schedule widget.",
+        "refresh": f"The selected time slot was booked by someone else and has been cleared.\nSession: {context_str}\n\nRefresh the schedule widget.",
+    }
+    return messages.get(action, f"Action: {action}\nSession: {context_str}")
+
+
+def synthetic_calls(sessions: int, seed: int):
+    """Click flows applying the same context updates as main.py"""
+    rng = random.Random(seed)
+    calls = []
+    for _ in range(sessions):
+        context = dict(DEFAULT_CONTEXT)
+        calls.append(("connect", dict(context), {}))
+        for _ in range(rng.randint(2, 8)):
+            action = rng.choice(["select_date", "select_time", "change_timezone", "confirm_timezone", "cancel_timezone"])
+            data = {}
+            if action == "select_date":
+                label, value = rng.choice(DATES)
+                data = {"date": value, "label": label}
+                context.update(selected_date=label, selected_date_value=value)
+            elif action == "select_time":
+                label, value = rng.choice(TIMES)
+                data = {"time": value, "label": f"{label} {context['timezone_abbr']}"}
+                context.update(selected_time=data["label"], selected_time_value=value)
+            elif action == "change_timezone":
+                context["current_action"] = "selecting_timezone"
+            elif action == "confirm_timezone":
+                label, abbr = rng.choice(ZONES)
+                data = {"timezone": abbr}
+                context.update(timezone=label, timezone_abbr=abbr, current_action=None)
+                if context["selected_time"]:
+                    context["selected_time"] = context["selected_time"].rsplit(" ", 1)[0] + f" {abbr}"
+            calls.append((action, dict(context), data))
+    return calls
+
+
+def recorded_calls(path: str):
+    calls = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                calls.append((record["action"], record["context"], record.get("data") or {}))
+    return calls
+
+
+def decodes_losslessly(text: str, context: dict) -> bool:
+    """The Session line merged onto a new session gives back ``context``"""
+    for line in text.splitlines():
+        if line.startswith("Session: "):
+            return {**DEFAULT_CONTEXT, **json.loads(line[len("Session: "):])} == {**DEFAULT_CONTEXT, **context}
+    return False
+
+
+class ModelCheck:
+    """Sends prompts to a Gemini-compatible endpoint and reads back the tool it calls"""
+
+    def __init__(self, url: str, model: str):
+        from google import genai
+        from google.genai import types
+
+        self.types = types
+        self.model = model
+        self.client = genai.Client(
+            api_key=os.getenv("GOOGLE_API_KEY", "mock-key"),
+            http_options={"base_url": url}
+        )
+        self.tools = [types.Tool(function_declarations=[
+            types.FunctionDeclaration(name=name, description=name.replace("_", " "))
+            for name in ("get_schedule_meeting_widget", "get_timezone_selector_widget", "list_available_widgets")
+        ])]
+
+    def tool_called(self, instruction: str, text: str):
+        response = self.client.models.generate_content(
+            model=self.model,
+            contents=text,
+            config=self.types.GenerateContentConfig(
+                system_instruction=instruction,
+                tools=self.tools,
+                automatic_function_calling=self.types.AutomaticFunctionCallingConfig(disable=True)
+            )
+        )
+        calls = response.function_calls or []
+        return calls[0].name if calls else None
+
+
+def summarize(tokens):
+    tokens = sorted(tokens)
+    return {
+        "avg": round(statistics.mean(tokens), 1),
+        "p50": tokens[len(tokens) // 2],
+        "max": tokens[-1],
+        "total": sum(tokens)
+    }
+
+
+def run(calls, budget, checker):
+    instruction_tokens = count_tokens(SYSTEM_INSTRUCTION)
+    legacy = [instruction_tokens + count_tokens(legacy_message(a, c, d)) for a, c, d in calls]
+    results = {
+        "calls": len(calls),
+        "legacy": {"tokens_per_call": summarize(legacy)}
+    }
+
+    for variant in INSTRUCTION_VARIANTS:
+        builder = PromptBuilder(variant=variant, token_budget=budget)
+        tokens, lossless, correct, checked = [], 0, 0, 0
+        for action, context, data in calls:
+            tool_name = TOOL_FOR_ACTION.get(action)
+            try:
+                prompt = builder.build(action, context, data, tool_name)
+            except PromptBudgetError:
+                continue
+            tokens.append(prompt.total_tokens)
+            if not prompt.trimmed:
+                lossless += decodes_losslessly(prompt.text, context)
+            if checker is not None and tool_name:
+                checked += 1
+                correct += checker.tool_called(prompt.instruction, prompt.text) == tool_name
+
+        result = {
+            "instruction_tokens": builder.instruction_tokens,
+            "tokens_per_call": summarize(tokens) if tokens else None,
+            "reduction_vs_legacy": round(1 - sum(tokens) / sum(legacy), 3) if tokens else None,
+            "context_lossless": round(lossless / (len(tokens) - builder.trimmed), 3) if len(tokens) > builder.trimmed else None,
+            "trimmed": builder.trimmed,
+            "over_budget": builder.over_budget
+        }
+        if checker is not None:
+            result["tool_accuracy"] = round(correct / checked, 3) if checked else None
+        results[variant] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recording", action="append", help="PROMPT_RECORD_FILE output (repeatable)")
+    parser.add_argument("--sessions", type=int, default=200, help="synthetic sessions when no recording is given")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--budget", type=int, default=None, help="token budget per call")
+    parser.add_argument("--model-url", default=None, help="Gemini-compatible endpoint for the tool-choice check")
+    parser.add_argument("--model", default="gemini-2.0-flash-exp")
+    args = parser.parse_args()
+
+    if args.recording:
+        calls = [call for path in args.recording for call in recorded_calls(path)]
+    else:
+        calls = synthetic_calls(args.sessions, args.seed)
+    checker = ModelCheck(args.model_url, args.model) if args.model_url else None
+
+    print(json.dumps(run(calls, args.budget, checker), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Reservation Store Contention Benchmark
+Many sessions racing to hold and book a small set of popular slots
+
+Usage:
+    python benchmarks/bench_reservations.py [threads] [ops_per_thread] [slots]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from reservations import BookingLog, ReservationStore, slot_key  # noqa: E402
+
+
+def run(stripes: int, threads: int, ops_per_thread: int, slot_count: int, log_path: str):
+    log = BookingLog(log_path)
+    store = ReservationStore(stripes=stripes, hold_seconds=0.05, log=log)
+    slots = [slot_key(f"2026-01-{d:02d}", f"{h:02d}:{m:02d}") for d in range(1, 21)
+             for h in range(9, 17) for m in (0, 30)][:slot_count]
+    counters = {"holds": 0, "conflicts": 0, "bookings": 0}
+    counter_lock = threading.Lock()
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index: int):
+        rng = random.Random(index)
+        holds = conflicts = bookings = 0
+        barrier.wait()
+        for op in range(ops_per_thread):
+            session_id = f"s{index}-{op // 4}"
+            key = slots[min(int(rng.paretovariate(1.2)) - 1, len(slots) - 1)]
+            if store.hold(key, session_id):
+                holds += 1
+                if op % 4 == 3 and store.confirm(key, session_id):
+                    bookings += 1
+            else:
+                conflicts += 1
+        with counter_lock:
+            counters["holds"] += holds
+            counters["conflicts"] += conflicts
+            counters["bookings"] += bookings
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    log.close()
+
+    # No slot may ever be booked twice
+    booked = [r.key for r in store.bookings()]
+    assert len(booked) == len(set(booked)), "double booking detected"
+    replayed = ReservationStore(log=BookingLog(log_path))
+    assert len(replayed.bookings()) == len(booked), "booking log out of sync"
+
+    total = threads * ops_per_thread
+    print(f"stripes={stripes:<3} threads={threads:<3} {total / elapsed:>10,.0f} ops/s  "
+          f"holds={counters['holds']:,} conflicts={counters['conflicts']:,} "
+          f"bookings={len(booked):,}")
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    ops_per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    slot_count = int(sys.argv[3]) if len(sys.argv) > 3 else 320
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for stripes in (1, 64):
+            run(stripes, threads, ops_per_thread, slot_count, os.path.join(tmp, f"bookings-{stripes}.jsonl"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+WebSocket Round-Trip Benchmark
+Click-to-render latency against main.py with N concurrent clients
+
+Starts one server (fallback agent, no API key, in-memory sessions) and
+for each client count runs closed-loop clients clicking between dates,
+timing each click from send to the widget reply.
+
+Usage:
+    python benchmarks/bench_roundtrip.py [--clients 1,16,64] [--seconds 5] [--port 8766]
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_workers import ADK_DIR, client_loop, isolated_env, wait_for_port
+
+
+def start_server(port: int, verbose: bool = False) -> subprocess.Popen:
+    """Start main.py with its data files in a temp dir; pair with stop_server"""
+    data_dir = tempfile.mkdtemp(prefix="adk-bench-")
+    env = dict(os.environ)
+    env.pop("GOOGLE_API_KEY", None)
+    env.update({
+        "ADK_WORKERS": "1",
+        "ADK_HOST": "127.0.0.1",
+        "ADK_PORT": str(port),
+        "SESSION_STORE": "memory://",
+        "PYTHONPATH": os.path.join(ADK_DIR, "src"),
+        **isolated_env(data_dir),
+    })
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ADK_DIR, "main.py")],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=None if verbose else subprocess.DEVNULL
+    )
+    server.data_dir = data_dir
+    try:
+        wait_for_port(port)
+    except Exception:
+        stop_server(server)
+        raise
+    return server
+
+
+def stop_server(server: subprocess.Popen):
+    server.terminate()
+    server.wait(timeout=15)
+    shutil.rmtree(server.data_dir, ignore_errors=True)
+
+
+async def measure(url: str, clients: int, seconds: float) -> dict:
+    results = {"round_trips": 0, "latencies": [], "sessions": []}
+    await asyncio.gather(*(client_loop(url, seconds, results) for _ in range(clients)))
+    latencies = sorted(results["latencies"])
+    return {
+        "round_trips_per_s": round(results["round_trips"] / seconds),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2) if latencies else 0.0,
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2) if latencies else 0.0
+    }
+
+
+def run(clients=(1, 16, 64), seconds: float = 5.0, port: int = 8766, warmup: float = 2.0, verbose: bool = False) -> dict:
+    server = start_server(port, verbose)
+    try:
+        time.sleep(warmup)
+        url = f"ws://127.0.0.1:{port}/"
+        return {str(n): asyncio.run(measure(url, n, seconds)) for n in clients}
+    finally:
+        stop_server(server)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", default="1,16,64")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    clients = [int(c) for c in args.clients.split(",")]
+    print(json.dumps(run(clients, args.seconds, args.port, args.warmup, args.verbose), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Session Manager Benchmark
+Create, get, update and cleanup throughput from 1k to 1M live sessions
+
+Each size gets a fresh in-memory SessionManager (no store, no memory
+budget) filled to that many sessions; get and update then hit random
+sessions and cleanup scans the lot with a tenth of them expired.
+
+Usage:
+    python benchmarks/bench_sessions.py [--sizes 1000,10000,100000,1000000] [--ops 20000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from session_manager import SessionManager  # noqa: E402
+
+
+def run(sizes=(1000, 10000, 100000), ops: int = 20000, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    results = {}
+    for size in sizes:
+        manager = SessionManager(memory_budget_bytes=None, store=None)
+
+        start = time.perf_counter()
+        session_ids = [manager.create_session() for _ in range(size)]
+        create_s = time.perf_counter() - start
+
+        picks = [rng.choice(session_ids) for _ in range(ops)]
+        start = time.perf_counter()
+        for session_id in picks:
+            manager.get_session(session_id)
+        get_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i, session_id in enumerate(picks):
+            manager.update_session(session_id, {"context": {"selected_time_value": ("09:00", "13:45")[i % 2]}})
+        update_s = time.perf_counter() - start
+
+        expired_at = datetime.utcnow() - timedelta(seconds=manager.session_timeout + 1)
+        for session_id in session_ids[::10]:
+            manager._sessions[session_id]["last_activity"] = expired_at
+        start = time.perf_counter()
+        cleaned = manager.cleanup_expired_sessions()
+        cleanup_s = time.perf_counter() - start
+
+        results[str(size)] = {
+            "create_per_s": round(size / create_s),
+            "get_per_s": round(ops / get_s),
+            "update_per_s": round(ops / update_s),
+            "cleanup_ms": round(cleanup_s * 1000, 2),
+            "cleaned": cleaned,
+            "bytes_per_session": round(manager.total_bytes / max(1, size - cleaned))
+        }
+        del manager, session_ids
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--ops", type=int, default=20000)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+    print(json.dumps(run(sizes, args.ops), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Session Snapshot Benchmark
+Drain-and-handoff cost: snapshot and load time from 1k to 100k sessions
+
+Fills a SessionManager with sessions in a realistic mix of states (fresh,
+date picked, date and time picked, some history), then times export +
+encode + write (what the old process does on SIGTERM) and read + decode +
+import (what the new process does before accepting traffic). The JSON
+encoding used for the session store is measured alongside for size.
+
+Usage:
+    python benchmarks/bench_snapshot.py [--sizes 1000,10000,100000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from session_manager import SessionManager  # noqa: E402
+from session_snapshot import restore_sessions, snapshot_sessions  # noqa: E402
+
+DATES = [f"2026-01-{day:02d}" for day in range(5, 19)]
+TIMES = ["11:30", "13:45", "15:00"]
+ZONES = [("Eastern Time (ET)", "ET"), ("Pacific Time (PT)", "PT"), ("Central Time (CT)", "CT")]
+
+
+def fill(manager: SessionManager, size: int, rng: random.Random):
+    for _ in range(size):
+        session_id = manager.create_session()
+        state = rng.random()
+        if state < 0.3:
+            continue
+        zone, abbr = rng.choice(ZONES)
+        context = {"timezone": zone, "timezone_abbr": abbr, "selected_date_value": rng.choice(DATES)}
+        if state > 0.6:
+            context["selected_time_value"] = rng.choice(TIMES)
+        update = {"context": context}
+        if state > 0.9:
+            update["conversation_history"] = [{"action": "select_date", "date": context["selected_date_value"]}]
+        manager.update_session(session_id, update)
+
+
+def run(sizes=(1000, 10000, 100000), seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessions.snap")
+        for size in sizes:
+            manager = SessionManager(memory_budget_bytes=None, store=None)
+            fill(manager, size, rng)
+
+            _, snapshot_bytes, snapshot_s = snapshot_sessions(manager, path)
+            json_bytes = sum(
+                len(json.dumps(r, default=str, separators=(",", ":"))) for r in manager.export_sessions()
+            )
+
+            target = SessionManager(memory_budget_bytes=None, store=None)
+            loaded, _, load_s = restore_sessions(target, path)
+            assert loaded == size, f"loaded {loaded} of {size} sessions"
+
+            results[str(size)] = {
+                "snapshot_ms": round(snapshot_s * 1000, 1),
+                "load_ms": round(load_s * 1000, 1),
+                "bytes_snapshot": snapshot_bytes,
+                "bytes_per_session": round(snapshot_bytes / size, 1),
+                "json_bytes_per_session": round(json_bytes / size, 1)
+            }
+            del manager, target
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+    print(json.dumps(run(sizes), indent=2))
+
+
+if __name__ == "__main__":
+    main()
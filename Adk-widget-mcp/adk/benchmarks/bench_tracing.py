@@ -0,0 +1,54 @@
+"""
+Tracing Overhead Benchmark
+Cost per traced call with tracing disabled, sampled and fully enabled
+
+Usage:
+    python benchmarks/bench_tracing.py [iterations]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import tracing  # noqa: E402
+from tracing import FileSpanExporter, Tracer, traced  # noqa: E402
+
+
+@traced("bench.leaf")
+def leaf(x):
+    return x + 1
+
+
+def plain(x):
+    return x + 1
+
+
+def measure(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(i)
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    path = os.path.join(tempfile.mkdtemp(prefix="adk-trace-"), "traces.jsonl")
+
+    baseline = measure(plain, iterations)
+    print(f"undecorated call:        {baseline:8.0f} ns")
+
+    for label, tracer in (
+        ("disabled", Tracer()),
+        ("sampled 1%", Tracer(FileSpanExporter(path), sample_rate=0.01)),
+        ("sampled 100%", Tracer(FileSpanExporter(path), sample_rate=1.0)),
+    ):
+        tracing._tracer = tracer
+        per_call = measure(leaf, iterations)
+        tracer.flush()
+        print(f"traced, {label:<14}   {per_call:8.0f} ns  (+{per_call - baseline:.0f} ns, {tracer.finished} spans)")
+
+
+if __name__ == "__main__":
+    main()
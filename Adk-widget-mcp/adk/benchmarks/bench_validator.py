@@ -0,0 +1,95 @@
+"""
+Widget Validation Benchmark
+Cost of checking populated widgets with the compiled validators
+
+Measures the compiled WidgetValidator on real schedule_meeting and
+timezone_selector renders, the effective cost at production sample
+rates, and - when the jsonschema package is installed - the same
+schemas interpreted by jsonschema's Draft7Validator for comparison.
+
+Usage:
+    python benchmarks/bench_validator.py [--iterations 20000] [--rates 1.0,0.1,0.01]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from widget_populator import WidgetPopulator  # noqa: E402
+from widget_validator import WIDGET_SCHEMAS, WidgetValidator  # noqa: E402
+
+SCHEMAS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "mcp-server", "schemas")
+
+
+def sample_widgets() -> list:
+    def load(name):
+        with open(os.path.join(SCHEMAS_DIR, f"{name}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    populator = WidgetPopulator()
+    schedule, timezone = load("schedule_meeting"), load("timezone_selector")
+    return [
+        populator.render_schedule_meeting_widget(schedule, {}).widget,
+        populator.render_schedule_meeting_widget(
+            schedule, {"selected_date_value": "2026-01-06", "selected_time_value": "13:45"}
+        ).widget,
+        populator.render_timezone_selector_widget(timezone, {"timezone_abbr": "PT"}).widget,
+    ]
+
+
+def timed(validate, widgets: list, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        validate(widgets[i % len(widgets)])
+    return time.perf_counter() - start
+
+
+def run(iterations: int = 20000, rates=(1.0, 0.1, 0.01)) -> dict:
+    widgets = sample_widgets()
+    results = {}
+
+    start = time.perf_counter()
+    validator = WidgetValidator()
+    results["compile_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    assert all(validator.check(w) is None for w in widgets), "sample widgets must be valid"
+
+    seconds = timed(validator.check, widgets, iterations)
+    results["compiled"] = {
+        "checks_per_s": round(iterations / seconds),
+        "check_us": round(seconds / iterations * 1e6, 2)
+    }
+
+    for rate in rates:
+        sampled = WidgetValidator(sample_rate=rate, seed=1)
+        seconds = timed(sampled.validate, widgets, iterations)
+        results[f"sampled_{rate:g}"] = {"renders_per_s": round(iterations / seconds)}
+
+    try:
+        import jsonschema
+    except ImportError:
+        return results
+    interpreted = {t: jsonschema.Draft7Validator(s) for t, s in WIDGET_SCHEMAS.items()}
+    seconds = timed(lambda w: interpreted[w["widget_type"]].is_valid(w), widgets, max(1, iterations // 10))
+    per_check = seconds / max(1, iterations // 10)
+    results["jsonschema"] = {
+        "checks_per_s": round(1 / per_check),
+        "check_us": round(per_check * 1e6, 2)
+    }
+    results["speedup"] = round(results["jsonschema"]["check_us"] / results["compiled"]["check_us"], 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--rates", default="1.0,0.1,0.01")
+    args = parser.parse_args()
+    rates = [float(r) for r in args.rates.split(",")]
+    print(json.dumps(run(args.iterations, rates), indent=2))
+
+
+if __name__ == "__main__":
+    main()
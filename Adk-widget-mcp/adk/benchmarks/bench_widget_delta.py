@@ -0,0 +1,94 @@
+"""
+Widget Delta Benchmark
+Bytes on the wire per click with full renders vs widget_patch deltas,
+raw and as the dictionary-compressed frames ?compress=zdict clients get
+
+Usage:
+    python benchmarks/bench_widget_delta.py
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from compression import FrameCompressor, PresetDictionary, build_dictionary  # noqa: E402
+from json_patch import WidgetDeltaEncoder, apply_patch  # noqa: E402
+from widget_populator import WidgetPopulator  # noqa: E402
+from bench_widget_render import load_schema  # noqa: E402
+
+
+def click_flow(dates):
+    """A typical session: browse dates, pick a time, switch timezone"""
+    context = {"timezone": "Eastern Time (ET)", "timezone_abbr": "ET"}
+    yield dict(context)
+    for date in dates:
+        context["selected_date_value"] = date
+        yield dict(context)
+    for time_value in ("11:30", "13:45", "15:00"):
+        context["selected_time_value"] = time_value
+        yield dict(context)
+    context.update({"timezone": "Pacific Time (PT)", "timezone_abbr": "PT"})
+    yield dict(context)
+
+
+def main():
+    populator = WidgetPopulator()
+    schema = load_schema("schedule_meeting")
+    dates = [d["value"] for d in populator._get_next_dates(5)]
+
+    # Dictionary from the connect render and a date click's patch, as the server builds it
+    flow = click_flow(dates)
+    sample_encoder = WidgetDeltaEncoder()
+    samples = []
+    for context in (next(flow), next(flow)):
+        rendered = populator.render_schedule_meeting_widget(schema, context)
+        samples.append(sample_encoder.encode("", rendered.widget, rendered.payload).encode("utf-8"))
+    compressor = FrameCompressor()
+    compressor.set_dictionary(PresetDictionary(build_dictionary(samples)))
+
+    def wire(message: str) -> int:
+        frame = compressor.encode(message)
+        return len(frame) if isinstance(frame, bytes) else len(frame.encode("utf-8"))
+
+    encoder = WidgetDeltaEncoder()
+    client_widget = None
+    full_bytes = []
+    sent_bytes = []
+    full_wire = []
+    sent_wire = []
+
+    for context in click_flow(dates):
+        rendered = populator.render_schedule_meeting_widget(schema, context)
+        message = encoder.encode("bench-session", rendered.widget, rendered.payload)
+        data = json.loads(message)
+
+        # Replay on a simulated client to check the patches are correct
+        if data["type"] == "widget_patch":
+            client_widget = apply_patch(client_widget, data["patch"])
+        else:
+            client_widget = data["widget"]
+        assert client_widget == rendered.widget
+
+        full_bytes.append(len(rendered.payload))
+        sent_bytes.append(len(message.encode("utf-8")))
+        full_wire.append(wire(WidgetDeltaEncoder().encode("bench-session", rendered.widget, rendered.payload)))
+        sent_wire.append(wire(message))
+
+    clicks = len(sent_bytes) - 1
+    full_per_click = sum(full_bytes[1:]) / clicks
+    sent_per_click = sum(sent_bytes[1:]) / clicks
+    print(f"clicks:               {clicks}")
+    print(f"full render / click:  {full_per_click:,.0f} bytes")
+    print(f"delta / click:        {sent_per_click:,.0f} bytes")
+    print(f"reduction:            {full_per_click / sent_per_click:.1f}x")
+    full_wire_per_click = sum(full_wire[1:]) / clicks
+    sent_wire_per_click = sum(sent_wire[1:]) / clicks
+    print(f"zdict full / click:   {full_wire_per_click:,.0f} bytes")
+    print(f"zdict delta / click:  {sent_wire_per_click:,.0f} bytes")
+    print(f"zdict reduction:      {full_wire_per_click / sent_wire_per_click:.1f}x")
+    print(f"encoder stats:        {encoder.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Widget Render Benchmark
+Compares the compiled template path against deepcopy + json.dumps per render,
+and times timezone picker population
+
+Usage:
+    python benchmarks/bench_widget_render.py [iterations]
+"""
+import copy
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from widget_populator import WidgetPopulator  # noqa: E402
+
+SCHEMAS_DIR = Path(__file__).resolve().parent.parent.parent / "mcp-server" / "schemas"
+
+
+def load_schema(name: str) -> dict:
+    with open(SCHEMAS_DIR / f"{name}.json", "r") as f:
+        return json.load(f)
+
+
+def deepcopy_render(populator: WidgetPopulator, schema: dict, context: dict) -> bytes:
+    """The previous per-click path: deepcopy, rebuild option lists, dumps"""
+    widget = copy.deepcopy(schema)
+    widget["properties"]["timezone"]["value"] = context.get("timezone", "Eastern Time (ET)")
+    widget["properties"]["date_selector"]["options"] = [
+        {
+            "label": date["day"],
+            "sublabel": date["date_str"],
+            "value": date["value"],
+            "selected": date["value"] == context.get("selected_date_value")
+        }
+        for date in populator._get_next_dates(5)
+    ]
+    widget["properties"]["time_slots"]["options"] = [
+        {
+            "label": time_slot["label"],
+            "value": time_slot["value"],
+            "selected": time_slot["value"] == context.get("selected_time_value")
+        }
+        for time_slot in populator._get_time_slots(
+            context.get("timezone_abbr", "ET"), context.get("selected_date_value")
+        )
+    ]
+    widget["properties"]["actions"]["buttons"][0]["enabled"] = bool(
+        context.get("selected_date_value") and context.get("selected_time_value")
+    )
+    return json.dumps(widget).encode("utf-8")
+
+
+def compiled_render(populator: WidgetPopulator, schema: dict, context: dict) -> bytes:
+    return populator.render_schedule_meeting_widget(schema, context).payload
+
+
+def measure(func, populator, schema, contexts, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(populator, schema, contexts[i % len(contexts)])
+    return time.perf_counter() - start
+
+
+def run(iterations: int = 20000) -> dict:
+    populator = WidgetPopulator()
+    schema = load_schema("schedule_meeting")
+    timezone_schema = load_schema("timezone_selector")
+    dates = [d["value"] for d in populator._get_next_dates(5)]
+    contexts = [
+        {
+            "timezone": tz["label"],
+            "timezone_abbr": tz["value"],
+            "selected_date_value": dates[i % len(dates)],
+            "selected_time_value": ("11:30", "13:45", None)[i % 3],
+        }
+        for i, tz in enumerate(WidgetPopulator.TIMEZONES * 3)
+    ]
+
+    # Both paths must produce the same widget
+    for context in contexts:
+        assert json.loads(deepcopy_render(populator, schema, context)) == \
+            json.loads(compiled_render(populator, schema, context))
+
+    results = {}
+    for name, func in (("deepcopy", deepcopy_render), ("compiled", compiled_render)):
+        elapsed = measure(func, populator, schema, contexts, iterations)
+        results[f"{name}_renders_per_s"] = round(iterations / elapsed)
+        results[f"{name}_us"] = round(elapsed * 1e6 / iterations, 2)
+
+    elapsed = measure(
+        lambda p, s, c: p.render_timezone_selector_widget(s, c).payload,
+        populator, timezone_schema, contexts, iterations
+    )
+    results["timezone_renders_per_s"] = round(iterations / elapsed)
+    results["speedup"] = round(results["compiled_renders_per_s"] / results["deepcopy_renders_per_s"], 2)
+    return results
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    results = run(iterations)
+    for name in ("deepcopy", "compiled", "timezone"):
+        rate = results[f"{name}_renders_per_s"]
+        print(f"{name:>10}: {rate:>12,.0f} renders/s  ({1e6 / rate:.2f} µs/render)")
+
+    print(f"   speedup: {results['speedup']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
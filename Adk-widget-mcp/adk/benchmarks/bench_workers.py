@@ -0,0 +1,201 @@
+"""
+Worker Scaling Benchmark
+Round trips per second against main.py with 1..N SO_REUSEPORT workers
+
+Starts the server once per worker count (fallback agent, no API key), drives
+it with closed-loop clients clicking between dates, then reconnects every
+client with its session_id to check sessions follow it across workers.
+
+Usage:
+    python benchmarks/bench_workers.py [--workers 1,2,4] [--clients 64]
+                                       [--seconds 5] [--store sqlite|redis|memory]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import websockets
+
+ADK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def wait_for_port(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"nothing listening on port {port}")
+
+
+def isolated_env(directory: str) -> dict:
+    """Server env that keeps bookings, snapshots and traces out of adk/data"""
+    return {
+        "BOOKING_LOG": os.path.join(directory, "bookings.jsonl"),
+        "SESSION_SNAPSHOT": os.path.join(directory, "sessions.snapshot"),
+        "TRACE_FILE": os.path.join(directory, "traces.jsonl"),
+    }
+
+
+async def client_loop(url: str, seconds: float, results: dict):
+    async with websockets.connect(url, max_size=None) as ws:
+        first = json.loads(await ws.recv())
+        session_id = first["session_id"]
+        version = first.get("version", 0)
+        dates = first["widget"]["properties"]["date_selector"]["options"]
+        # Measure from the first render so worker start-up is not counted
+        deadline = time.perf_counter() + seconds
+        i = 0
+        while time.perf_counter() < deadline:
+            option = dates[i % len(dates)]
+            i += 1
+            start = time.perf_counter()
+            await ws.send(json.dumps({
+                "action": "select_date",
+                "date": option["value"],
+                "label": option["label"],
+                "widget_version": version
+            }))
+            reply = json.loads(await ws.recv())
+            results["latencies"].append(time.perf_counter() - start)
+            version = reply.get("version", version)
+            results["round_trips"] += 1
+        results["sessions"].append((session_id, dates[(i - 1) % len(dates)]["value"]))
+
+
+async def resume(url: str, session_id: str) -> bool:
+    async with websockets.connect(f"{url}?session_id={session_id}", max_size=None) as ws:
+        first = json.loads(await ws.recv())
+        return first.get("session_id") == session_id
+
+
+async def drive(url: str, clients: int, seconds: float) -> dict:
+    results = {"round_trips": 0, "latencies": [], "sessions": []}
+    await asyncio.gather(*(client_loop(url, seconds, results) for _ in range(clients)))
+    resumed = await asyncio.gather(*(resume(url, sid) for sid, _ in results["sessions"]))
+    results["resumed"] = sum(resumed)
+    return results
+
+
+def load_process(url: str, clients: int, seconds: float, queue):
+    results = asyncio.run(drive(url, clients, seconds))
+    queue.put({
+        "round_trips": results["round_trips"],
+        "latencies": results["latencies"],
+        "resumed": results["resumed"],
+        "sessions": len(results["sessions"])
+    })
+
+
+def run(workers: int, args, store_url: str):
+    env = dict(os.environ)
+    env.pop("GOOGLE_API_KEY", None)
+    env.update({
+        "ADK_WORKERS": str(workers),
+        "ADK_HOST": "127.0.0.1",
+        "ADK_PORT": str(args.port),
+        "SESSION_STORE": store_url,
+        "PYTHONPATH": os.path.join(ADK_DIR, "src"),
+        **isolated_env(args.tmpdir),
+    })
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ADK_DIR, "main.py")],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL if not args.verbose else None
+    )
+    try:
+        wait_for_port(args.port)
+        time.sleep(args.warmup)
+
+        url = f"ws://127.0.0.1:{args.port}/"
+        processes = max(1, min(args.load_processes, args.clients))
+        queue = multiprocessing.Queue()
+        loaders = [
+            multiprocessing.Process(
+                target=load_process,
+                args=(url, args.clients // processes + (i < args.clients % processes), args.seconds, queue)
+            )
+            for i in range(processes)
+        ]
+        for loader in loaders:
+            loader.start()
+        parts = [queue.get() for _ in loaders]
+        for loader in loaders:
+            loader.join()
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+
+    round_trips = sum(p["round_trips"] for p in parts)
+    latencies = sorted(lat for p in parts for lat in p["latencies"])
+    sessions = sum(p["sessions"] for p in parts)
+    resumed = sum(p["resumed"] for p in parts)
+    p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0
+    rate = round_trips / args.seconds
+    print(
+        f"workers={workers:<3} {rate:>9,.0f} round trips/s  p50={p50:.2f}ms  p99={p99:.2f}ms  "
+        f"resumed={resumed}/{sessions}"
+    )
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    cpus = os.cpu_count() or 1
+    default_workers = ",".join(str(n) for n in sorted({1, 2, 4, cpus}) if n <= cpus)
+    parser.add_argument("--workers", default=default_workers)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--store", default="sqlite", choices=["sqlite", "redis", "memory"])
+    parser.add_argument("--redis-url", default="", help="use this server instead of the stand-in")
+    parser.add_argument("--load-processes", type=int, default=max(1, cpus // 2))
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    standin = None
+    tmpdir = args.tmpdir = tempfile.mkdtemp(prefix="adk-bench-")
+    if args.store == "redis" and not args.redis_url:
+        standin = subprocess.Popen(
+            [sys.executable, os.path.join(os.path.dirname(__file__), "resp_server.py"), "--port", "6390"],
+            stdout=subprocess.DEVNULL
+        )
+        wait_for_port(6390)
+        args.redis_url = "redis://127.0.0.1:6390/0"
+
+    try:
+        baseline = None
+        baseline_workers = None
+        for workers in (int(w) for w in args.workers.split(",")):
+            if args.store == "sqlite":
+                store_url = "sqlite:///" + os.path.join(tmpdir, f"sessions-{workers}.db")
+            elif args.store == "redis":
+                store_url = args.redis_url
+            else:
+                store_url = "memory://"
+            rate = run(workers, args, store_url)
+            if baseline is None:
+                baseline, baseline_workers = rate, workers
+            elif baseline:
+                print(f"           speedup vs {baseline_workers} worker(s): {rate / baseline:.2f}x")
+    finally:
+        if standin is not None:
+            standin.terminate()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+Widget Flow Load Test
+Scripted or randomized widget flows from many virtual users, timed per step
+
+Each virtual user (VU) opens a connection with the headless client in
+widget_client.py, runs a flow (connect, pick a date and time, switch
+timezone, book, ...) and starts over on a fresh session until the run
+ends. Every step's latency, wire bytes (after compression) and raw JSON
+bytes are recorded; the report aggregates them per action.
+
+Flows:
+- browse: dates, times and the timezone picker, never books
+- book:   browse, then confirm a timezone and submit the booking
+- random: a random walk over whatever the current widget offers
+- a JSON script: {"steps": [{"action": "select_date", "pick": "random"}, ...]}
+  where pick is random, first, last, an index or an option value
+
+Without --url a server is started (fallback agent, in-memory sessions).
+
+Usage:
+    python benchmarks/load_test.py [--users 32] [--duration 10] [--flow browse,book]
+                                   [--script flow.json] [--think-ms 0] [--ramp-up 0]
+                                   [--processes 1] [--url ws://localhost:8000/]
+                                   [--no-compress] [--steps-out steps.jsonl]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from widget_client import StepResult, WidgetClient
+
+FLOWS = {
+    "browse": [
+        {"action": "select_date"},
+        {"action": "select_time"},
+        {"action": "select_date"},
+        {"action": "change_timezone"},
+        {"action": "cancel_timezone"},
+    ],
+    "book": [
+        {"action": "select_date"},
+        {"action": "select_time"},
+        {"action": "change_timezone"},
+        {"action": "confirm_timezone"},
+        {"action": "submit_schedule"},
+    ],
+}
+
+# Timezones the server knows, for a confirm sent without the picker open
+TIMEZONES = ["ET", "CT", "MT", "PT"]
+
+# Action -> (widget property the choice comes from, message fields built from the option)
+CHOICES = {
+    "select_date": ("date_selector", lambda o: {"date": o["value"], "label": f"{o['label']} {o.get('sublabel', '')}".strip()}),
+    "select_time": ("time_slots", lambda o: {"time": o["value"], "label": o["label"]}),
+    "confirm_timezone": ("timezone_list", lambda o: {"timezone": o["value"]}),
+}
+
+
+def load_script(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        script = json.load(f)
+    steps = script["steps"] if isinstance(script, dict) else script
+    for step in steps:
+        if "action" not in step:
+            raise ValueError(f"script step without an action: {step}")
+    return steps
+
+
+def pick(options: List[Dict[str, Any]], how: Any, rng: random.Random) -> Optional[Dict[str, Any]]:
+    if not options:
+        return None
+    if how in (None, "random"):
+        return rng.choice(options)
+    if how == "first":
+        return options[0]
+    if how == "last":
+        return options[-1]
+    if isinstance(how, int):
+        return options[how] if -len(options) <= how < len(options) else None
+    return next((o for o in options if o["value"] == how), None)
+
+
+def step_data(client: WidgetClient, step: Dict[str, Any], rng: random.Random) -> Optional[Dict[str, Any]]:
+    """Message fields for a step from the widget on screen; None if it cannot be taken"""
+    if "data" in step:
+        return step["data"]
+    if step["action"] not in CHOICES:
+        return {}
+    prop, fields = CHOICES[step["action"]]
+    options = client.options(prop)
+    if not options and step["action"] == "confirm_timezone":
+        options = [{"value": tz} for tz in TIMEZONES]
+    option = pick(options, step.get("pick"), rng)
+    return fields(option) if option is not None else None
+
+
+def random_step(client: WidgetClient, rng: random.Random) -> Dict[str, Any]:
+    """Something a user could click on the current widget"""
+    if client.widget_type == "timezone_selector":
+        return {"action": rng.choice(["confirm_timezone", "confirm_timezone", "cancel_timezone"])}
+    actions = ["select_date", "select_date", "select_time", "select_time", "change_timezone"]
+    if any(o.get("selected") for o in client.options("time_slots")):
+        actions.append("submit_schedule")
+    return {"action": rng.choice(actions)}
+
+
+async def run_flow(client: WidgetClient, flow: str, steps, random_steps: int, think: float, rng, record):
+    result = await client.connect_step()
+    record(flow, result)
+    if result.outcome != "ok":
+        return
+    plan = steps if steps is not None else [None] * random_steps
+    for planned in plan:
+        if think:
+            await asyncio.sleep(think * rng.uniform(0.5, 1.5))
+        step = planned or random_step(client, rng)
+        data = step_data(client, step, rng)
+        if data is None:
+            skipped = StepResult(step["action"])
+            skipped.reply = "skipped"
+            record(flow, skipped)
+            continue
+        result = await client.act(step["action"], **data)
+        record(flow, result)
+        if result.outcome == "timeout" or (result.errors and result.errors[-1].startswith("connection closed")):
+            return
+
+
+async def virtual_user(index: int, args, flows: Dict[str, Any], deadline: float, steps: list):
+    rng = random.Random(args.seed * 100003 + index)
+    if args.ramp_up:
+        await asyncio.sleep(args.ramp_up * index / max(1, args.users))
+    iteration = 0
+
+    def record(flow: str, result: StepResult):
+        entry = result.to_dict()
+        entry.update({"user": index, "iteration": iteration, "flow": flow, "at": time.time()})
+        if result.reply == "skipped":
+            entry["outcome"] = "skipped"
+        steps.append(entry)
+
+    while time.monotonic() < deadline and (not args.iterations or iteration < args.iterations):
+        flow = rng.choice(sorted(flows))
+        client = WidgetClient(args.url, compress=not args.no_compress, timeout=args.timeout)
+        try:
+            await run_flow(client, flow, flows[flow], args.random_steps, args.think_ms / 1000, rng, record)
+        finally:
+            await client.close()
+        iteration += 1
+
+
+async def drive(args, user_ids: List[int], flows: Dict[str, Any]) -> list:
+    steps: list = []
+    deadline = time.monotonic() + args.duration
+    await asyncio.gather(*(virtual_user(i, args, flows, deadline, steps) for i in user_ids))
+    return steps
+
+
+async def warm_up(url: str, timeout: float):
+    """One untimed connection so the server's MCP pool and caches are up"""
+    async with WidgetClient(url, timeout=timeout) as client:
+        step = await client.connect_step()
+    if step.outcome != "ok":
+        raise RuntimeError(f"cannot reach {url}: {step.errors}")
+
+
+def load_process(args, user_ids: List[int], flows: Dict[str, Any], queue):
+    queue.put(asyncio.run(drive(args, user_ids, flows)))
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(steps: list, seconds: float) -> Dict[str, Any]:
+    by_action: Dict[str, list] = {}
+    for step in steps:
+        by_action.setdefault(step["action"], []).append(step)
+
+    actions = {}
+    for action, entries in sorted(by_action.items()):
+        timed = [e for e in entries if e["outcome"] != "skipped"]
+        latencies = sorted(e["latency_ms"] for e in timed if e["outcome"] == "ok")
+        outcomes: Dict[str, int] = {}
+        for e in entries:
+            outcomes[e["outcome"]] = outcomes.get(e["outcome"], 0) + 1
+        actions[action] = {
+            "count": len(entries),
+            "outcomes": outcomes,
+            "p50_ms": round(percentile(latencies, 0.50), 2),
+            "p90_ms": round(percentile(latencies, 0.90), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+            "bytes_wire": round(sum(e["wire_bytes"] for e in timed) / len(timed), 1) if timed else 0.0,
+            "bytes_raw": round(sum(e["raw_bytes"] for e in timed) / len(timed), 1) if timed else 0.0
+        }
+
+    done = [s for s in steps if s["outcome"] != "skipped"]
+    return {
+        "steps": len(done),
+        "steps_per_s": round(len(done) / seconds, 1) if seconds else 0.0,
+        "flows": sum(1 for s in steps if s["action"] == "connect"),
+        "ok_ratio": round(sum(1 for s in done if s["outcome"] == "ok") / len(done), 4) if done else 0.0,
+        "resyncs": sum(s["resyncs"] for s in steps),
+        "bytes_wire_total": sum(s["wire_bytes"] for s in steps),
+        "actions": actions
+    }
+
+
+def resolve_flows(names: str, script: Optional[str]) -> Dict[str, Any]:
+    if script:
+        return {os.path.splitext(os.path.basename(script))[0]: load_script(script)}
+    flows = {}
+    for name in (n for n in names.split(",") if n):
+        if name == "random":
+            flows[name] = None
+        elif name in FLOWS:
+            flows[name] = FLOWS[name]
+        else:
+            raise ValueError(f"unknown flow {name!r} (have {', '.join(sorted(FLOWS))}, random)")
+    return flows
+
+
+def run(
+    url: Optional[str] = None,
+    users: int = 32,
+    duration: float = 10.0,
+    flow: str = "browse",
+    script: Optional[str] = None,
+    processes: int = 1,
+    port: int = 8767,
+    steps_out: Optional[str] = None,
+    **options
+) -> Dict[str, Any]:
+    """Run the load test; starts a server on ``port`` when no ``url`` is given"""
+    args = argparse.Namespace(
+        url=url, users=users, duration=duration, seed=options.get("seed", 1),
+        iterations=options.get("iterations", 0), think_ms=options.get("think_ms", 0.0),
+        ramp_up=options.get("ramp_up", 0.0), random_steps=options.get("random_steps", 8),
+        timeout=options.get("timeout", 10.0), no_compress=options.get("no_compress", False)
+    )
+    flows = resolve_flows(flow, script)
+
+    server = None
+    if args.url is None:
+        from bench_roundtrip import start_server, stop_server
+        server = start_server(port, options.get("verbose", False))
+        time.sleep(options.get("warmup", 2.0))
+        args.url = f"ws://127.0.0.1:{port}/"
+
+    try:
+        asyncio.run(warm_up(args.url, args.timeout))
+        start = time.monotonic()
+        processes = max(1, min(processes, users))
+        if processes == 1:
+            steps = asyncio.run(drive(args, list(range(users)), flows))
+        else:
+            queue = multiprocessing.Queue()
+            loaders = [
+                multiprocessing.Process(target=load_process, args=(args, list(range(i, users, processes)), flows, queue))
+                for i in range(processes)
+            ]
+            for loader in loaders:
+                loader.start()
+            steps = [step for _ in loaders for step in queue.get()]
+            for loader in loaders:
+                loader.join()
+        elapsed = time.monotonic() - start
+    finally:
+        if server is not None:
+            stop_server(server)
+
+    if steps_out:
+        with open(steps_out, "w", encoding="utf-8") as f:
+            for step in sorted(steps, key=lambda s: s["at"]):
+                f.write(json.dumps(step, separators=(",", ":")) + "\n")
+
+    report = summarize(steps, elapsed)
+    report["config"] = {"users": users, "duration": duration, "flows": sorted(flows), "compress": not args.no_compress}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=None, help="server to test (default: start one)")
+    parser.add_argument("--port", type=int, default=8767, help="port for the started server")
+    parser.add_argument("--users", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--iterations", type=int, default=0, help="flows per user (0: until --duration)")
+    parser.add_argument("--flow", default="browse", help="comma-separated: browse, book, random")
+    parser.add_argument("--script", default=None, help="JSON flow script (overrides --flow)")
+    parser.add_argument("--random-steps", type=int, default=8, help="steps per random flow")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between steps")
+    parser.add_argument("--ramp-up", type=float, default=0, help="seconds over which users start")
+    parser.add_argument("--timeout", type=float, default=10)
+    parser.add_argument("--processes", type=int, default=1, help="client processes to spread users over")
+    parser.add_argument("--no-compress", action="store_true")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--steps-out", default=None, help="write every step as JSON lines")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    report = run(
+        url=args.url, users=args.users, duration=args.duration, flow=args.flow, script=args.script,
+        processes=args.processes, port=args.port, steps_out=args.steps_out, seed=args.seed,
+        iterations=args.iterations, think_ms=args.think_ms, ramp_up=args.ramp_up,
+        random_steps=args.random_steps, timeout=args.timeout, no_compress=args.no_compress,
+        verbose=args.verbose
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
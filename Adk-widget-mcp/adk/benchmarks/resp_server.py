@@ -0,0 +1,119 @@
+"""
+RESP Stand-in Server
+Minimal Redis-protocol server for exercising RedisSessionStore (and
+RedisReservationStore) without Redis
+
+Supports PING, AUTH, SELECT, GET, SET [EX|PX] [NX], DEL, EXISTS, EXPIRE,
+INCR, DBSIZE and FLUSHDB. Everything lives in one dict; expiry is checked on access.
+
+Usage:
+    python benchmarks/resp_server.py [--port 6390]
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+
+class RespStandIn:
+    def __init__(self):
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.commands = 0
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def execute(self, args) -> bytes:
+        self.commands += 1
+        command = args[0].upper()
+
+        if command == b"PING":
+            return b"+PONG\r\n"
+        if command in (b"AUTH", b"SELECT"):
+            return b"+OK\r\n"
+        if command == b"GET":
+            value = self._get(args[1])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == b"SET":
+            options = [arg.upper() for arg in args[3:]]
+            if b"NX" in options:
+                if self._get(args[1]) is not None:
+                    return b"$-1\r\n"
+                options.remove(b"NX")
+            expires_at = None
+            if len(options) >= 2:
+                unit = options[0]
+                amount = float(options[1])
+                expires_at = time.monotonic() + (amount / 1000 if unit == b"PX" else amount)
+            self.data[args[1]] = (args[2], expires_at)
+            return b"+OK\r\n"
+        if command == b"INCR":
+            value = int(self._get(args[1]) or 0) + 1
+            self.data[args[1]] = (str(value).encode(), None)
+            return b":%d\r\n" % value
+        if command == b"DEL":
+            removed = sum(1 for key in args[1:] if self.data.pop(key, None) is not None)
+            return b":%d\r\n" % removed
+        if command == b"EXISTS":
+            return b":%d\r\n" % sum(1 for key in args[1:] if self._get(key) is not None)
+        if command == b"EXPIRE":
+            value = self._get(args[1])
+            if value is None:
+                return b":0\r\n"
+            self.data[args[1]] = (value, time.monotonic() + float(args[2]))
+            return b":1\r\n"
+        if command == b"DBSIZE":
+            return b":%d\r\n" % len(self.data)
+        if command == b"FLUSHDB":
+            self.data.clear()
+            return b"+OK\r\n"
+        return b"-ERR unknown command '%s'\r\n" % command
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                if not header.startswith(b"*"):
+                    # Inline command (e.g. typed into telnet)
+                    args = header.split()
+                else:
+                    args = []
+                    for _ in range(int(header[1:-2])):
+                        length = int((await reader.readline())[1:-2])
+                        args.append((await reader.readexactly(length + 2))[:-2])
+                if args:
+                    writer.write(self.execute(args))
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host: str, port: int):
+    standin = RespStandIn()
+    server = await asyncio.start_server(standin.handle, host, port)
+    print(f"RESP stand-in listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
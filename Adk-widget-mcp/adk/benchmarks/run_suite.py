@@ -0,0 +1,182 @@
+"""
+Benchmark Suite
+Runs the core component benchmarks, saves JSON and checks for regressions
+
+Benchmarks:
+- sessions:  SessionManager create/get/update/cleanup (bench_sessions.py)
+- snapshot:  drain-and-handoff snapshot and load time (bench_snapshot.py)
+- populator: widget population per second (bench_widget_render.py)
+- validator: compiled widget validation, full and sampled (bench_validator.py)
+- mcp:       MCP call latency direct, in-memory and stdio (bench_mcp_transport.py)
+- roundtrip: WebSocket click-to-render with N clients (bench_roundtrip.py)
+- flows:     per-step latency and payload of browse flows (load_test.py)
+
+Results go to data/benchmarks/<commit>.json. Each run is compared with
+--baseline (default: the newest other result file) and any metric more
+than --threshold worse fails the run with exit code 1. Metrics ending in
+_per_s are higher-is-better; _ms, _us and bytes_* are lower-is-better;
+anything else is informational.
+
+Usage:
+    python benchmarks/run_suite.py [--profile quick|full] [--only sessions,populator]
+                                   [--baseline data/benchmarks/abc1234.json] [--threshold 0.25]
+"""
+import argparse
+import contextlib
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, Optional
+
+import bench_mcp_transport
+import bench_roundtrip
+import bench_sessions
+import bench_snapshot
+import bench_validator
+import bench_widget_render
+import load_test
+
+ADK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+RESULTS_DIR = os.path.join(ADK_DIR, "data", "benchmarks")
+
+PROFILES = {
+    "quick": {
+        "sessions": lambda: bench_sessions.run(sizes=(1000, 10000, 100000), ops=20000),
+        "snapshot": lambda: bench_snapshot.run(sizes=(10000, 100000)),
+        "populator": lambda: bench_widget_render.run(iterations=20000),
+        "validator": lambda: bench_validator.run(iterations=20000),
+        "mcp": lambda: bench_mcp_transport.run(calls=300),
+        "roundtrip": lambda: bench_roundtrip.run(clients=(1, 16, 64), seconds=3),
+        "flows": lambda: load_test.run(users=16, duration=5, flow="browse"),
+    },
+    "full": {
+        "sessions": lambda: bench_sessions.run(sizes=(1000, 10000, 100000, 1000000), ops=100000),
+        "snapshot": lambda: bench_snapshot.run(sizes=(10000, 100000, 1000000)),
+        "populator": lambda: bench_widget_render.run(iterations=100000),
+        "validator": lambda: bench_validator.run(iterations=100000),
+        "mcp": lambda: bench_mcp_transport.run(calls=2000),
+        "roundtrip": lambda: bench_roundtrip.run(clients=(1, 16, 64, 256), seconds=10),
+        "flows": lambda: load_test.run(users=64, duration=20, flow="browse,random"),
+    },
+}
+
+
+def git_commit() -> Dict[str, Any]:
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=ADK_DIR, capture_output=True, text=True).stdout.strip()
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD") or "unknown",
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))
+    }
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    metrics = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            metrics.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[name] = value
+    return metrics
+
+
+def direction(metric: str) -> Optional[str]:
+    """``higher``/``lower`` is better, or None for informational metrics"""
+    leaf = metric.rsplit(".", 1)[-1]
+    if leaf.endswith("_per_s"):
+        return "higher"
+    if leaf.endswith(("_ms", "_us")) or leaf.startswith("bytes"):
+        return "lower"
+    return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> list:
+    """Metrics more than ``threshold`` (fraction) worse than the baseline"""
+    now = flatten(current["results"])
+    before = flatten(baseline["results"])
+    regressions = []
+    for metric, value in sorted(now.items()):
+        better = direction(metric)
+        old = before.get(metric)
+        if better is None or not old:
+            continue
+        change = (value - old) / old
+        worse = -change if better == "higher" else change
+        if worse > threshold:
+            regressions.append({"metric": metric, "baseline": old, "current": value, "worse_by": round(worse, 3)})
+    return regressions
+
+
+def latest_baseline(exclude: str) -> Optional[str]:
+    paths = [p for p in glob.glob(os.path.join(RESULTS_DIR, "*.json")) if os.path.abspath(p) != os.path.abspath(exclude)]
+    return max(paths, key=os.path.getmtime) if paths else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profile", default="quick", choices=sorted(PROFILES))
+    parser.add_argument("--only", default="", help="comma-separated subset of " + ",".join(PROFILES["quick"]))
+    parser.add_argument("--output", default=None, help="default: data/benchmarks/<commit>.json")
+    parser.add_argument("--baseline", default=None, help="result file to compare with (default: newest other)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown as a fraction")
+    args = parser.parse_args()
+
+    benchmarks = PROFILES[args.profile]
+    selected = [name for name in args.only.split(",") if name] or list(benchmarks)
+    unknown = set(selected) - set(benchmarks)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    meta = {
+        **git_commit(),
+        "profile": args.profile,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count()
+    }
+    results = {}
+    for name in selected:
+        print(f"⏱️  {name} ...", file=sys.stderr)
+        start = time.perf_counter()
+        # Keep stdout clean for the JSON report
+        with contextlib.redirect_stdout(sys.stderr):
+            results[name] = benchmarks[name]()
+        print(f"   done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    report = {"meta": meta, "results": results}
+    output = args.output or os.path.join(RESULTS_DIR, f"{meta['commit']}{'-dirty' if meta['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"💾 Saved {output}", file=sys.stderr)
+
+    baseline_path = args.baseline or latest_baseline(output)
+    if not baseline_path:
+        print("ℹ️  No baseline to compare with yet", file=sys.stderr)
+        return
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["meta"].get("profile") != args.profile:
+        print(f"⚠️  Baseline {baseline_path} used the {baseline['meta'].get('profile')} profile", file=sys.stderr)
+
+    regressions = compare(report, baseline, args.threshold)
+    label = f"{baseline['meta'].get('commit')} ({os.path.basename(baseline_path)})"
+    if not regressions:
+        print(f"✅ No regressions beyond {args.threshold:.0%} against {label}", file=sys.stderr)
+        return
+    print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%} against {label}:", file=sys.stderr)
+    for r in regressions:
+        print(f"   {r['metric']}: {r['baseline']} -> {r['current']} ({r['worse_by']:.0%} worse)", file=sys.stderr)
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Headless Widget Client
+Python stand-in for the React UI's side of the widget WebSocket protocol
+
+Mirrors ui/src/hooks/useWebSocket.js: opts in to dictionary-compressed
+frames, applies widget_patch messages to the last widget (asking for a
+resync when out of step), resumes a session by id, and sends actions
+with the widget version it holds. Every action is timed from send to the
+message that answers it, with the bytes received on the way.
+
+    async with WidgetClient("ws://localhost:8000/") as client:
+        await client.connect_step()
+        date = client.options("date_selector")[0]
+        step = await client.act("select_date", date=date["value"], label=date["label"])
+        print(step.latency_ms, step.wire_bytes)
+"""
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+
+import websockets
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from compression import PresetDictionary, decode_frame  # noqa: E402
+from json_patch import apply_patch  # noqa: E402
+
+# What answers each action; anything else (an error, a resync) is recorded on the way
+RENDER_REPLIES = ("widget_render", "widget_patch")
+REPLIES = {
+    "submit_schedule": ("meeting_scheduled", "error"),
+    "close_widget": ("closed",),
+}
+
+
+class StepResult:
+    """Timing and payload of one action, from send to its answer"""
+
+    __slots__ = ("action", "latency", "wire_bytes", "raw_bytes", "messages", "reply", "errors", "resyncs")
+
+    def __init__(self, action: str):
+        self.action = action
+        self.latency = 0.0
+        self.wire_bytes = 0
+        self.raw_bytes = 0
+        self.messages = 0
+        self.reply: Optional[str] = None
+        self.errors: List[str] = []
+        self.resyncs = 0
+
+    @property
+    def latency_ms(self) -> float:
+        return self.latency * 1000
+
+    @property
+    def outcome(self) -> str:
+        """``ok``, ``error`` (answered with an error) or ``timeout``"""
+        if self.reply is None:
+            return "error" if self.errors else "timeout"
+        return "error" if self.reply == "error" else "ok"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "action": self.action,
+            "latency_ms": round(self.latency_ms, 3),
+            "wire_bytes": self.wire_bytes,
+            "raw_bytes": self.raw_bytes,
+            "messages": self.messages,
+            "reply": self.reply,
+            "outcome": self.outcome,
+            "errors": self.errors,
+            "resyncs": self.resyncs
+        }
+
+
+class WidgetClient:
+    """
+    One virtual user's connection.
+
+    ``act`` sends an action and waits for its answer: a render or patch
+    for widget actions, ``meeting_scheduled``/``error`` for a booking. An
+    error on a widget action is kept and the render that may follow it
+    (e.g. after a slot was taken) is waited for, up to ``error_grace``.
+    """
+
+    def __init__(
+        self,
+        url: str = "ws://localhost:8000/",
+        session_id: Optional[str] = None,
+        compress: bool = True,
+        timeout: float = 10.0,
+        error_grace: float = 0.5
+    ):
+        self.url = url
+        self.session_id = session_id
+        self.compress = compress
+        self.timeout = timeout
+        self.error_grace = error_grace
+        self.widget: Optional[Dict[str, Any]] = None
+        self.version = 0
+        self.dictionary: Optional[PresetDictionary] = None
+        self.last_message: Optional[Dict[str, Any]] = None
+        self.resyncs = 0
+        self._ws = None
+
+    async def __aenter__(self) -> "WidgetClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _connect_url(self) -> str:
+        params = {}
+        if self.compress:
+            params["compress"] = "zdict"
+        if self.session_id:
+            params["session_id"] = self.session_id
+        return f"{self.url}?{urlencode(params)}" if params else self.url
+
+    async def connect_step(self) -> StepResult:
+        """Open the connection; timed up to the first render"""
+        step = StepResult("connect")
+        start = time.perf_counter()
+        try:
+            self._ws = await asyncio.wait_for(
+                websockets.connect(self._connect_url(), max_size=None), self.timeout
+            )
+            await self._await_reply(step, RENDER_REPLIES)
+        except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+            step.errors.append(f"{type(e).__name__}: {e}")
+        step.latency = time.perf_counter() - start
+        return step
+
+    async def act(self, action: str, **data) -> StepResult:
+        """Send an action (as the UI does) and wait for its answer"""
+        step = StepResult(action)
+        message = {"action": action, "session_id": self.session_id, "widget_version": self.version, **data}
+        start = time.perf_counter()
+        try:
+            await self._ws.send(json.dumps(message))
+            await self._await_reply(step, REPLIES.get(action, RENDER_REPLIES))
+        except websockets.exceptions.ConnectionClosed as e:
+            step.errors.append(f"connection closed ({e.rcvd.code if e.rcvd else 1006})")
+        step.latency = time.perf_counter() - start
+        return step
+
+    async def _await_reply(self, step: StepResult, replies):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                frame = await asyncio.wait_for(self._ws.recv(), remaining)
+            except asyncio.TimeoutError:
+                return
+            kind = self._receive(frame, step)
+            if kind in replies:
+                step.reply = kind
+                return
+            if kind == "error":
+                # Widget actions may still re-render after an error
+                deadline = min(deadline, time.monotonic() + self.error_grace)
+
+    def _receive(self, frame, step: StepResult) -> Optional[str]:
+        """Decode and apply one server message; returns its type"""
+        step.messages += 1
+        if isinstance(frame, bytes):
+            step.wire_bytes += len(frame)
+            if self.dictionary is None:
+                step.errors.append("compressed frame before dictionary")
+                self._request_resync(step)
+                return None
+            text = decode_frame(frame, self.dictionary)
+            step.raw_bytes += len(text.encode("utf-8"))
+        else:
+            text = frame
+            size = len(frame.encode("utf-8"))
+            step.wire_bytes += size
+            step.raw_bytes += size
+
+        data = json.loads(text)
+        kind = data.get("type")
+        self.last_message = data
+
+        if kind == "compression":
+            self.dictionary = PresetDictionary(base64.b64decode(data["dictionary"]))
+            if self.dictionary.id != data["dictionary_id"]:
+                step.errors.append("dictionary id mismatch")
+        elif kind == "widget_render":
+            self.widget = data["widget"]
+            self.version = data.get("version") or 0
+            self.session_id = data.get("session_id", self.session_id)
+        elif kind == "widget_patch":
+            if self.widget is None or data.get("base_version") != self.version:
+                self._request_resync(step)
+                return "resync"
+            try:
+                self.widget = apply_patch(self.widget, data["patch"])
+                self.version = data["version"]
+            except (KeyError, IndexError, ValueError):
+                self._request_resync(step)
+                return "resync"
+        elif kind == "error":
+            step.errors.append(data.get("message", ""))
+        return kind
+
+    def _request_resync(self, step: StepResult):
+        step.resyncs += 1
+        self.resyncs += 1
+        asyncio.ensure_future(self._ws.send(json.dumps({"action": "resync"})))
+
+    def options(self, prop: str) -> List[Dict[str, Any]]:
+        """Options of a widget property (date_selector, time_slots, timezone_list)"""
+        if not self.widget:
+            return []
+        return self.widget.get("properties", {}).get(prop, {}).get("options", [])
+
+    @property
+    def widget_type(self) -> Optional[str]:
+        return self.widget.get("widget_type") if self.widget else None
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+
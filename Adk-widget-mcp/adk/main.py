@@ -3,24 +3,89 @@ WebSocket Server with Google ADK Agent
 Handles real-time communication with React UI using intelligent agent
 """
 import asyncio
+import functools
 import json
 import os
+import signal
+import time
 import websockets
-from typing import Set
+from datetime import date
+from typing import Dict, List, Optional, Set
+from urllib.parse import parse_qs, urlparse
 from websockets.server import WebSocketServerProtocol
 
-from session_manager import get_session_manager
+from session_manager import DEFAULT_CONTEXT, get_session_manager
+from session_snapshot import SnapshotError, restore_sessions, snapshot_sessions
 from adk_agent import get_adk_agent
+from action_queue import ActionQueue
+from compression import FrameCompressor, PresetDictionary, build_dictionary
+from json_patch import WidgetDeltaEncoder
+from outbound import OutboundQueue
+from reservations import get_reservation_store, slot_key
+from session_hub import SessionHub
+from session_store import configured_store_url, is_shared_store_url
+from speculative import SpeculativeRenderer
+from supervisor import Supervisor, supports_reuse_port
+from tracing import KIND_SERVER, current_span, get_tracer
+from tz_service import get_timezone_service, parse_value
+from widget_populator import get_widget_populator
+from widget_validator import WidgetValidator
+
+
+class WidgetServerProtocol(WebSocketServerProtocol):
+    """
+    Negotiates permessage-deflate per connection: clients that opted in to
+    dictionary-compressed frames (?compress=zdict) don't get it, since
+    deflating those again costs CPU for nothing. Everyone else keeps it.
+    """
+    
+    def __init__(self, *args, frame_compression: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.frame_compression = frame_compression
+        self.zdict = False
+    
+    async def process_request(self, path, request_headers):
+        query = parse_qs(urlparse(path).query)
+        self.zdict = self.frame_compression and query.get("compress", [None])[0] == "zdict"
+        return await super().process_request(path, request_headers)
+    
+    def process_extensions(self, headers, available_extensions):
+        return super().process_extensions(headers, None if self.zdict else available_extensions)
 
 
 class WebSocketServer:
     """WebSocket server with Google ADK Agent integration"""
     
-    def __init__(self, host: str = "localhost", port: int = 8000):
+    def __init__(self, host: str = "localhost", port: int = 8000, reuse_port: bool = False):
         self.host = host
         self.port = port
+        self.reuse_port = reuse_port
         self.clients: Set[WebSocketServerProtocol] = set()
+        self.delta_encoders: Dict[WebSocketServerProtocol, WidgetDeltaEncoder] = {}
+        self.action_queues: Dict[WebSocketServerProtocol, ActionQueue] = {}
+        self.outbound: Dict[WebSocketServerProtocol, OutboundQueue] = {}
+        self.hub = SessionHub()
+        self.draining = False
+        self.in_flight = 0
+        self.snapshot_path = self._snapshot_path(os.getenv("SESSION_SNAPSHOT"))
+        self.outbound_max_depth = int(os.getenv("OUTBOUND_MAX_DEPTH", "16"))
+        self.slow_client_seconds = float(os.getenv("SLOW_CLIENT_SECONDS", "10"))
         self.session_manager = get_session_manager()
+        # Sessions with a connection open are never evicted for memory
+        self.session_manager.in_use = self.hub.subscriber_count
+        self.tracer = get_tracer()
+        self.compressor = None
+        if os.getenv("WIDGET_COMPRESSION", "1") != "0":
+            self.compressor = FrameCompressor(
+                threshold=int(os.getenv("COMPRESSION_THRESHOLD", "64")),
+                level=int(os.getenv("COMPRESSION_LEVEL", "6"))
+            )
+        self.reservations = get_reservation_store()
+        
+        # Schemas are compiled here, once; 0 < rate < 1 samples renders to bound CPU
+        self.validator = WidgetValidator(
+            sample_rate=float(os.getenv("WIDGET_VALIDATION_SAMPLE_RATE", "1.0"))
+        )
         
         # Initialize Google ADK Agent
         api_key = os.getenv("GOOGLE_API_KEY")
@@ -30,30 +95,88 @@ class WebSocketServer:
         
         self.agent = get_adk_agent(api_key=api_key)
         print("🤖 Google ADK Agent initialized")
+        
+        # Pre-render likely next widgets in the background
+        self.speculative = None
+        if os.getenv("SPECULATIVE_RENDER", "1") != "0":
+            self.speculative = SpeculativeRenderer(
+                self.agent,
+                max_entries_per_session=int(os.getenv("SPECULATIVE_MAX_PER_SESSION", "16")),
+                max_total_bytes=int(os.getenv("SPECULATIVE_MAX_BYTES", str(32 * 1024 * 1024)))
+            )
     
     async def handle_client(self, websocket: WebSocketServerProtocol):
         """Handle individual client connection"""
         print(f"✅ Client connected from {websocket.remote_address}")
         self.clients.add(websocket)
+        self.delta_encoders[websocket] = WidgetDeltaEncoder()
+        query = self._query(websocket)
+        compress = self.compressor is not None and query.get("compress") == "zdict"
+        outbound = OutboundQueue(
+            websocket,
+            self.delta_encoders[websocket],
+            max_depth=self.outbound_max_depth,
+            slow_client_seconds=self.slow_client_seconds,
+            compressor=self.compressor if compress else None
+        )
+        self.outbound[websocket] = outbound
+        outbound.start()
         session_id = None
         
         try:
-            # Create session
-            session_id = self.session_manager.create_session()
-            print(f"📝 Created session: {session_id}")
-            
-            # Get initial widget from agent
-            session = self.session_manager.get_session(session_id)
-            response = await self.agent.process_user_action(
-                action="connect",
-                session_context=session["context"]
-            )
-            
-            await self._send_response(websocket, session_id, response)
+            # Connect (or resume) is the root span of its own trace
+            with self.tracer.start_span("ws.connect", kind=KIND_SERVER) as span:
+                # Resume the client's session (possibly from another worker) or create one
+                session_id = query.get("session_id")
+                session = await self.session_manager.load_session(session_id) if session_id else None
+                if session:
+                    print(f"🔁 Resumed session: {session_id}")
+                    await self._hold_selected_slot(session_id, session["context"])
+                else:
+                    session_id = self.session_manager.create_session()
+                    attendees = self._attendees(query.get("attendees"))
+                    if attendees:
+                        # Calendars whose common free time the widget offers
+                        self.session_manager.update_session(session_id, {
+                            "context": {"attendees": attendees}
+                        })
+                    session = self.session_manager.get_session(session_id)
+                    print(f"📝 Created session: {session_id}")
+                span.set_attribute("session.id", session_id)
+                subscribers = self.hub.join(session_id, outbound)
+                if subscribers > 1:
+                    print(f"👥 Joined session {session_id} ({subscribers} connections)")
+                
+                if compress:
+                    await self._refresh_dictionary(session["context"])
+                
+                # Get initial widget from agent (for this connection only)
+                response = await self.agent.process_user_action(
+                    action="connect",
+                    session_context=session["context"]
+                )
+                
+                await self._send_response(websocket, session_id, response, fan_out=False)
+                if self.speculative is not None:
+                    self.speculative.schedule(session_id, session["context"], response)
             
-            # Handle incoming messages
-            async for message in websocket:
-                await self.handle_message(websocket, message, session_id)
+            # Read into the per-connection queue; process strictly in order
+            queue = ActionQueue()
+            self.action_queues[websocket] = queue
+            reader = asyncio.create_task(self._read_messages(websocket, queue))
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        break
+                    self.in_flight += 1
+                    try:
+                        await self.handle_message(websocket, item[1], session_id)
+                    finally:
+                        self.in_flight -= 1
+            finally:
+                reader.cancel()
+            print(f"❌ Client disconnected ({queue.stats()})")
         
         except websockets.exceptions.ConnectionClosed:
             print(f"❌ Client disconnected")
@@ -63,26 +186,134 @@ class WebSocketServer:
             traceback.print_exc()
         finally:
             self.clients.remove(websocket)
+            await outbound.close()
+            print(f"📤 Outbound stats: {outbound.stats()}")
+            self.outbound.pop(websocket, None)
+            self.delta_encoders.pop(websocket, None)
+            self.action_queues.pop(websocket, None)
             if session_id:
-                self.session_manager.delete_session(session_id)
-                print(f"🗑️  Deleted session: {session_id}")
+                # Other tabs keep the session (and its slot hold) alive
+                remaining = self.hub.leave(session_id, outbound)
+                if remaining:
+                    print(f"👥 Left session {session_id} ({remaining} connections remain)")
+                else:
+                    if self.speculative is not None:
+                        self.speculative.drop_session(session_id)
+                    await asyncio.to_thread(self.reservations.release, session_id)
+                    self.session_manager.release_session(session_id)
+                    print(f"🗑️  Released session: {session_id}")
+    
+    @staticmethod
+    def _query(websocket: WebSocketServerProtocol) -> Dict[str, str]:
+        """Connection URL options (ws://host:port/?session_id=...&compress=zdict&attendees=a,b)"""
+        query = parse_qs(urlparse(websocket.path).query)
+        return {key: values[0] for key, values in query.items()}
+    
+    @staticmethod
+    def _attendees(value: Optional[str]) -> List[str]:
+        """Attendee calendar ids from a comma-separated list"""
+        if not value:
+            return []
+        return sorted({attendee.strip() for attendee in value.split(",") if attendee.strip()})
+    
+    async def _refresh_dictionary(self, context: dict):
+        """(Re)build the preset dictionary when the schema registry changes"""
+        current = self.compressor.dictionary
+        if current is not None and current.source_version == self.agent.schema_cache.registry_version:
+            return
+        
+        # Real renders of each widget, most frequent last
+        samples = []
+        connect = None
+        for action in ("change_timezone", "connect"):
+            response = await self.agent.render_action(action, dict(context))
+            if response is not None and response.get("type") == "widget_render":
+                sample = WidgetDeltaEncoder().encode("", response["widget"], response.get("widget_json"))
+                samples.append(sample.encode("utf-8"))
+                connect = response if action == "connect" else connect
+        if not samples:
+            return
+        
+        # Most clicks go out as patches: end with a date pick's patch so they compress best
+        dates = connect["widget"].get("properties", {}).get("date_selector", {}).get("options") if connect else []
+        date_value = next((option["value"] for option in dates or () if not option.get("selected")), None)
+        if date_value:
+            picked = await self.agent.render_action("select_date", {**context, "selected_date_value": date_value})
+            if picked is not None and picked.get("type") == "widget_render":
+                encoder = WidgetDeltaEncoder()
+                encoder.encode("", connect["widget"], connect.get("widget_json"))
+                samples.append(encoder.encode("", picked["widget"], picked.get("widget_json")).encode("utf-8"))
+        
+        dictionary = PresetDictionary(build_dictionary(samples), self.agent.schema_cache.registry_version)
+        if current is None or dictionary.id != current.id:
+            self.compressor.set_dictionary(dictionary)
+            print(f"🗜️  Compression dictionary {dictionary.id:08x} ({len(dictionary.data)} bytes)")
+        else:
+            current.source_version = dictionary.source_version
+    
+    async def _read_messages(self, websocket: WebSocketServerProtocol, queue: ActionQueue):
+        """Feed incoming messages into the action queue, coalescing rapid clicks"""
+        try:
+            async for message in websocket:
+                # Sessions are being handed off; the client will reconnect
+                if self.draining:
+                    continue
+                if not queue.put(message):
+                    print("⚠️  Action queue full, dropping message")
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            # Connection is gone - nothing left to render for
+            queue.close(discard=True)
     
     async def handle_message(self, websocket: WebSocketServerProtocol, message: str, session_id: str):
-        """Handle incoming message from client"""
+        """Handle incoming message from client (root span of the action's trace)"""
+        with self.tracer.start_span("ws.handle_message", {"session.id": session_id}, kind=KIND_SERVER):
+            await self._handle_message(websocket, message, session_id)
+    
+    async def _handle_message(self, websocket: WebSocketServerProtocol, message: str, session_id: str):
         try:
             data = json.loads(message)
             action = data.get("action")
+            current_span().set_attribute("widget.action", action)
             
             print(f"📨 Received action: {action}")
             
-            # Get current session
-            session = self.session_manager.get_session(session_id)
+            # Client is out of sync with our last widget - next send is a full render
+            encoder = self.delta_encoders[websocket]
+            encoder.check_client_version(data.get("widget_version"))
+            
+            if action == "resync":
+                if encoder.last_widget is not None:
+                    widget = encoder.last_widget
+                    encoder.reset()
+                    await self._send_response(websocket, session_id, {
+                        "type": "widget_render",
+                        "widget": widget
+                    }, fan_out=False)
+                return
+            
+            # Get current session (with any change another worker made to it)
+            session = await self.session_manager.load_session(session_id)
             if not session:
                 print(f"❌ Session not found: {session_id}")
                 return
             
+            # Record the turn (bounded ring buffer, compacted when full)
+            self.session_manager.update_session(session_id, {
+                "conversation_history": [{"action": action, "data": data}]
+            })
+            
             # Update session context based on action
             if action == "select_date":
+                # Only a date the widget offers; anything else would break every later render
+                if not get_widget_populator().is_offered_date(data.get("date"), session["context"].get("attendees")):
+                    print(f"❌ Date not offered: {data.get('date')!r}")
+                    await self._send_response(websocket, session_id, {
+                        "type": "error",
+                        "message": "That date is not available. Please pick one of the listed dates."
+                    })
+                    return
                 self.session_manager.update_session(session_id, {
                     "context": {
                         "selected_date_value": data.get("date"),
@@ -102,18 +333,57 @@ class WebSocketServer:
                 session = self.session_manager.get_session(session_id)
                 print(f"⏰ Time selected: {data.get('time')}")
             
+            elif action == "submit_schedule":
+                context = session["context"]
+                if not (context.get("selected_date_value") and context.get("selected_time_value")):
+                    await self._send_response(websocket, session_id, {
+                        "type": "error",
+                        "message": "Please select both a date and a time"
+                    })
+                    return
+                reservation = await asyncio.to_thread(
+                    self.reservations.confirm,
+                    slot_key(
+                        context.get("selected_date_value"),
+                        context.get("selected_time_value"),
+                        context.get("attendees")
+                    ),
+                    session_id,
+                    {
+                        "date": context.get("selected_date"),
+                        "time": context.get("selected_time"),
+                        "timezone": context.get("timezone")
+                    }
+                )
+                if reservation is None:
+                    await self._slot_taken(websocket, session_id)
+                    return
+                data = {**data, "booking_id": reservation.booking_id}
+                print(f"✅ Booked slot {reservation.key} ({reservation.booking_id})")
+            
             elif action == "confirm_timezone":
                 # Get timezone details
-                from widget_populator import get_widget_populator
                 tz_abbr = data.get("timezone")
                 tz_details = get_widget_populator().get_timezone_by_abbr(tz_abbr)
                 
+                context_update = {
+                    "timezone": tz_details["label"],
+                    "timezone_abbr": tz_details["value"],
+                    "current_action": None
+                }
+                
+                # Convert the selected time's label into the new timezone
+                context = session["context"]
+                if context.get("selected_date_value") and context.get("selected_time_value"):
+                    slot = get_timezone_service().render_slots(
+                        date.fromisoformat(context["selected_date_value"]),
+                        [parse_value(context["selected_time_value"])],
+                        tz_details["value"]
+                    )[0]
+                    context_update["selected_time"] = slot["label"]
+                
                 self.session_manager.update_session(session_id, {
-                    "context": {
-                        "timezone": tz_details["label"],
-                        "timezone_abbr": tz_details["value"],
-                        "current_action": None
-                    }
+                    "context": context_update
                 })
                 session = self.session_manager.get_session(session_id)
                 print(f"🌍 Timezone changed to: {tz_details['label']}")
@@ -126,66 +396,147 @@ class WebSocketServer:
                 print("🌍 Timezone change requested (follow-up action)")
             
             elif action == "close_widget":
-                await websocket.send(json.dumps({
+                self.outbound[websocket].put_text(json.dumps({
                     "type": "closed",
                     "message": "Widget closed"
                 }))
                 return
             
+            # Hold the slot as soon as both date and time are picked
+            if action in ("select_date", "select_time"):
+                if not await self._hold_selected_slot(session_id, session["context"]):
+                    await self._slot_taken(websocket, session_id)
+                    return
+            
+            # Serve a pre-rendered widget if we predicted this action
+            response = None
+            if self.speculative is not None:
+                response = self.speculative.take(session_id, action, session["context"])
+            
             # Let agent process the action
-            response = await self.agent.process_user_action(
-                action=action,
-                session_context=session["context"],
-                data=data
-            )
+            if response is None:
+                response = await self.agent.process_user_action(
+                    action=action,
+                    session_context=session["context"],
+                    data=data
+                )
             
             await self._send_response(websocket, session_id, response)
+            if self.speculative is not None:
+                self.speculative.schedule(session_id, session["context"], response)
         
         except json.JSONDecodeError:
             print(f"❌ Invalid JSON: {message}")
         except Exception as e:
+            current_span().set_error(str(e))
             print(f"❌ Error handling message: {e}")
             import traceback
             traceback.print_exc()
     
+    async def _hold_selected_slot(self, session_id: str, context: dict) -> bool:
+        """Hold the selected date/time for this session; False if already taken"""
+        date_value = context.get("selected_date_value")
+        time_value = context.get("selected_time_value")
+        if not (date_value and time_value):
+            return True
+        # A shared store is a round trip per call; keep it off the event loop
+        return await asyncio.to_thread(
+            self.reservations.hold,
+            slot_key(date_value, time_value, context.get("attendees")),
+            session_id
+        )
+    
+    async def _slot_taken(self, websocket: WebSocketServerProtocol, session_id: str):
+        """Tell the client the slot is gone, clear the time and re-render"""
+        print("⛔ Slot already reserved by another session")
+        await asyncio.to_thread(self.reservations.release, session_id)
+        self.session_manager.update_session(session_id, {
+            "context": {"selected_time_value": None, "selected_time": None}
+        })
+        await self._send_response(websocket, session_id, {
+            "type": "error",
+            "message": "That time was just booked by someone else. Please pick another slot."
+        })
+        
+        session = self.session_manager.get_session(session_id)
+        response = await self.agent.process_user_action(
+            action="refresh",
+            session_context=session["context"]
+        )
+        await self._send_response(websocket, session_id, response)
+    
     async def _send_response(
         self,
         websocket: WebSocketServerProtocol,
         session_id: str,
-        response: dict
+        response: dict,
+        fan_out: bool = True
     ):
-        """Send response to client"""
+        """
+        Queue response for the sender tasks. Renders and results go to
+        every connection on the session unless ``fan_out`` is off; errors
+        only to the connection that caused them.
+        """
         response_type = response.get("type")
         
         if response_type == "widget_render":
-            await websocket.send(json.dumps({
-                "type": "widget_render",
-                "session_id": session_id,
-                "widget": response["widget"]
-            }))
+            # A queued action will render again - this one is already stale
+            queue = self.action_queues.get(websocket)
+            if queue is not None and queue.render_superseded():
+                queue.dropped_renders += 1
+                return
+            
+            # Never let a malformed widget reach the UI
+            error = self.validator.validate(response["widget"])
+            if error is not None:
+                print(f"❌ Widget failed validation: {error}")
+                current_span().set_attribute("widget.invalid", error)
+                self.outbound[websocket].put_text(json.dumps({
+                    "type": "error",
+                    "session_id": session_id,
+                    "message": "The widget could not be displayed"
+                }))
+                return
+            
+            # Full render or widget_patch, encoded by the sender task
+            if fan_out:
+                self.hub.publish_widget(session_id, response["widget"], response.get("widget_json"))
+            else:
+                self.hub.send_private(
+                    session_id,
+                    self.outbound[websocket],
+                    response["widget"],
+                    response.get("widget_json")
+                )
         
         elif response_type == "meeting_scheduled":
-            await websocket.send(json.dumps({
+            self._send_text(websocket, session_id, json.dumps({
                 "type": "meeting_scheduled",
                 "session_id": session_id,
                 "meeting": response["meeting"],
                 "message": response["message"]
-            }))
+            }), fan_out)
         
         elif response_type == "agent_message":
-            await websocket.send(json.dumps({
+            self._send_text(websocket, session_id, json.dumps({
                 "type": "message",
                 "session_id": session_id,
                 "message": response["message"]
-            }))
+            }), fan_out)
         
         elif response_type == "error":
-            await websocket.send(json.dumps({
+            self.outbound[websocket].put_text(json.dumps({
                 "type": "error",
                 "session_id": session_id,
                 "message": response.get("message", "An error occurred")
             }))
     
+    def _send_text(self, websocket: WebSocketServerProtocol, session_id: str, text: str, fan_out: bool):
+        if fan_out:
+            self.hub.publish_text(session_id, text)
+        else:
+            self.outbound[websocket].put_text(text)
+    
     async def cleanup_task(self):
         """Background task to cleanup expired sessions"""
         while True:
@@ -193,11 +544,161 @@ class WebSocketServer:
             cleaned = self.session_manager.cleanup_expired_sessions()
             if cleaned > 0:
                 print(f"🧹 Cleaned up {cleaned} expired sessions")
+            
+            purged = await asyncio.to_thread(self.session_manager.purge_store)
+            if purged > 0:
+                print(f"🧹 Purged {purged} expired sessions from the store")
+            
+            expired_holds = await asyncio.to_thread(self.reservations.purge_expired)
+            if expired_holds > 0:
+                print(f"🧹 Released {expired_holds} expired slot holds")
+            
+            if self.speculative is not None:
+                spec_stats = self.speculative.stats()
+                print(
+                    f"📊 Speculative renders: {spec_stats['hit_rate']:.1%} hit rate "
+                    f"({spec_stats['hits']} hits, {spec_stats['entries']} cached, "
+                    f"{spec_stats['bytes'] / 1024:.0f} KB)"
+                )
+            
+            if self.tracer.enabled:
+                print(f"📊 Tracing: {self.tracer.stats()}")
+            
+            if self.compressor is not None and self.compressor.compressed:
+                comp_stats = self.compressor.stats()
+                print(
+                    f"📊 Compression: {comp_stats['ratio']:.2f}x "
+                    f"({comp_stats['compressed']}/{comp_stats['messages']} messages compressed, "
+                    f"{comp_stats['us_per_compressed']:.0f} µs CPU each)"
+                )
+            
+            prompt_stats = self.agent.prompt_builder.stats()
+            if prompt_stats["calls"]:
+                print(
+                    f"📊 Prompts ({prompt_stats['variant']}): {prompt_stats['avg_tokens_per_call']:.0f} tokens/call "
+                    f"({prompt_stats['calls']} calls, {prompt_stats['trimmed']} trimmed, "
+                    f"{prompt_stats['over_budget']} over budget)"
+                )
+            
+            validation = self.validator.stats()
+            if validation["checked"]:
+                print(
+                    f"📊 Widget validation: {validation['failures']} failures in {validation['checked']} checked "
+                    f"({validation['skipped']} unsampled, {validation['us_per_check']:.0f} µs each)"
+                )
+            
+            hub_stats = self.hub.stats()
+            if hub_stats["shared_sessions"]:
+                print(
+                    f"📊 Shared sessions: {hub_stats['shared_sessions']} "
+                    f"(peak {hub_stats['peak_subscribers']} connections, {hub_stats['fanout']:.2f} sends/render)"
+                )
+            
+            llm_stats = self.agent.response_cache.stats()
+            if llm_stats["actions"]:
+                print(
+                    f"📊 LLM response cache: {llm_stats['hit_ratio']:.1%} hit ratio "
+                    f"({llm_stats['hits']} hits, {llm_stats['coalesced']} coalesced, "
+                    f"{llm_stats['misses']} misses, {llm_stats['entries']} cached)"
+                )
+            
+            cache_stats = self.agent.schema_cache.stats()
+            print(
+                f"📊 Schema cache: {cache_stats['hit_rate']:.1%} hit rate "
+                f"({cache_stats['hits']} fresh, {cache_stats['revalidations']} revalidated, "
+                f"{cache_stats['misses']} misses)"
+            )
+    
+    async def reservation_sync_task(self):
+        """Pick up bookings other workers made, so their slots stop being offered"""
+        interval = float(os.getenv("RESERVATION_SYNC_SECONDS", "2"))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.reservations.sync)
+            except Exception as e:
+                print(f"⚠️  Reservation sync failed: {e}")
+    
+    @staticmethod
+    def _snapshot_path(path):
+        """One snapshot file per worker when running under the supervisor"""
+        if not path:
+            return None
+        index = os.getenv("ADK_WORKER_INDEX")
+        return f"{path}.{index}" if index is not None else path
+    
+    async def load_snapshot(self):
+        """Adopt the sessions handed off by the previous process, if any"""
+        if not self.snapshot_path:
+            return
+        # The old process writes the snapshot once it has stopped listening
+        deadline = time.monotonic() + float(os.getenv("SESSION_SNAPSHOT_WAIT", "0"))
+        while not os.path.exists(self.snapshot_path) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        if not os.path.exists(self.snapshot_path):
+            return
+        
+        try:
+            loaded, expired, seconds = restore_sessions(self.session_manager, self.snapshot_path, self.reservations)
+        except (OSError, SnapshotError) as e:
+            print(f"⚠️  Ignoring session snapshot {self.snapshot_path}: {e}")
+            return
+        # Handed off once; a later restart must not resurrect these
+        os.remove(self.snapshot_path)
+        print(f"📥 Loaded {loaded} sessions from snapshot in {seconds * 1000:.0f} ms ({expired} expired)")
+    
+    async def drain(self, server):
+        """
+        SIGTERM: stop accepting connections, let in-flight actions finish,
+        snapshot the sessions for the next process and close every client
+        with 1012 (service restart) so it reconnects with its session_id.
+        With neither a snapshot nor a shared store the sessions end here,
+        so clients get 1001 (going away) instead.
+        """
+        print("🛑 Draining: no longer accepting connections")
+        self.draining = True
+        server.close(close_connections=False)
+        
+        deadline = time.monotonic() + float(os.getenv("DRAIN_TIMEOUT", "5"))
+        while time.monotonic() < deadline and (
+            self.in_flight or any(len(queue) for queue in self.action_queues.values())
+        ):
+            await asyncio.sleep(0.05)
+        
+        # The next process reads sessions from the store
+        await asyncio.to_thread(self.session_manager.flush)
+        
+        if self.snapshot_path:
+            count, size, seconds = snapshot_sessions(self.session_manager, self.snapshot_path, self.reservations)
+            print(
+                f"💾 Snapshot of {count} sessions ({size / 1024:.0f} KB) written to "
+                f"{self.snapshot_path} in {seconds * 1000:.0f} ms"
+            )
+        
+        if self.snapshot_path or is_shared_store_url(configured_store_url()):
+            code, reason = 1012, "server restarting"
+        else:
+            code, reason = 1001, "server shutting down"
+        await asyncio.gather(
+            *(websocket.close(code, reason) for websocket in list(self.clients)),
+            return_exceptions=True
+        )
     
     async def start(self):
         """Start the WebSocket server"""
+        if self.snapshot_path:
+            # Replacing a running process: spawn the MCP pool and fill the
+            # schema cache while the old one still serves, then adopt its
+            # sessions, all before accepting any traffic
+            try:
+                await self.agent.render_action("connect", dict(DEFAULT_CONTEXT))
+            except Exception as e:
+                print(f"⚠️  Warm-up failed: {e}")
+            await self.load_snapshot()
+        
         # Start cleanup task
         asyncio.create_task(self.cleanup_task())
+        asyncio.create_task(self.reservation_sync_task())
         
         print("="*60)
         print("🚀 ADK WebSocket Server with Google Gemini Agent")
@@ -205,7 +706,9 @@ class WebSocketServer:
         print(f"📡 Server: ws://{self.host}:{self.port}")
         print(f"🤖 Agent: Gemini 2.0 Flash")
         print(f"🔧 Tools: MCP Widget Schemas")
-        print(f"💾 Sessions: In-memory storage")
+        store = self.session_manager.store
+        print(f"💾 Sessions: {type(store).__name__ if store else 'In-memory storage'}")
+        print(f"📅 Reservations: {type(self.reservations).__name__}")
         print("="*60)
         
         if not os.getenv("GOOGLE_API_KEY"):
@@ -213,16 +716,53 @@ class WebSocketServer:
             print("   To enable full agent: export GOOGLE_API_KEY='your-key'")
             print("="*60)
         
-        async with websockets.serve(self.handle_client, self.host, self.port):
-            await asyncio.Future()  # Run forever
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, stop.set)
+        except NotImplementedError:
+            # Windows event loops have no signal handlers
+            signal.signal(signal.SIGTERM, lambda signum, frame: loop.call_soon_threadsafe(stop.set))
+        
+        async with websockets.serve(
+            self.handle_client,
+            self.host,
+            self.port,
+            reuse_port=self.reuse_port,
+            create_protocol=functools.partial(
+                WidgetServerProtocol, frame_compression=self.compressor is not None
+            )
+        ) as server:
+            await stop.wait()  # Run until SIGTERM
+            await self.drain(server)
 
 
-async def main():
+async def main(reuse_port: bool = False):
     """Main entry point"""
-    server = WebSocketServer()
+    server = WebSocketServer(
+        host=os.getenv("ADK_HOST", "localhost"),
+        port=int(os.getenv("ADK_PORT", "8000")),
+        reuse_port=reuse_port
+    )
     await server.start()
 
 
+def run_worker():
+    """One of several processes sharing the port"""
+    asyncio.run(main(reuse_port=True))
+
+
 if __name__ == "__main__":
     print("\n🎯 Starting ADK Server with Google Gemini Agent...\n")
-    asyncio.run(main())
+    workers = int(os.getenv("ADK_WORKERS", "1"))
+    if workers > 1 and not is_shared_store_url(configured_store_url()):
+        # Workers would each hold their own slots and could double-book
+        print("⚠️  ADK_WORKERS > 1 needs a sqlite:// or redis:// SESSION_STORE, running a single process")
+        workers = 1
+    if workers > 1 and supports_reuse_port():
+        print(f"👥 Supervisor mode: {workers} workers on port {os.getenv('ADK_PORT', '8000')}")
+        Supervisor(run_worker, workers).run()
+    else:
+        if workers > 1:
+            print("⚠️  SO_REUSEPORT not supported here, running a single process")
+        asyncio.run(main())
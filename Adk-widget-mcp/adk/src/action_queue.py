@@ -0,0 +1,96 @@
+"""
+Action Queue for ADK
+Ordered per-connection action pipeline that coalesces superseded clicks
+"""
+import asyncio
+import json
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+# Actions where only the latest of a run matters
+COALESCIBLE_ACTIONS = {
+    "select_date", "select_time", "change_timezone", "confirm_timezone",
+    "cancel_timezone", "resync"
+}
+
+# Actions whose response is a widget render that supersedes earlier ones
+RENDER_ACTIONS = {
+    "select_date", "select_time", "change_timezone", "confirm_timezone",
+    "cancel_timezone", "resync"
+}
+
+
+class ActionQueue:
+    """
+    FIFO of raw client messages for one connection.
+
+    A new message replaces the queued tail when both are the same
+    coalescible action, so five quick ``select_date`` clicks collapse into
+    the last one. Actions of different kinds are never reordered or merged:
+    ``select_date, select_time, select_date`` stays three actions.
+    """
+
+    def __init__(self, max_pending: int = 64):
+        self.max_pending = max_pending
+        self.coalesced = 0
+        self.dropped = 0
+        self.dropped_renders = 0
+        self._items: deque = deque()
+        self._event = asyncio.Event()
+        self._closed = False
+
+    @staticmethod
+    def _action_of(message: str) -> Optional[str]:
+        try:
+            data = json.loads(message)
+        except (json.JSONDecodeError, TypeError):
+            return None
+        return data.get("action") if isinstance(data, dict) else None
+
+    def put(self, message: str) -> bool:
+        """Enqueue a message; returns False if it was dropped"""
+        action = self._action_of(message)
+
+        if self._items and action in COALESCIBLE_ACTIONS and self._items[-1][0] == action:
+            self._items[-1] = (action, message)
+            self.coalesced += 1
+            return True
+
+        if len(self._items) >= self.max_pending:
+            self.dropped += 1
+            return False
+
+        self._items.append((action, message))
+        self._event.set()
+        return True
+
+    def close(self, discard: bool = False):
+        """No more messages will arrive; ``discard`` drops what is still queued"""
+        if discard:
+            self._items.clear()
+        self._closed = True
+        self._event.set()
+
+    async def get(self) -> Optional[Tuple[Optional[str], str]]:
+        """Next (action, message), or None once closed and drained"""
+        while not self._items:
+            if self._closed:
+                return None
+            self._event.clear()
+            await self._event.wait()
+        return self._items.popleft()
+
+    def render_superseded(self) -> bool:
+        """True if a queued action will produce a newer widget render"""
+        return any(action in RENDER_ACTIONS for action, _ in self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._items),
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "dropped_renders": self.dropped_renders
+        }
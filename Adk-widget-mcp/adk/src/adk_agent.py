@@ -14,6 +14,8 @@ try:
     from google.adk.agents import LlmAgent
     from google.adk.tools import FunctionTool
     from google.adk import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
     ADK_AVAILABLE = True
 except ImportError:
     print("⚠️  Google ADK not installed. Run: pip install google-adk")
@@ -21,158 +23,54 @@ except ImportError:
     LlmAgent = None
     FunctionTool = None
     Runner = None
+    InMemorySessionService = None
+    types = None
+
+APP_NAME = "adk_widget_server"
+# Every model run gets a throwaway ADK session under this user; the
+# prompt already carries the widget session's state
+LLM_USER_ID = "widget-server"
 
 from mcp_client import get_mcp_client
+from prompt_builder import Prompt, PromptBudgetError, PromptBuilder
+from response_cache import ResponseCache, parse_actions
+from schema_cache import SchemaCache
 from widget_populator import get_widget_populator
-
-
-# System instruction for the agent
-SYSTEM_INSTRUCTION = """You are an intelligent meeting scheduling assistant powered by Google ADK.
-
-YOUR ROLE:
-- Help users schedule meetings by providing appropriate widgets
-- Understand user intent from their messages and actions
-- Call MCP tools to fetch widget schemas
-- Maintain conversation context across multiple turns
-- Handle follow-up actions intelligently
-
-AVAILABLE MCP TOOLS:
-1. get_schedule_meeting_widget() - Returns the schedule meeting widget schema
-2. get_timezone_selector_widget() - Returns the timezone selector widget schema
-3. list_available_widgets() - Lists all available widget types
-
-YOUR WORKFLOW:
-
-1. INITIAL CONNECTION (action: "connect"):
-   - User has just connected to the meeting scheduler
-   - Call get_schedule_meeting_widget() to fetch the main scheduling interface
-   - The widget will be populated with next 5 business days and available time slots
-   - Current timezone from session context will be displayed
-
-2. DATE SELECTION (action: "select_date"):
-   - User has selected a date from the available options
-   - The selected date is stored in session context
-   - Call get_schedule_meeting_widget() to refresh and show the selection highlighted
-   - Keep the "Schedule meeting" button disabled until BOTH date and time are selected
-
-3. TIME SELECTION (action: "select_time"):
-   - User has selected a time slot
-   - The selected time is stored in session context
-   - Call get_schedule_meeting_widget() to refresh the widget
-   - NOW enable the "Schedule meeting" button since both date AND time are selected
-
-4. TIMEZONE CHANGE (action: "change_timezone") - **FOLLOW-UP ACTION**:
-   - User clicked "CHANGE TIME ZONE" link - this is a FOLLOW-UP action
-   - This is CRITICAL: User wants to switch to timezone selector temporarily
-   - Call get_timezone_selector_widget() to show timezone options
-   - IMPORTANT: The user's current date and time selections MUST be preserved in session!
-   - Mark current timezone as selected in the widget
-   - After timezone selection, user will return to schedule meeting widget
-
-5. TIMEZONE CONFIRMATION (action: "confirm_timezone"):
-   - User selected a new timezone and clicked "Confirm"
-   - Session context is updated with new timezone (e.g., from ET to PT)
-   - Call get_schedule_meeting_widget() to return to scheduling interface
-   - CRITICAL: RESTORE the user's previous date and time selections from session!
-   - Update time slot labels to show new timezone (e.g., "1:45 PM PT" instead of "1:45 PM ET")
-   - Keep both date and time still selected
-   - Keep "Schedule meeting" button enabled if both were selected before
-
-6. TIMEZONE CANCELLATION (action: "cancel_timezone"):
-   - User clicked "Cancel" on timezone selector
-   - No changes to session context - timezone stays the same
-   - Call get_schedule_meeting_widget() to return to scheduling interface
-   - Keep all previous selections intact
-
-7. MEETING SUBMISSION (action: "submit_schedule"):
-   - User clicked "Schedule meeting" button
-   - Both date and time must be selected (validated)
-   - Extract meeting details from session context
-   - Confirm the meeting is scheduled with full details
-
-SESSION CONTEXT STRUCTURE:
-The session context contains critical information you must preserve:
-{
-  "timezone": "Eastern Time (ET)",           // Current timezone full name
-  "timezone_abbr": "ET",                     // Timezone abbreviation
-  "selected_date": "TUE Sep 23",            // User's selected date (display)
-  "selected_date_value": "2024-09-23",      // Date value for processing
-  "selected_time": "1:45 PM ET",            // User's selected time (display)
-  "selected_time_value": "13:45",           // Time value for processing
-  "current_action": null or "selecting_timezone"  // Current flow state
-}
-
-CRITICAL RULES - MUST FOLLOW:
-
-1. ALWAYS preserve session context during widget transitions
-   - When switching from schedule widget to timezone selector, keep date/time
-   - When returning from timezone selector, restore date/time selections
-
-2. When user changes timezone:
-   - Their date and time selections MUST be preserved
-   - Only the timezone label changes (e.g., "1:45 PM ET" → "1:45 PM PT")
-   - The actual time value stays the same
-   - Both selections remain highlighted in the widget
-
-3. Enable "Schedule meeting" button ONLY when:
-   - Both date AND time are selected
-   - Never enable with just one selection
-
-4. For follow-up actions:
-   - Update session context's current_action field appropriately
-   - Remember the flow state (scheduling vs selecting_timezone)
-
-5. Tool calling:
-   - ALWAYS call the appropriate MCP tool to get widget schemas
-   - NEVER create widget structures from scratch
-   - Use MCP tools to get the empty schema, then it will be populated with data
-
-6. Time zone handling:
-   - Time slot labels MUST reflect the current timezone
-   - When timezone changes, update all time labels accordingly
-   - Preserve the underlying time value (only display changes)
-
-RESPONSE EXPECTATIONS:
-- Call the appropriate tool based on user action
-- The widget schema will be populated with actual data by the system
-- Focus on calling the right tool at the right time
-- Preserve context across all interactions
-
-CONVERSATION EXAMPLES:
-
-Example 1 - Initial Connection:
-User: "User connected and wants to schedule a meeting"
-You: [Call get_schedule_meeting_widget()]
-Result: Schedule widget appears with dates and times
-
-Example 2 - Follow-up Action (IMPORTANT):
-User: "User wants to change timezone (FOLLOW-UP ACTION). Current selections: TUE Sep 23, 1:45 PM"
-You: [Call get_timezone_selector_widget()]
-Result: Timezone picker appears, but date/time selections are preserved in session
-After confirmation: [Call get_schedule_meeting_widget()]
-Result: Back to schedule widget with PT times, previous selections restored
-
-Example 3 - Context Preservation:
-User: "User confirmed new timezone: PT. Previous selections were: TUE Sep 23, 1:45 PM ET"
-You: [Call get_schedule_meeting_widget()]
-Result: Schedule widget shows with:
-  - Same date selected: TUE Sep 23 (still highlighted)
-  - Same time selected: 1:45 PM PT (still highlighted, label updated)
-  - Schedule button still enabled
-
-Be intelligent, context-aware, and always preserve user selections. Your goal is to make scheduling meetings effortless."""
+from tracing import current_span, get_tracer, traced
 
 
 class ADKAgent:
     """Google ADK Agent using LlmAgent with FunctionTool"""
     
     def __init__(self, api_key: Optional[str] = None, model: str = "gemini-2.0-flash-exp"):
+        mock_url = os.getenv("MOCK_LLM_URL")
+        if mock_url:
+            # Offline mock server (mock-llm/) speaking the Gemini API
+            os.environ["GOOGLE_GEMINI_BASE_URL"] = mock_url
+            os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "false"
+            api_key = api_key or "mock-key"
+            print(f"🧪 Using mock LLM at {mock_url}")
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY") or os.getenv("GOOGLE_GENAI_API_KEY")
         self.model = model
         self.mcp_client = get_mcp_client()
+        self.schema_cache = SchemaCache(
+            self.mcp_client,
+            max_age=float(os.getenv("SCHEMA_CACHE_MAX_AGE", "30"))
+        )
         self.widget_populator = get_widget_populator()
+        self.response_cache = ResponseCache(
+            ttl=float(os.getenv("LLM_CACHE_TTL", "300")),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048")),
+            actions=parse_actions(os.getenv("LLM_CACHE_ACTIONS", ""))
+        )
+        self.prompt_builder = PromptBuilder(
+            variant=os.getenv("PROMPT_VARIANT", "compact"),
+            token_budget=int(os.getenv("PROMPT_TOKEN_BUDGET", "0")) or None,
+            record_path=os.getenv("PROMPT_RECORD_FILE") or None
+        )
         self.agent = None
         self.runner = None
+        self.session_service = None
         
         if ADK_AVAILABLE and self.api_key:
             self._initialize_agent()
@@ -185,29 +83,29 @@ class ADKAgent:
         """Create FunctionTool instances for MCP tools"""
         
         # Tool 1: Get schedule meeting widget
-        def get_schedule_meeting_widget() -> str:
+        async def get_schedule_meeting_widget() -> str:
             """
             Fetches the schedule meeting widget schema from MCP server.
             Returns widget structure with empty options that need to be populated.
             """
-            result = self.mcp_client.call_tool("get_schedule_meeting_widget", {})
+            result = await self.schema_cache.call_tool("get_schedule_meeting_widget", {})
             return json.dumps(result)
         
         # Tool 2: Get timezone selector widget
-        def get_timezone_selector_widget() -> str:
+        async def get_timezone_selector_widget() -> str:
             """
             Fetches the timezone selector widget schema from MCP server.
             Returns widget structure for timezone selection.
             """
-            result = self.mcp_client.call_tool("get_timezone_selector_widget", {})
+            result = await self.schema_cache.call_tool("get_timezone_selector_widget", {})
             return json.dumps(result)
         
         # Tool 3: List available widgets
-        def list_available_widgets() -> str:
+        async def list_available_widgets() -> str:
             """
             Lists all available widget types from the MCP server.
             """
-            result = self.mcp_client.call_tool("list_available_widgets", {})
+            result = await self.schema_cache.call_tool("list_available_widgets", {})
             return json.dumps(result)
         
         return [
@@ -222,20 +120,31 @@ class ADKAgent:
             # Create tools
             tools = self._create_tools()
             
-            # Create LlmAgent
+            # google-genai takes the key from the environment
+            if not (os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")):
+                os.environ["GOOGLE_API_KEY"] = self.api_key
+            
+            # Create LlmAgent; a provider function keeps ADK from treating
+            # braces in the instruction as session-state placeholders
             self.agent = LlmAgent(
+                name="widget_agent",
                 model=self.model,
-                system_instruction=SYSTEM_INSTRUCTION,
-                tools=tools,
-                api_key=self.api_key
+                instruction=self._instruction,
+                tools=tools
             )
             
             # Create Runner
-            self.runner = Runner(agent=self.agent)
+            self.session_service = InMemorySessionService()
+            self.runner = Runner(
+                app_name=APP_NAME,
+                agent=self.agent,
+                session_service=self.session_service
+            )
             
             print("🤖 Google ADK Agent initialized")
             print(f"   Model: {self.model}")
             print(f"   Tools: {len(tools)} registered")
+            print(f"   Prompt: {self.prompt_builder.variant} ({self.prompt_builder.instruction_tokens} instruction tokens)")
             
         except Exception as e:
             print(f"❌ Failed to initialize ADK agent: {e}")
@@ -244,6 +153,11 @@ class ADKAgent:
             self.agent = None
             self.runner = None
     
+    def _instruction(self, context) -> str:
+        """Instruction provider for the LlmAgent"""
+        return self.prompt_builder.instruction
+    
+    @traced("agent.process_user_action")
     async def process_user_action(
         self,
         action: str,
@@ -262,39 +176,103 @@ class ADKAgent:
             Response dictionary with widget or message
         """
         
+        span = current_span()
+        span.set_attribute("widget.action", action)
         if not self.agent or not self.runner:
+            span.set_attribute("agent.mode", "fallback")
             return await self._fallback_processing(action, session_context, data)
         
+        span.set_attribute("agent.mode", "llm")
         try:
             # Build prompt for the agent
-            user_message = self._build_action_message(action, session_context, data)
+            tool_name = self._determine_tool_for_action(action)
+            prompt = self.prompt_builder.build(action, session_context, data, tool_name)
             
             print(f"🧠 Agent processing: {action}")
             
             # Run the agent with the message
-            response = self.runner.run(user_message)
+            response = await self._run_llm(action, prompt)
             
             # The agent will call tools and we need to extract the result
             # Check if tools were called
-            tool_name = self._determine_tool_for_action(action)
             
             if tool_name:
                 print(f"🔧 Expected tool: {tool_name}")
                 
                 # Call MCP directly for now (agent should have called it via tools)
-                mcp_result = self.mcp_client.call_tool(tool_name, {})
+                mcp_result = await self.schema_cache.call_tool(tool_name, {})
                 
                 if mcp_result.get("success"):
                     return await self._process_mcp_result(mcp_result, session_context)
             
             return await self._fallback_processing(action, session_context, data)
             
+        except PromptBudgetError as e:
+            print(f"⚠️  Skipping LLM: {e}")
+            span.set_attribute("agent.mode", "over_budget")
+            return await self._fallback_processing(action, session_context, data)
         except Exception as e:
             print(f"❌ Agent error: {e}")
             import traceback
             traceback.print_exc()
             return await self._fallback_processing(action, session_context, data)
     
+    async def _run_llm(self, action: str, prompt: Prompt) -> str:
+        """Run the model, through the response cache for actions it is enabled for"""
+        attributes = {
+            "llm.model": self.model,
+            "llm.prompt_variant": prompt.variant,
+            "llm.prompt_tokens": prompt.total_tokens
+        }
+        with get_tracer().start_span("llm.runner.run", attributes) as span:
+            if not self.response_cache.enabled_for(action):
+                return await self._call_llm(prompt)
+            
+            key = ResponseCache.key(self.model, prompt.instruction, action, prompt.text)
+            response, outcome = await self.response_cache.get_or_call(
+                action, key, lambda: self._call_llm(prompt)
+            )
+            span.set_attribute("cache.result", outcome)
+            return response
+    
+    async def _call_llm(self, prompt: Prompt) -> str:
+        """
+        One agent run in a fresh ADK session, consumed to the end (tool
+        calls included). Returns the final response text, so what the
+        cache stores is the finished answer rather than a live generator.
+        """
+        session = await self.session_service.create_session(app_name=APP_NAME, user_id=LLM_USER_ID)
+        try:
+            text = ""
+            async for event in self.runner.run_async(
+                user_id=LLM_USER_ID,
+                session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part(text=prompt.text)])
+            ):
+                if event.is_final_response() and event.content and event.content.parts:
+                    text = "".join(part.text or "" for part in event.content.parts)
+            return text
+        finally:
+            await self.session_service.delete_session(
+                app_name=APP_NAME, user_id=LLM_USER_ID, session_id=session.id
+            )
+    
+    @traced("agent.render_action")
+    async def render_action(
+        self,
+        action: str,
+        session_context: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Deterministically render the widget an action leads to, without the LLM"""
+        tool_name = self._determine_tool_for_action(action)
+        if not tool_name:
+            return None
+        
+        mcp_result = await self.schema_cache.call_tool(tool_name, {})
+        if not mcp_result.get("success"):
+            return None
+        return await self._process_mcp_result(mcp_result, session_context)
+    
     def _determine_tool_for_action(self, action: str) -> Optional[str]:
         """Determine which MCP tool to call based on action"""
         tool_map = {
@@ -304,30 +282,10 @@ class ADKAgent:
             "change_timezone": "get_timezone_selector_widget",
             "confirm_timezone": "get_schedule_meeting_widget",
             "cancel_timezone": "get_schedule_meeting_widget",
+            "refresh": "get_schedule_meeting_widget",
         }
         return tool_map.get(action)
     
-    def _build_action_message(
-        self,
-        action: str,
-        session_context: Dict[str, Any],
-        data: Optional[Dict[str, Any]]
-    ) -> str:
-        """Build message for the agent"""
-        
-        context_str = json.dumps(session_context, indent=2)
-        
-        messages = {
-            "connect": f"User connected and wants to schedule a meeting.\nSession: {context_str}\n\nPlease fetch the schedule meeting widget.",
-            "select_date": f"User selected date: {data.get('label') if data else 'unknown'}.\nSession: {context_str}\n\nRefresh the schedule widget.",
-            "select_time": f"User selected time: {data.get('label') if data else 'unknown'}.\nSession: {context_str}\n\nRefresh the schedule widget.",
-            "change_timezone": f"User wants to change timezone (FOLLOW-UP ACTION).\nSession: {context_str}\n\nShow timezone selector. PRESERVE date/time selections!",
-            "confirm_timezone": f"User confirmed new timezone: {data.get('timezone') if data else 'unknown'}.\nSession: {context_str}\n\nShow schedule widget. RESTORE previous selections!",
-            "cancel_timezone": f"User cancelled timezone change.\nSession: {context_str}\n\nShow schedule widget.",
-        }
-        
-        return messages.get(action, f"Action: {action}\nSession: {context_str}")
-    
     async def _process_mcp_result(
         self,
         mcp_result: Dict[str, Any],
@@ -346,19 +304,24 @@ class ADKAgent:
         
         # Populate widget with session data
         if widget_type == "schedule_meeting":
-            populated = self.widget_populator.populate_schedule_meeting_widget(
+            rendered = self.widget_populator.render_schedule_meeting_widget(
                 widget_schema, session_context
             )
         elif widget_type == "timezone_selector":
-            populated = self.widget_populator.populate_timezone_selector_widget(
+            rendered = self.widget_populator.render_timezone_selector_widget(
                 widget_schema, session_context
             )
         else:
-            populated = widget_schema
+            return {"type": "widget_render", "widget": widget_schema}
         
+        return self._widget_response(rendered)
+    
+    def _widget_response(self, rendered) -> Dict[str, Any]:
+        """Build a widget_render response carrying the pre-encoded payload"""
         return {
             "type": "widget_render",
-            "widget": populated
+            "widget": rendered.widget,
+            "widget_json": rendered.payload
         }
     
     async def _fallback_processing(
@@ -371,26 +334,27 @@ class ADKAgent:
         
         print(f"⚠️  Fallback mode for: {action}")
         
-        if action in ["connect", "select_date", "select_time", "confirm_timezone", "cancel_timezone"]:
-            result = self.mcp_client.call_tool("get_schedule_meeting_widget", {})
+        if action in ["connect", "select_date", "select_time", "confirm_timezone", "cancel_timezone", "refresh"]:
+            result = await self.schema_cache.call_tool("get_schedule_meeting_widget", {})
             if result.get("success"):
-                widget = self.widget_populator.populate_schedule_meeting_widget(
+                rendered = self.widget_populator.render_schedule_meeting_widget(
                     result["widget"], session_context
                 )
-                return {"type": "widget_render", "widget": widget}
+                return self._widget_response(rendered)
         
         elif action == "change_timezone":
-            result = self.mcp_client.call_tool("get_timezone_selector_widget", {})
+            result = await self.schema_cache.call_tool("get_timezone_selector_widget", {})
             if result.get("success"):
-                widget = self.widget_populator.populate_timezone_selector_widget(
+                rendered = self.widget_populator.render_timezone_selector_widget(
                     result["widget"], session_context
                 )
-                return {"type": "widget_render", "widget": widget}
+                return self._widget_response(rendered)
         
         elif action == "submit_schedule":
             return {
                 "type": "meeting_scheduled",
                 "meeting": {
+                    "booking_id": data.get("booking_id") if data else None,
                     "date": session_context.get("selected_date"),
                     "time": session_context.get("selected_time"),
                     "timezone": session_context.get("timezone")
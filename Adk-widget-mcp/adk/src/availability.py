@@ -0,0 +1,214 @@
+"""
+Availability Engine for ADK
+Free/busy calendars for attendees and rooms stored as per-day bitmaps
+"""
+import json
+import os
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from tz_service import CANONICAL_ZONE, ZONES
+
+MINUTES_PER_DAY = 24 * 60
+
+# Calendar a session books against when it names no attendees
+DEFAULT_CALENDAR = "default"
+
+
+class AvailabilityEngine:
+    """
+    Busy time per resource (attendee or room) as one bitmap per day.
+
+    Bit ``i`` of a day's bitmap means the ``resolution``-minute block
+    starting at ``i * resolution`` minutes after midnight is busy. Free
+    time across N resources is then N bitwise ORs over Python ints, and a
+    meeting of ``d`` blocks fits wherever ``d`` consecutive free bits are
+    set, found with a handful of shift-and-AND steps.
+    """
+
+    def __init__(
+        self,
+        resolution_minutes: int = 5,
+        work_start: time = time(9, 0),
+        work_end: time = time(17, 0)
+    ):
+        if MINUTES_PER_DAY % resolution_minutes:
+            raise ValueError("resolution_minutes must divide a day evenly")
+        self.resolution = resolution_minutes
+        self.blocks_per_day = MINUTES_PER_DAY // resolution_minutes
+        self.work_mask = self._range_mask(
+            self._to_minutes(work_start), self._to_minutes(work_end)
+        )
+        self.version = 0
+        self._busy: Dict[str, Dict[date, int]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _to_minutes(value: time) -> int:
+        return value.hour * 60 + value.minute
+
+    def _range_mask(self, start_minute: int, end_minute: int) -> int:
+        """Bitmap with every block overlapping [start, end) set"""
+        first = start_minute // self.resolution
+        last = -(-end_minute // self.resolution)  # ceil
+        if last <= first:
+            return 0
+        return ((1 << (last - first)) - 1) << first
+
+    def add_busy(self, resource_id: str, start: datetime, end: datetime):
+        """Mark [start, end) busy for a resource, splitting across days"""
+        if end <= start:
+            return
+        with self._lock:
+            days = self._busy.setdefault(resource_id, {})
+            cursor = start
+            while cursor < end:
+                day = cursor.date()
+                day_end = datetime.combine(day + timedelta(days=1), time(0, 0))
+                segment_end = min(end, day_end)
+                end_minute = (
+                    MINUTES_PER_DAY if segment_end == day_end
+                    else segment_end.hour * 60 + segment_end.minute
+                )
+                days[day] = days.get(day, 0) | self._range_mask(
+                    cursor.hour * 60 + cursor.minute, end_minute
+                )
+                cursor = segment_end
+            self.version += 1
+
+    def add_busy_many(self, resource_id: str, intervals: Iterable[Tuple[datetime, datetime]]):
+        """Bulk version of ``add_busy``"""
+        for start, end in intervals:
+            self.add_busy(resource_id, start, end)
+
+    def load_calendar(self, path: str) -> int:
+        """
+        Seed busy time from a JSON calendar file and return how many
+        intervals were added. The file maps resource ids to
+        ``[start, end]`` ISO datetimes; naive times are canonical (Eastern)
+        wall-clock time, like slot values.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            calendars = json.load(f)
+        
+        zone = ZoneInfo(ZONES[CANONICAL_ZONE])
+        added = 0
+        for resource_id, intervals in calendars.items():
+            for start, end in intervals:
+                start, end = datetime.fromisoformat(start), datetime.fromisoformat(end)
+                if start.tzinfo is not None:
+                    start = start.astimezone(zone).replace(tzinfo=None)
+                if end.tzinfo is not None:
+                    end = end.astimezone(zone).replace(tzinfo=None)
+                self.add_busy(resource_id, start, end)
+                added += 1
+        return added
+
+    def clear(self, resource_id: Optional[str] = None):
+        """Forget busy time for one resource or all of them"""
+        with self._lock:
+            if resource_id is None:
+                self._busy.clear()
+            else:
+                self._busy.pop(resource_id, None)
+            self.version += 1
+
+    def busy_mask(self, resource_ids: Iterable[str], day: date) -> int:
+        """Union of busy blocks for the given resources on ``day``"""
+        mask = 0
+        busy = self._busy
+        for resource_id in resource_ids:
+            days = busy.get(resource_id)
+            if days:
+                mask |= days.get(day, 0)
+        return mask
+
+    def free_mask(self, resource_ids: Iterable[str], day: date) -> int:
+        """Working-hour blocks on ``day`` where every resource is free"""
+        return self.work_mask & ~self.busy_mask(resource_ids, day)
+
+    def is_free(
+        self,
+        resource_ids: Iterable[str],
+        day: date,
+        start_minute: int,
+        duration_minutes: int = 30
+    ) -> bool:
+        """True if every resource is free for the meeting starting at ``start_minute``"""
+        meeting = self._range_mask(start_minute, start_minute + duration_minutes)
+        return not self.busy_mask(resource_ids, day) & meeting
+
+    def _fits_mask(self, free: int, blocks: int) -> int:
+        """Bits where ``blocks`` consecutive free blocks start"""
+        fits = free
+        span = 1
+        # Doubling: after each step, bit i means blocks [i, i + span) are free
+        while span * 2 <= blocks:
+            fits &= fits >> span
+            span *= 2
+        if span < blocks:
+            fits &= fits >> (blocks - span)
+        return fits
+
+    def find_slots(
+        self,
+        resource_ids: Iterable[str],
+        day: date,
+        duration_minutes: int = 30,
+        granularity_minutes: int = 15,
+        limit: Optional[int] = None
+    ) -> List[int]:
+        """
+        Start minutes (after midnight) on ``day`` where a meeting of
+        ``duration_minutes`` fits for every resource, aligned to
+        ``granularity_minutes``.
+        """
+        if granularity_minutes % self.resolution:
+            raise ValueError("granularity_minutes must be a multiple of the resolution")
+        blocks = max(1, -(-duration_minutes // self.resolution))
+        fits = self._fits_mask(self.free_mask(resource_ids, day), blocks)
+
+        step = granularity_minutes // self.resolution
+        slots = []
+        while fits:
+            low = fits & -fits
+            index = low.bit_length() - 1
+            if index % step == 0:
+                slots.append(index * self.resolution)
+                if limit is not None and len(slots) >= limit:
+                    break
+                fits &= ~low
+            else:
+                # Skip straight to the next aligned block
+                fits &= ~((1 << (index + step - index % step)) - 1)
+        return slots
+
+    def free_intervals(self, resource_ids: Iterable[str], day: date) -> List[Tuple[int, int]]:
+        """Common free time on ``day`` as (start_minute, end_minute) ranges"""
+        free = self.free_mask(resource_ids, day)
+        intervals = []
+        while free:
+            start = (free & -free).bit_length() - 1
+            run = (free >> start) ^ ((free >> start) + 1)
+            length = run.bit_length() - 1
+            intervals.append((start * self.resolution, (start + length) * self.resolution))
+            free &= ~(((1 << length) - 1) << start)
+        return intervals
+
+
+# Singleton instance
+_availability_engine = None
+
+
+def get_availability_engine() -> AvailabilityEngine:
+    """Get or create singleton AvailabilityEngine instance"""
+    global _availability_engine
+    if _availability_engine is None:
+        _availability_engine = AvailabilityEngine()
+        calendar_path = os.getenv("CALENDAR_FILE")
+        if calendar_path:
+            added = _availability_engine.load_calendar(calendar_path)
+            print(f"📆 Loaded {added} busy interval(s) from {calendar_path}")
+    return _availability_engine
@@ -0,0 +1,123 @@
+"""
+Widget Compression for ADK
+Per-message deflate with a preset dictionary built from rendered widget schemas
+"""
+import base64
+import json
+import struct
+import time
+import zlib
+from typing import Any, Dict, Iterable, Optional, Union
+
+# Binary frame layout: format byte, dictionary id (uint32 BE), raw deflate data
+FRAME_FORMAT = 1
+FRAME_HEADER = struct.Struct(">BI")
+
+# zlib only looks back 32 KB, so a larger dictionary is never used
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+
+def build_dictionary(samples: Iterable[bytes], max_size: int = MAX_DICTIONARY_SIZE) -> bytes:
+    """
+    Preset dictionary from sample messages, most common last.
+
+    Deflate matches are cheapest at short distances, so the sample that
+    should compress best goes at the end. If the samples exceed
+    ``max_size`` the oldest bytes are dropped.
+    """
+    data = b"".join(samples)
+    return data[-max_size:]
+
+
+class PresetDictionary:
+    """Dictionary bytes plus the id frames use to refer to them"""
+
+    __slots__ = ("data", "id", "source_version")
+
+    def __init__(self, data: bytes, source_version: Any = None):
+        self.data = data
+        self.id = zlib.crc32(data)
+        self.source_version = source_version
+
+    def announcement(self) -> str:
+        """Message that hands the dictionary to a client before first use"""
+        return json.dumps({
+            "type": "compression",
+            "format": FRAME_FORMAT,
+            "dictionary_id": self.id,
+            "dictionary": base64.b64encode(self.data).decode("ascii")
+        })
+
+
+class FrameCompressor:
+    """
+    Compresses outgoing messages into binary frames.
+
+    Each message is deflated on its own (no context takeover), so frames
+    can be dropped or reordered by the outbound queue without breaking
+    the stream. Messages shorter than ``threshold`` bytes are sent as text.
+    Ratio and CPU time are tracked for tuning.
+    """
+
+    def __init__(self, threshold: int = 64, level: int = 6):
+        self.threshold = threshold
+        self.level = level
+        self.dictionary: Optional[PresetDictionary] = None
+        self.messages = 0
+        self.compressed = 0
+        self.raw_bytes = 0
+        self.wire_bytes = 0
+        self.cpu_seconds = 0.0
+
+    def set_dictionary(self, dictionary: PresetDictionary):
+        self.dictionary = dictionary
+
+    @property
+    def dictionary_id(self) -> Optional[int]:
+        return self.dictionary.id if self.dictionary is not None else None
+
+    def encode(self, text: str) -> Union[str, bytes]:
+        """Binary frame for ``text``, or ``text`` itself if below the threshold"""
+        raw = text.encode("utf-8")
+        self.messages += 1
+        self.raw_bytes += len(raw)
+        if self.dictionary is None or len(raw) < self.threshold:
+            self.wire_bytes += len(raw)
+            return text
+
+        start = time.process_time()
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, zdict=self.dictionary.data)
+        frame = FRAME_HEADER.pack(FRAME_FORMAT, self.dictionary.id) + compressor.compress(raw) + compressor.flush()
+        self.cpu_seconds += time.process_time() - start
+        if len(frame) >= len(raw):
+            self.wire_bytes += len(raw)
+            return text
+
+        self.compressed += 1
+        self.wire_bytes += len(frame)
+        return frame
+
+    def stats(self) -> Dict[str, Any]:
+        """Compression ratio and CPU cost so far"""
+        return {
+            "messages": self.messages,
+            "compressed": self.compressed,
+            "raw_bytes": self.raw_bytes,
+            "wire_bytes": self.wire_bytes,
+            "ratio": self.raw_bytes / self.wire_bytes if self.wire_bytes else 1.0,
+            "cpu_ms": round(self.cpu_seconds * 1000, 3),
+            "us_per_compressed": round(self.cpu_seconds * 1e6 / self.compressed, 2) if self.compressed else 0.0,
+            "dictionary_id": self.dictionary_id,
+            "dictionary_bytes": len(self.dictionary.data) if self.dictionary else 0
+        }
+
+
+def decode_frame(frame: bytes, dictionary: PresetDictionary) -> str:
+    """Inverse of ``FrameCompressor.encode`` for a binary frame (used by clients and tools)"""
+    version, dictionary_id = FRAME_HEADER.unpack_from(frame)
+    if version != FRAME_FORMAT:
+        raise ValueError(f"Unknown frame format {version}")
+    if dictionary_id != dictionary.id:
+        raise ValueError(f"Frame uses dictionary {dictionary_id}, have {dictionary.id}")
+    decompressor = zlib.decompressobj(-15, zdict=dictionary.data)
+    return (decompressor.decompress(frame[FRAME_HEADER.size:]) + decompressor.flush()).decode("utf-8")
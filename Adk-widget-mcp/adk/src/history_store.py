@@ -0,0 +1,148 @@
+"""
+History Store for ADK
+Bounded per-session conversation history with pluggable compaction
+"""
+import json
+from collections import deque
+from typing import Dict, Any, List, Optional, Iterable, Iterator
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate in-memory footprint of a JSON-like value in bytes"""
+    try:
+        return len(json.dumps(value, separators=(",", ":"), default=str))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class HistoryCompactor:
+    """
+    Base compactor - decides what survives when old turns are compacted.
+
+    Subclasses receive the turns being evicted from the ring buffer together
+    with the previous summary, and return the new summary (or None to drop
+    the turns without a trace).
+    """
+
+    def compact(
+        self,
+        turns: List[Dict[str, Any]],
+        summary: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class DropOldestCompactor(HistoryCompactor):
+    """Discard compacted turns entirely"""
+
+    def compact(self, turns, summary):
+        return summary
+
+
+class ActionSummaryCompactor(HistoryCompactor):
+    """Fold compacted turns into per-action counts and the last value seen"""
+
+    def compact(self, turns, summary):
+        summary = dict(summary) if summary else {"turns": 0, "actions": {}}
+        actions = dict(summary.get("actions", {}))
+
+        for turn in turns:
+            action = turn.get("action", "unknown")
+            actions[action] = actions.get(action, 0) + 1
+
+        summary["turns"] = summary.get("turns", 0) + len(turns)
+        summary["actions"] = actions
+        if turns:
+            summary["last_compacted"] = turns[-1]
+        return summary
+
+
+class SessionHistory:
+    """
+    Fixed-capacity ring buffer of conversation turns.
+
+    Once ``capacity`` turns are buffered, the oldest ``compact_batch`` turns
+    are handed to the compactor and replaced by a single summary, so memory
+    per session stays bounded no matter how long it lives.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 50,
+        compactor: Optional[HistoryCompactor] = None,
+        compact_batch: Optional[int] = None
+    ):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.compactor = compactor or ActionSummaryCompactor()
+        self.compact_batch = max(1, min(compact_batch or capacity // 2 or 1, capacity))
+        self.summary: Optional[Dict[str, Any]] = None
+        self._turns: deque = deque()
+        self._turn_sizes: deque = deque()
+        self._turns_bytes = 0
+        self._summary_bytes = 0
+
+    def append(self, turn: Dict[str, Any]):
+        """Add a turn, compacting the oldest ones if the buffer is full"""
+        if len(self._turns) >= self.capacity:
+            self.compact(self.compact_batch)
+
+        size = estimate_size(turn)
+        self._turns.append(turn)
+        self._turn_sizes.append(size)
+        self._turns_bytes += size
+
+    def extend(self, turns: Iterable[Dict[str, Any]]):
+        """Add several turns in order"""
+        for turn in turns:
+            self.append(turn)
+
+    def compact(self, count: Optional[int] = None) -> int:
+        """Compact the oldest ``count`` turns into the summary"""
+        count = min(count if count is not None else self.compact_batch, len(self._turns))
+        if count <= 0:
+            return 0
+
+        evicted = []
+        for _ in range(count):
+            evicted.append(self._turns.popleft())
+            self._turns_bytes -= self._turn_sizes.popleft()
+
+        self.summary = self.compactor.compact(evicted, self.summary)
+        self._summary_bytes = estimate_size(self.summary) if self.summary else 0
+        return count
+
+    def clear(self):
+        """Drop all turns and the summary"""
+        self._turns.clear()
+        self._turn_sizes.clear()
+        self._turns_bytes = 0
+        self.summary = None
+        self._summary_bytes = 0
+
+    @property
+    def approx_bytes(self) -> int:
+        """Approximate serialized size of buffered turns plus summary"""
+        return self._turns_bytes + self._summary_bytes
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Buffered turns, oldest first"""
+        return list(self._turns)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable view of the history"""
+        return {"summary": self.summary, "turns": self.to_list()}
+
+    def load(self, data: Dict[str, Any]):
+        """Replace the contents with a view produced by ``to_dict``"""
+        self.clear()
+        self.summary = data.get("summary")
+        self._summary_bytes = estimate_size(self.summary) if self.summary else 0
+        self.extend(data.get("turns", []))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._turns)
+
+    def __len__(self) -> int:
+        return len(self._turns)
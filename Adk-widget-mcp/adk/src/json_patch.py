@@ -0,0 +1,282 @@
+"""
+JSON Patch for ADK
+RFC 6902 diff/apply and widget delta encoding shared across connections
+"""
+import copy
+from typing import Any, Dict, List, Optional
+
+from widget_template import encode_json
+
+
+def _escape(token: str) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def make_patch(old: Any, new: Any) -> List[Dict[str, Any]]:
+    """
+    Compute an RFC 6902 patch turning ``old`` into ``new``.
+
+    Subtrees shared by identity (as produced by compiled templates) are
+    skipped without comparison. Lists of equal length are diffed per index,
+    otherwise replaced wholesale.
+    """
+    ops: List[Dict[str, Any]] = []
+    _diff(old, new, "", ops)
+    return ops
+
+
+def _diff(old: Any, new: Any, path: str, ops: List[Dict[str, Any]]):
+    if old is new:
+        return
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                _diff(old[key], value, child, ops)
+        return
+
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            _diff(old_item, new_item, f"{path}/{index}", ops)
+        return
+
+    if type(old) is not type(new) or old != new:
+        ops.append({"op": "replace", "path": path, "value": new})
+
+
+def apply_patch(doc: Any, patch: List[Dict[str, Any]]) -> Any:
+    """Apply an RFC 6902 patch (add/remove/replace/test) to a copy of ``doc``"""
+    doc = copy.deepcopy(doc)
+
+    for op in patch:
+        path = op["path"]
+        if path == "":
+            if op["op"] in ("add", "replace"):
+                doc = copy.deepcopy(op["value"])
+                continue
+            if op["op"] == "test":
+                if doc != op["value"]:
+                    raise ValueError("JSON patch test failed at root")
+                continue
+            raise ValueError(f"Unsupported root operation: {op['op']}")
+
+        tokens = [_unescape(token) for token in path.split("/")[1:]]
+        parent = doc
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+
+        key = tokens[-1]
+        if isinstance(parent, list):
+            index = len(parent) if key == "-" else int(key)
+            if op["op"] == "add":
+                parent.insert(index, copy.deepcopy(op["value"]))
+            elif op["op"] == "remove":
+                del parent[index]
+            elif op["op"] == "replace":
+                parent[index] = copy.deepcopy(op["value"])
+            elif op["op"] == "test":
+                if parent[index] != op["value"]:
+                    raise ValueError(f"JSON patch test failed at {path}")
+            else:
+                raise ValueError(f"Unsupported operation: {op['op']}")
+        else:
+            if op["op"] in ("add", "replace"):
+                if op["op"] == "replace" and key not in parent:
+                    raise KeyError(f"Cannot replace missing path: {path}")
+                parent[key] = copy.deepcopy(op["value"])
+            elif op["op"] == "remove":
+                del parent[key]
+            elif op["op"] == "test":
+                if parent.get(key) != op["value"]:
+                    raise ValueError(f"JSON patch test failed at {path}")
+            else:
+                raise ValueError(f"Unsupported operation: {op['op']}")
+
+    return doc
+
+
+def _patch_message(base_version: int, version: int, old: Dict[str, Any], new: Dict[str, Any]) -> bytes:
+    return encode_json({
+        "type": "widget_patch",
+        "base_version": base_version,
+        "version": version,
+        "patch": make_patch(old, new)
+    })
+
+
+class WidgetFrame:
+    """
+    One version of a session's widget, serialized at most once however
+    many connections it goes to.
+
+    The full render and the patch from the previous version are built on
+    first use and cached, and so are their compressed forms (keyed by
+    dictionary id), so fanning a render out to N subscribers costs one
+    encode instead of N.
+    """
+
+    __slots__ = ("session_id", "version", "base_version", "widget", "widget_json", "previous", "cache")
+
+    def __init__(
+        self,
+        session_id: str,
+        version: int,
+        widget: Dict[str, Any],
+        widget_json: Optional[bytes] = None,
+        previous: Optional[Dict[str, Any]] = None,
+        base_version: Optional[int] = None
+    ):
+        self.session_id = session_id
+        self.version = version
+        self.base_version = base_version
+        self.widget = widget
+        self.widget_json = widget_json
+        self.previous = previous
+        self.cache: Dict[Any, Any] = {}
+
+    @property
+    def full(self) -> bytes:
+        message = self.cache.get("full")
+        if message is None:
+            widget_json = self.widget_json if self.widget_json is not None else encode_json(self.widget)
+            message = self.cache["full"] = b"".join((
+                b'{"type":"widget_render","session_id":',
+                encode_json(self.session_id),
+                b',"version":',
+                str(self.version).encode(),
+                b',"widget":',
+                widget_json,
+                b"}"
+            ))
+        return message
+
+    @property
+    def patch(self) -> Optional[bytes]:
+        """Patch from ``base_version``, or None if a full render is no bigger"""
+        if "patch" not in self.cache:
+            patch = None
+            if self.previous is not None and self.previous.get("widget_type") == self.widget.get("widget_type"):
+                patch = _patch_message(self.base_version, self.version, self.previous, self.widget)
+                if len(patch) >= len(self.full):
+                    patch = None
+            self.cache["patch"] = patch
+        return self.cache["patch"]
+
+
+class WidgetStream:
+    """
+    Version numbers for one session, shared by its connections.
+
+    Published frames go to every connection and chain: each one's patch
+    applies to the previous published version. Private frames (a single
+    connection's first render or resync) draw from the same counter, so
+    a version always names exactly one widget, but are never a patch base.
+    """
+
+    __slots__ = ("session_id", "version", "last_version", "last_widget")
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.version = 0
+        self.last_version: Optional[int] = None
+        self.last_widget: Optional[Dict[str, Any]] = None
+
+    def publish(self, widget: Dict[str, Any], widget_json: Optional[bytes] = None) -> WidgetFrame:
+        self.version += 1
+        frame = WidgetFrame(self.session_id, self.version, widget, widget_json, self.last_widget, self.last_version)
+        self.last_version = self.version
+        self.last_widget = widget
+        return frame
+
+    def private(self, widget: Dict[str, Any], widget_json: Optional[bytes] = None) -> WidgetFrame:
+        self.version += 1
+        return WidgetFrame(self.session_id, self.version, widget, widget_json)
+
+
+class WidgetDeltaEncoder:
+    """
+    Remembers the last widget sent on a connection and encodes the next one
+    as a ``widget_patch`` when that is smaller than a full ``widget_render``.
+    Patches omit the session id, which the client already holds from the
+    full render.
+
+    Every message carries a version. A patch names the version it applies
+    to; the client answers a mismatch with a ``resync`` action, which
+    forces the next message to be a full render.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.last_widget: Optional[Dict[str, Any]] = None
+        self.in_sync = False
+        self.full_bytes = 0
+        self.patch_bytes = 0
+        self.full_count = 0
+        self.patch_count = 0
+
+    def reset(self):
+        """Force the next encode to be a full render"""
+        self.in_sync = False
+
+    def check_client_version(self, client_version: Optional[int]):
+        """Fall back to a full render if the client is on another version"""
+        if client_version is not None and client_version != self.version:
+            self.reset()
+
+    def encode(
+        self,
+        session_id: str,
+        widget: Dict[str, Any],
+        widget_json: Optional[bytes] = None
+    ) -> str:
+        """Encode ``widget`` as the smaller of a patch or a full render"""
+        previous = self.last_widget if self.in_sync else None
+        return self.encode_frame(WidgetFrame(session_id, self.version + 1, widget, widget_json, previous, self.version))
+
+    def encode_frame(self, frame: WidgetFrame) -> str:
+        """
+        Message bringing this connection to ``frame``: the frame's shared
+        patch if the client holds its base version, a patch of our own if
+        the client is on some other known version, else a full render.
+        """
+        full = frame.full
+        message = full
+        if self.in_sync and self.last_widget is not None:
+            if self.version == frame.base_version:
+                message = frame.patch or full
+            elif self.last_widget.get("widget_type") == frame.widget.get("widget_type"):
+                patch = _patch_message(self.version, frame.version, self.last_widget, frame.widget)
+                if len(patch) < len(full):
+                    message = patch
+
+        self.version = frame.version
+        self.last_widget = frame.widget
+        self.in_sync = True
+        if message is full:
+            self.full_count += 1
+            self.full_bytes += len(full)
+        else:
+            self.patch_count += 1
+            self.patch_bytes += len(message)
+        return message.decode("utf-8")
+
+    def stats(self) -> Dict[str, Any]:
+        """Bytes and message counts sent through this encoder"""
+        return {
+            "version": self.version,
+            "full_count": self.full_count,
+            "full_bytes": self.full_bytes,
+            "patch_count": self.patch_count,
+            "patch_bytes": self.patch_bytes,
+        }
+
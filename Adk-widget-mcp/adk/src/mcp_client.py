@@ -1,172 +1,454 @@
 """
 MCP Client for ADK
-Communicates with MCP server - uses direct imports for demo
+Pool of long-lived MCP sessions to the widget schema server over stdio
+subprocesses or streamable HTTP
 """
-import sys
+import asyncio
+import itertools
+import json
 import os
-from typing import Dict, Any
-
-# Add mcp-server to path so we can import it
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../mcp-server'))
+import sys
+from typing import Any, Dict, List, Optional
 
 try:
-    # Import MCP server functions directly
-    from main import get_schedule_meeting_widget, get_timezone_selector_widget, list_available_widgets
-    MCP_AVAILABLE = True
+    import httpx
+    HTTPX_AVAILABLE = True
 except ImportError:
-    print("⚠️  MCP server not accessible")
-    MCP_AVAILABLE = False
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+from tracing import KIND_CLIENT, current_span, traced
+
+
+PROTOCOL_VERSION = "2025-03-26"
+CLIENT_INFO = {"name": "adk-widget-client", "version": "1.0"}
+# JSON-RPC error code for server requests we don't implement
+METHOD_NOT_FOUND = -32601
+
+DEFAULT_SERVER_SCRIPT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "mcp-server", "main.py")
+)
+
+
+class MCPError(Exception):
+    """JSON-RPC error or transport failure talking to the MCP server"""
+
+
+class StdioTransport:
+    """Newline-delimited JSON-RPC over a server subprocess's stdin/stdout"""
+
+    def __init__(self, command: List[str], env: Optional[Dict[str, str]] = None):
+        self.command = command
+        self.env = env
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._on_message = None
+
+    async def open(self, on_message):
+        self._on_message = on_message
+        self.process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            env={**os.environ, **(self.env or {})},
+            limit=16 * 1024 * 1024
+        )
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        try:
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    # Stray output from the server process - not protocol traffic
+                    continue
+                self._on_message(message)
+        finally:
+            self._on_message(None)
+
+    async def send(self, message: Dict[str, Any]):
+        if not self.alive:
+            raise MCPError("MCP server process is not running")
+        self.process.stdin.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+        await self.process.stdin.drain()
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def close(self):
+        if self.process and self.process.returncode is None:
+            try:
+                self.process.stdin.close()
+                await asyncio.wait_for(self.process.wait(), timeout=2)
+            except (asyncio.TimeoutError, ProcessLookupError, BrokenPipeError):
+                self.process.kill()
+                await self.process.wait()
+        if self._reader_task:
+            self._reader_task.cancel()
+
+
+class HttpTransport:
+    """Streamable HTTP transport - one POST per JSON-RPC message"""
+
+    def __init__(self, url: str):
+        if not HTTPX_AVAILABLE:
+            raise MCPError("httpx is required for the HTTP transport: pip install httpx")
+        self.url = url
+        self.client = None
+        self.session_header: Optional[str] = None
+        self._on_message = None
+        self._closed = False
+
+    async def open(self, on_message):
+        self._on_message = on_message
+        self.client = httpx.AsyncClient(timeout=30)
+
+    async def send(self, message: Dict[str, Any]):
+        headers = {
+            "Accept": "application/json, text/event-stream",
+            "Content-Type": "application/json",
+        }
+        if self.session_header:
+            headers["Mcp-Session-Id"] = self.session_header
+
+        try:
+            response = await self.client.post(self.url, json=message, headers=headers)
+        except httpx.HTTPError as e:
+            raise MCPError(f"HTTP transport error: {e}")
+
+        if "mcp-session-id" in response.headers:
+            self.session_header = response.headers["mcp-session-id"]
+        if response.status_code == 202 or not response.content:
+            return
+        if response.status_code >= 400:
+            raise MCPError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+        if response.headers.get("content-type", "").startswith("text/event-stream"):
+            for line in response.text.splitlines():
+                if line.startswith("data:"):
+                    self._on_message(json.loads(line[5:]))
+        else:
+            self._on_message(response.json())
+
+    @property
+    def alive(self) -> bool:
+        return self.client is not None and not self._closed
+
+    async def close(self):
+        self._closed = True
+        if self.client:
+            await self.client.aclose()
+
+
+class MCPSession:
+    """
+    One initialized MCP session.
+
+    The handshake runs once per session; after that any number of requests
+    can be in flight at the same time, matched to responses by id.
+    """
+
+    def __init__(self, transport, request_timeout: float = 30.0):
+        self.transport = transport
+        self.request_timeout = request_timeout
+        self.server_info: Dict[str, Any] = {}
+        self.in_flight = 0
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._replies: set = set()
+        self._closed = False
+
+    async def start(self):
+        await self.transport.open(self._dispatch)
+        result = await self.request("initialize", {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": CLIENT_INFO
+        })
+        self.server_info = result.get("serverInfo", {})
+        await self.transport.send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+    def _dispatch(self, message: Optional[Dict[str, Any]]):
+        if message is None:
+            # Transport closed - fail everything still waiting
+            self._closed = True
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(MCPError("MCP connection closed"))
+            self._pending.clear()
+            return
+
+        if "method" in message:
+            # A request or notification from the server; its id is the server's, not ours
+            if "id" in message:
+                task = asyncio.ensure_future(self._answer(message))
+                self._replies.add(task)
+                task.add_done_callback(self._replies.discard)
+            return
+
+        future = self._pending.pop(message.get("id"), None)
+        if future is None or future.done():
+            return
+        if "error" in message:
+            future.set_exception(MCPError(message["error"].get("message", "MCP error")))
+        else:
+            future.set_result(message.get("result", {}))
+
+    async def _answer(self, request: Dict[str, Any]):
+        """Reply to a server request: pings are answered, anything else is not supported"""
+        reply: Dict[str, Any] = {"jsonrpc": "2.0", "id": request["id"]}
+        if request["method"] == "ping":
+            reply["result"] = {}
+        else:
+            reply["error"] = {"code": METHOD_NOT_FOUND, "message": f"Method not found: {request['method']}"}
+        try:
+            await self.transport.send(reply)
+        except MCPError:
+            pass
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if self._closed:
+            raise MCPError("MCP session is closed")
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self.in_flight += 1
+        try:
+            await self.transport.send({
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": method,
+                "params": params or {}
+            })
+            return await asyncio.wait_for(future, timeout=self.request_timeout)
+        finally:
+            self._pending.pop(request_id, None)
+            self.in_flight -= 1
+
+    @property
+    def healthy(self) -> bool:
+        return not self._closed and self.transport.alive
+
+    async def close(self):
+        self._closed = True
+        await self.transport.close()
 
 
 class MCPClient:
-    """Client to communicate with MCP server"""
-    
-    def __init__(self):
-        self.mcp_available = MCP_AVAILABLE
-    
-    def call_tool(self, tool_name: str, arguments: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Pooled client for the MCP widget server.
+
+    Keeps ``pool_size`` long-lived sessions, discovers tools with
+    ``tools/list`` on start-up, spreads concurrent calls over the least
+    busy session and restarts sessions that fail their health check.
+    """
+
+    def __init__(
+        self,
+        transport: str = "stdio",
+        pool_size: int = 2,
+        server_command: Optional[List[str]] = None,
+        server_url: Optional[str] = None,
+        health_check_interval: float = 15.0,
+        request_timeout: float = 30.0
+    ):
+        self.transport = transport
+        self.pool_size = max(1, pool_size)
+        self.server_command = server_command or [sys.executable, DEFAULT_SERVER_SCRIPT]
+        self.server_url = server_url or "http://localhost:8001/mcp"
+        self.health_check_interval = health_check_interval
+        self.request_timeout = request_timeout
+        self.tools: Dict[str, Dict[str, Any]] = {}
+        self.restarts = 0
+        self._sessions: List[Optional[MCPSession]] = []
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._restart_locks: List[asyncio.Lock] = []
+        self._health_task: Optional[asyncio.Task] = None
+        self._started = False
+
+    def _new_transport(self):
+        if self.transport == "http":
+            return HttpTransport(self.server_url)
+        return StdioTransport(self.server_command)
+
+    async def _spawn(self) -> MCPSession:
+        session = MCPSession(self._new_transport(), request_timeout=self.request_timeout)
+        try:
+            await session.start()
+        except Exception:
+            await session.close()
+            raise
+        return session
+
+    async def start(self):
+        """Open the pool and discover the server's tools"""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+
+        async with self._start_lock:
+            if self._started:
+                return
+
+            self._sessions = list(await asyncio.gather(
+                *(self._spawn() for _ in range(self.pool_size))
+            ))
+            self._restart_locks = [asyncio.Lock() for _ in self._sessions]
+            await self.refresh_tools()
+
+            self._started = True
+            if self.health_check_interval > 0:
+                self._health_task = asyncio.create_task(self._health_loop())
+
+            print(f"🔌 MCP pool ready: {self.pool_size} {self.transport} session(s), {len(self.tools)} tools")
+
+    async def refresh_tools(self) -> Dict[str, Dict[str, Any]]:
+        """Re-discover tools from the server"""
+        result = await self._pick()[1].request("tools/list")
+        self.tools = {tool["name"]: tool for tool in result.get("tools", [])}
+        return self.tools
+
+    def _pick(self):
+        """Least busy healthy session (index, session)"""
+        candidates = [
+            (session.in_flight, index, session)
+            for index, session in enumerate(self._sessions)
+            if session is not None and session.healthy
+        ]
+        if not candidates:
+            raise MCPError("No healthy MCP sessions")
+        _, index, session = min(candidates, key=lambda c: (c[0], c[1]))
+        return index, session
+
+    async def _restart(self, index: int):
+        async with self._restart_locks[index]:
+            session = self._sessions[index]
+            if session is not None and session.healthy:
+                return
+            if session is not None:
+                await session.close()
+            self._sessions[index] = None
+            self._sessions[index] = await self._spawn()
+            self.restarts += 1
+            print(f"♻️  Restarted MCP session {index}")
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            for index, session in enumerate(list(self._sessions)):
+                try:
+                    if session is None or not session.healthy:
+                        raise MCPError("session down")
+                    await asyncio.wait_for(session.request("ping"), timeout=5)
+                except Exception as e:
+                    print(f"⚠️  MCP session {index} failed health check: {e}")
+                    if session is not None:
+                        await session.close()
+                    try:
+                        await self._restart(index)
+                    except Exception as restart_error:
+                        print(f"❌ MCP session {index} restart failed: {restart_error}")
+
+    @traced("mcp.call_tool", kind=KIND_CLIENT)
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Call an MCP tool and return the result
-        
+
         Args:
             tool_name: Name of the tool to call
             arguments: Tool arguments (optional)
-        
+
         Returns:
             Tool execution result
         """
-        if arguments is None:
-            arguments = {}
-        
-        # Call MCP tools directly (they're in same process)
-        if self.mcp_available:
+        if not self._started:
+            await self.start()
+
+        if tool_name not in self.tools:
+            return {"success": False, "error": f"Unknown MCP tool: {tool_name}"}
+
+        params = {"name": tool_name, "arguments": arguments or {}}
+        span = current_span()
+        span.set_attribute("mcp.tool", tool_name)
+        span.set_attribute("mcp.transport", self.transport)
+        for attempt in range(2):
+            index, session = self._pick()
+            span.set_attribute("mcp.session", index)
+            span.set_attribute("mcp.attempt", attempt)
             try:
-                if tool_name == "get_schedule_meeting_widget":
-                    return get_schedule_meeting_widget()
-                elif tool_name == "get_timezone_selector_widget":
-                    return get_timezone_selector_widget()
-                elif tool_name == "list_available_widgets":
-                    return list_available_widgets()
-                else:
-                    print(f"⚠️  Unknown MCP tool: {tool_name}")
-            except Exception as e:
-                print(f"❌ MCP tool error: {e}")
-        
-        # Fallback - return mock data
-        print(f"⚠️  Using mock data for {tool_name}")
-        return self._get_mock_response(tool_name)
-    
-    def _get_mock_response(self, tool_name: str) -> Dict[str, Any]:
-        """Return mock widget schema for demo purposes"""
-        if tool_name == "get_schedule_meeting_widget":
-            return {
-                "success": True,
-                "widget": {
-                    "widget_type": "schedule_meeting",
-                    "schema_version": "1.0",
-                    "metadata": {
-                        "title": "Schedule Meeting",
-                        "description": "Select date and time for meeting"
-                    },
-                    "properties": {
-                        "timezone": {
-                            "type": "timezone_display",
-                            "label": "CURRENT TIME ZONE",
-                            "value": "",
-                            "editable": True,
-                            "action": "change_timezone"
-                        },
-                        "date_selector": {
-                            "type": "button_group",
-                            "label": "SELECT A DATE",
-                            "style": "horizontal",
-                            "multi_select": False,
-                            "options": []
-                        },
-                        "time_slots": {
-                            "type": "button_list",
-                            "label": "SELECT A TIME",
-                            "style": "vertical",
-                            "multi_select": False,
-                            "options": []
-                        },
-                        "actions": {
-                            "type": "action_buttons",
-                            "buttons": [
-                                {
-                                    "id": "schedule",
-                                    "label": "Schedule meeting",
-                                    "style": "primary",
-                                    "enabled": False,
-                                    "action": "submit_schedule"
-                                },
-                                {
-                                    "id": "close",
-                                    "label": "Close",
-                                    "style": "secondary",
-                                    "enabled": True,
-                                    "action": "close_widget"
-                                }
-                            ]
-                        }
-                    },
-                    "styling": {
-                        "theme": "dark",
-                        "background_color": "#2D2D2D",
-                        "text_color": "#FFFFFF"
-                    }
-                },
-                "message": "Schedule meeting widget schema retrieved (mock)"
-            }
-        
-        elif tool_name == "get_timezone_selector_widget":
-            return {
-                "success": True,
-                "widget": {
-                    "widget_type": "timezone_selector",
-                    "schema_version": "1.0",
-                    "metadata": {
-                        "title": "Change Time Zone",
-                        "description": "Select your preferred timezone"
-                    },
-                    "properties": {
-                        "timezone_list": {
-                            "type": "radio_list",
-                            "label": "SELECT TIME ZONE",
-                            "options": []
-                        },
-                        "actions": {
-                            "type": "action_buttons",
-                            "buttons": [
-                                {
-                                    "id": "confirm",
-                                    "label": "Confirm",
-                                    "style": "primary",
-                                    "enabled": True,
-                                    "action": "confirm_timezone"
-                                },
-                                {
-                                    "id": "cancel",
-                                    "label": "Cancel",
-                                    "style": "secondary",
-                                    "enabled": True,
-                                    "action": "cancel_timezone"
-                                }
-                            ]
-                        }
-                    },
-                    "styling": {
-                        "theme": "dark",
-                        "background_color": "#2D2D2D",
-                        "text_color": "#FFFFFF"
-                    }
-                },
-                "message": "Timezone selector widget schema retrieved (mock)"
-            }
-        
-        return {"success": False, "error": "Unknown tool"}
+                result = await session.request("tools/call", params)
+                return self._parse_tool_result(result)
+            except (MCPError, asyncio.TimeoutError, OSError) as e:
+                print(f"❌ MCP tool error on session {index}: {e}")
+                if session.healthy:
+                    return {"success": False, "error": str(e)}
+                # Dead worker - restart it and retry once elsewhere
+                try:
+                    await self._restart(index)
+                except Exception as restart_error:
+                    return {"success": False, "error": str(restart_error)}
+
+        return {"success": False, "error": f"MCP tool {tool_name} failed after retry"}
+
+    @staticmethod
+    def _parse_tool_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Unwrap a tools/call result into the tool's returned dict"""
+        if result.get("isError"):
+            text = " ".join(c.get("text", "") for c in result.get("content", []))
+            return {"success": False, "error": text or "MCP tool error"}
+
+        structured = result.get("structuredContent")
+        if isinstance(structured, dict):
+            # FastMCP wraps non-object return values as {"result": ...}
+            if set(structured) == {"result"}:
+                structured = structured["result"]
+            if isinstance(structured, str):
+                # Tools that return pre-serialized JSON
+                try:
+                    return json.loads(structured)
+                except json.JSONDecodeError:
+                    return {"success": True, "text": structured}
+            return structured
+
+        for content in result.get("content", []):
+            if content.get("type") == "text":
+                try:
+                    return json.loads(content["text"])
+                except json.JSONDecodeError:
+                    return {"success": True, "text": content["text"]}
+
+        return {"success": False, "error": "Empty MCP tool result"}
+
+    async def close(self):
+        """Stop health checks and close every session"""
+        if self._health_task:
+            self._health_task.cancel()
+        await asyncio.gather(
+            *(session.close() for session in self._sessions if session is not None),
+            return_exceptions=True
+        )
+        self._sessions = []
+        self._started = False
+
+
+# Singleton instance - the pool is shared by every agent call
+_mcp_client = None
 
 
 def get_mcp_client() -> MCPClient:
-    """Get MCP client instance"""
-    return MCPClient()
+    """Get or create singleton MCPClient instance"""
+    global _mcp_client
+    if _mcp_client is None:
+        _mcp_client = MCPClient(
+            # Separate from the server's MCP_SERVER_TRANSPORT: stdio servers
+            # spawned by this client inherit the environment
+            transport=os.getenv("MCP_CLIENT_TRANSPORT", "stdio"),
+            pool_size=int(os.getenv("MCP_POOL_SIZE", "2")),
+            server_url=os.getenv("MCP_SERVER_URL")
+        )
+    return _mcp_client
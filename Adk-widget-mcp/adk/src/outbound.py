@@ -0,0 +1,237 @@
+"""
+Outbound Queue for ADK
+Bounded per-connection send queue with drop-stale widget renders and
+slow-client disconnects
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from compression import FrameCompressor
+from json_patch import WidgetDeltaEncoder, WidgetFrame
+from tracing import current_span, get_tracer
+
+
+class OutboundQueue:
+    """
+    Messages waiting to go out on one WebSocket, sent by a dedicated task.
+
+    Handlers enqueue and return immediately, so a slow client only delays
+    its own sender. Queued widget renders are superseded by newer ones,
+    and widgets are delta-encoded at send time against what the client
+    really received. A client is disconnected when its queue stays above
+    ``max_depth`` for ``slow_client_seconds`` (or reaches ``2 * max_depth``),
+    or when a watchdog finds a message, including one stuck mid-send to a
+    client that stopped reading, unsent after ``slow_client_seconds``.
+    With a ``compressor``, messages go out as dictionary-compressed binary
+    frames, preceded by the dictionary whenever it changes. Shared
+    ``WidgetFrame`` renders reuse the bytes (and compressed bytes) other
+    subscribers of the session already produced.
+    """
+
+    def __init__(
+        self,
+        websocket,
+        encoder: WidgetDeltaEncoder,
+        max_depth: int = 16,
+        slow_client_seconds: float = 10.0,
+        latency_samples: int = 1024,
+        compressor: Optional[FrameCompressor] = None
+    ):
+        self.websocket = websocket
+        self.encoder = encoder
+        self.compressor = compressor
+        self.max_depth = max_depth
+        self.slow_client_seconds = slow_client_seconds
+        self.sent = 0
+        self.dropped_stale = 0
+        self.compressed_reused = 0
+        self.max_seen_depth = 0
+        self.disconnected_slow = False
+        self._items: deque = deque()
+        self._event = asyncio.Event()
+        self._latencies: deque = deque(maxlen=latency_samples)
+        self._over_limit_since: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[asyncio.Task] = None
+        # queued_at of the item being sent, None between sends
+        self._sending_since: Optional[float] = None
+        self._closed = False
+        self._dictionary_sent: Optional[int] = None
+        self._tracer = get_tracer()
+
+    def start(self):
+        self._task = asyncio.create_task(self._send_loop())
+        if self.slow_client_seconds > 0:
+            self._watchdog = asyncio.create_task(self._watch())
+
+    def put_widget(self, session_id: str, widget: Dict[str, Any], widget_json: Optional[bytes] = None):
+        """Queue a widget render for this connection only, replacing any render not yet sent"""
+        self._drop_stale_widget()
+        self._put(("widget", time.monotonic(), current_span(), session_id, widget, widget_json))
+
+    def put_frame(self, frame: WidgetFrame):
+        """Queue a render shared with the session's other connections"""
+        self._drop_stale_widget()
+        self._put(("frame", time.monotonic(), current_span(), frame))
+
+    def _drop_stale_widget(self):
+        for index, item in enumerate(self._items):
+            if item[0] in ("widget", "frame"):
+                del self._items[index]
+                self.dropped_stale += 1
+                break
+
+    def put_text(self, text: str):
+        """Queue an already-encoded message"""
+        self._put(("text", time.monotonic(), current_span(), text))
+
+    def _put(self, item):
+        if self._closed:
+            return
+        self._items.append(item)
+        self.max_seen_depth = max(self.max_seen_depth, len(self._items))
+        self._check_depth()
+        self._event.set()
+
+    def _check_depth(self):
+        depth = len(self._items)
+        if depth <= self.max_depth:
+            self._over_limit_since = None
+            return
+
+        now = time.monotonic()
+        if self._over_limit_since is None:
+            self._over_limit_since = now
+        if depth >= 2 * self.max_depth or now - self._over_limit_since >= self.slow_client_seconds:
+            self._disconnect_slow_client()
+
+    def _disconnect_slow_client(self):
+        if self._closed:
+            return
+        print(f"🐢 Disconnecting slow client (queue depth {len(self._items)}, oldest {self.oldest_wait():.1f}s)")
+        self.disconnected_slow = True
+        self._closed = True
+        self._items.clear()
+        self._event.set()
+        asyncio.create_task(self.websocket.close(code=1013, reason="Client too slow"))
+
+    def oldest_wait(self) -> float:
+        """Seconds the oldest unsent message has been waiting"""
+        oldest = self._sending_since
+        if self._items and (oldest is None or self._items[0][1] < oldest):
+            oldest = self._items[0][1]
+        return time.monotonic() - oldest if oldest is not None else 0.0
+
+    async def _watch(self):
+        """Disconnect the client once a message waits ``slow_client_seconds``"""
+        interval = min(1.0, self.slow_client_seconds / 4)
+        while not self._closed:
+            await asyncio.sleep(interval)
+            if self.oldest_wait() >= self.slow_client_seconds:
+                self._disconnect_slow_client()
+
+    async def _send_loop(self):
+        while True:
+            while not self._items:
+                if self._closed:
+                    return
+                self._event.clear()
+                await self._event.wait()
+
+            item = self._items.popleft()
+            parent = item[2]
+            self._sending_since = item[1]
+            try:
+                if not parent.sampled:
+                    if not await self._send_item(item, parent):
+                        return
+                    continue
+
+                # Sent from this task, but traced under the action that queued it
+                wait_ms = round((time.monotonic() - item[1]) * 1000, 3)
+                with self._tracer.start_span("ws.send", {"queue.wait_ms": wait_ms}, parent=parent) as span:
+                    if not await self._send_item(item, span):
+                        return
+            finally:
+                self._sending_since = None
+
+    async def _send_item(self, item, span) -> bool:
+        """Encode and send one queued item; False once the connection is gone"""
+        frame = None
+        if item[0] == "widget":
+            _, queued_at, _, session_id, widget, widget_json = item
+            text = self.encoder.encode(session_id, widget, widget_json)
+        elif item[0] == "frame":
+            _, queued_at, _, frame = item
+            text = self.encoder.encode_frame(frame)
+        else:
+            _, queued_at, _, text = item
+
+        try:
+            if self.compressor is not None and self.compressor.dictionary is not None:
+                if self.compressor.dictionary_id != self._dictionary_sent:
+                    await self.websocket.send(self.compressor.dictionary.announcement())
+                    self._dictionary_sent = self.compressor.dictionary_id
+                text = self._compress(text, frame)
+            await self.websocket.send(text)
+        except Exception:
+            # Connection is gone; the handler cleans up
+            self._closed = True
+            self._items.clear()
+            return False
+
+        span.set_attribute("message.bytes", len(text))
+        self.sent += 1
+        self._latencies.append(time.monotonic() - queued_at)
+        self._check_depth()
+        return True
+
+    def _compress(self, text: str, frame: Optional[WidgetFrame]):
+        """Compress once per frame message and dictionary, whoever sends it first"""
+        if frame is None:
+            return self.compressor.encode(text)
+        key = (self.compressor.dictionary_id, text)
+        encoded = frame.cache.get(key)
+        if encoded is None:
+            encoded = frame.cache[key] = self.compressor.encode(text)
+        else:
+            self.compressed_reused += 1
+        return encoded
+
+    async def close(self, flush_timeout: float = 2.0):
+        """Stop accepting messages and give queued ones a moment to flush"""
+        self._closed = True
+        self._event.set()
+        if self._watchdog:
+            self._watchdog.cancel()
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, timeout=flush_timeout)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and send latency metrics"""
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+        return {
+            "depth": len(self._items),
+            "peak_depth": self.max_seen_depth,
+            "sent": self.sent,
+            "dropped_stale": self.dropped_stale,
+            "compressed_reused": self.compressed_reused,
+            "latency_p50_ms": round(percentile(0.50), 3),
+            "latency_p99_ms": round(percentile(0.99), 3),
+            "disconnected_slow": self.disconnected_slow
+        }
@@ -0,0 +1,335 @@
+"""
+Prompt Builder for ADK
+Instruction variants, compact session context and per-call token budgets
+"""
+import json
+import math
+import os
+import re
+from typing import Any, Dict, Optional
+
+from session_manager import DEFAULT_CONTEXT
+
+
+# Full instruction (the original prompt)
+SYSTEM_INSTRUCTION = """You are an intelligent meeting scheduling assistant powered by Google ADK.
+
+YOUR ROLE:
+- Help users schedule meetings by providing appropriate widgets
+- Understand user intent from their messages and actions
+- Call MCP tools to fetch widget schemas
+- Maintain conversation context across multiple turns
+- Handle follow-up actions intelligently
+
+AVAILABLE MCP TOOLS:
+1. get_schedule_meeting_widget() - Returns the schedule meeting widget schema
+2. get_timezone_selector_widget() - Returns the timezone selector widget schema
+3. list_available_widgets() - Lists all available widget types
+
+YOUR WORKFLOW:
+
+1. INITIAL CONNECTION (action: "connect"):
+   - User has just connected to the meeting scheduler
+   - Call get_schedule_meeting_widget() to fetch the main scheduling interface
+   - The widget will be populated with next 5 business days and available time slots
+   - Current timezone from session context will be displayed
+
+2. DATE SELECTION (action: "select_date"):
+   - User has selected a date from the available options
+   - The selected date is stored in session context
+   - Call get_schedule_meeting_widget() to refresh and show the selection highlighted
+   - Keep the "Schedule meeting" button disabled until BOTH date and time are selected
+
+3. TIME SELECTION (action: "select_time"):
+   - User has selected a time slot
+   - The selected time is stored in session context
+   - Call get_schedule_meeting_widget() to refresh the widget
+   - NOW enable the "Schedule meeting" button since both date AND time are selected
+
+4. TIMEZONE CHANGE (action: "change_timezone") - **FOLLOW-UP ACTION**:
+   - User clicked "CHANGE TIME ZONE" link - this is a FOLLOW-UP action
+   - This is CRITICAL: User wants to switch to timezone selector temporarily
+   - Call get_timezone_selector_widget() to show timezone options
+   - IMPORTANT: The user's current date and time selections MUST be preserved in session!
+   - Mark current timezone as selected in the widget
+   - After timezone selection, user will return to schedule meeting widget
+
+5. TIMEZONE CONFIRMATION (action: "confirm_timezone"):
+   - User selected a new timezone and clicked "Confirm"
+   - Session context is updated with new timezone (e.g., from ET to PT)
+   - Call get_schedule_meeting_widget() to return to scheduling interface
+   - CRITICAL: RESTORE the user's previous date and time selections from session!
+   - Time slot labels are converted to the new timezone (e.g., "10:45 AM PT" instead of "1:45 PM ET")
+   - Keep both date and time still selected
+   - Keep "Schedule meeting" button enabled if both were selected before
+
+6. TIMEZONE CANCELLATION (action: "cancel_timezone"):
+   - User clicked "Cancel" on timezone selector
+   - No changes to session context - timezone stays the same
+   - Call get_schedule_meeting_widget() to return to scheduling interface
+   - Keep all previous selections intact
+
+7. MEETING SUBMISSION (action: "submit_schedule"):
+   - User clicked "Schedule meeting" button
+   - Both date and time must be selected (validated)
+   - Extract meeting details from session context
+   - Confirm the meeting is scheduled with full details
+
+SESSION CONTEXT STRUCTURE:
+The session context contains critical information you must preserve:
+{
+  "timezone": "Eastern Time (ET)",           // Current timezone full name
+  "timezone_abbr": "ET",                     // Timezone abbreviation
+  "selected_date": "TUE Sep 23",            // User's selected date (display)
+  "selected_date_value": "2024-09-23",      // Date value for processing
+  "selected_time": "1:45 PM ET",            // User's selected time (display)
+  "selected_time_value": "13:45",           // Time value for processing
+  "current_action": null or "selecting_timezone"  // Current flow state
+}
+
+CRITICAL RULES - MUST FOLLOW:
+
+1. ALWAYS preserve session context during widget transitions
+   - When switching from schedule widget to timezone selector, keep date/time
+   - When returning from timezone selector, restore date/time selections
+
+2. When user changes timezone:
+   - Their date and time selections MUST be preserved
+   - Labels are converted to the new timezone, DST-aware (e.g., "1:45 PM ET" → "10:45 AM PT")
+   - The underlying canonical time value stays the same
+   - Both selections remain highlighted in the widget
+
+3. Enable "Schedule meeting" button ONLY when:
+   - Both date AND time are selected
+   - Never enable with just one selection
+
+4. For follow-up actions:
+   - Update session context's current_action field appropriately
+   - Remember the flow state (scheduling vs selecting_timezone)
+
+5. Tool calling:
+   - ALWAYS call the appropriate MCP tool to get widget schemas
+   - NEVER create widget structures from scratch
+   - Use MCP tools to get the empty schema, then it will be populated with data
+
+6. Time zone handling:
+   - Time slot labels MUST reflect the current timezone
+   - When timezone changes, update all time labels accordingly
+   - Preserve the underlying time value (only display changes)
+
+RESPONSE EXPECTATIONS:
+- Call the appropriate tool based on user action
+- The widget schema will be populated with actual data by the system
+- Focus on calling the right tool at the right time
+- Preserve context across all interactions
+
+CONVERSATION EXAMPLES:
+
+Example 1 - Initial Connection:
+User: "User connected and wants to schedule a meeting"
+You: [Call get_schedule_meeting_widget()]
+Result: Schedule widget appears with dates and times
+
+Example 2 - Follow-up Action (IMPORTANT):
+User: "User wants to change timezone (FOLLOW-UP ACTION). Current selections: TUE Sep 23, 1:45 PM"
+You: [Call get_timezone_selector_widget()]
+Result: Timezone picker appears, but date/time selections are preserved in session
+After confirmation: [Call get_schedule_meeting_widget()]
+Result: Back to schedule widget with PT times, previous selections restored
+
+Example 3 - Context Preservation:
+User: "User confirmed new timezone: PT. Previous selections were: TUE Sep 23, 1:45 PM ET"
+You: [Call get_schedule_meeting_widget()]
+Result: Schedule widget shows with:
+  - Same date selected: TUE Sep 23 (still highlighted)
+  - Same time selected: 10:45 AM PT (still highlighted, label converted)
+  - Schedule button still enabled
+
+Be intelligent, context-aware, and always preserve user selections. Your goal is to make scheduling meetings effortless."""
+
+
+# Same contract in a fraction of the tokens
+COMPACT_INSTRUCTION = """You are a meeting scheduling assistant. Each message reports one UI action; answer it by calling exactly one tool.
+
+TOOLS:
+- get_schedule_meeting_widget(): schedule widget (business days, time slots, timezone link)
+- get_timezone_selector_widget(): timezone picker
+- list_available_widgets(): widget catalogue
+
+ACTION -> TOOL:
+- connect, select_date, select_time, confirm_timezone, cancel_timezone, refresh -> get_schedule_meeting_widget
+- change_timezone -> get_timezone_selector_widget
+
+RULES:
+- Never build widget structures yourself; the system populates the schema from the session.
+- Date and time selections survive timezone changes; time labels follow the current timezone.
+- "Schedule meeting" is enabled only when both a date and a time are selected."""
+
+MINIMAL_INSTRUCTION = """Meeting scheduling assistant. Answer every action with one tool call: change_timezone -> get_timezone_selector_widget, any other action -> get_schedule_meeting_widget. Never build widgets yourself."""
+
+# Appended to every variant: the per-call context only lists what differs from a new session
+CONTEXT_NOTE = """Session context is compact JSON listing only the fields that differ from a new session (timezone "Eastern Time (ET)", nothing selected)."""
+
+INSTRUCTION_VARIANTS = {
+    "full": SYSTEM_INSTRUCTION,
+    "compact": COMPACT_INSTRUCTION,
+    "minimal": MINIMAL_INSTRUCTION
+}
+
+ACTION_TEMPLATES = {
+    "connect": "User connected and wants to schedule a meeting.",
+    "select_date": "User selected date: {label}.",
+    "select_time": "User selected time: {label}.",
+    "change_timezone": "User wants to change timezone (FOLLOW-UP ACTION). Preserve date/time selections.",
+    "confirm_timezone": "User confirmed new timezone: {timezone}. Restore previous selections.",
+    "cancel_timezone": "User cancelled timezone change.",
+    "refresh": "The selected time slot was booked by someone else and has been cleared.",
+}
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
+    """
+    Offline token estimate, close to Gemini's SentencePiece counts for
+    English and JSON: one token per punctuation mark and one per started
+    four characters of each word.
+    """
+    return sum(
+        math.ceil(len(piece) / 4) if piece[0].isalnum() or piece[0] == "_" else 1
+        for piece in _TOKEN_PATTERN.findall(text)
+    )
+
+
+def context_delta(context: Dict[str, Any], baseline: Dict[str, Any] = DEFAULT_CONTEXT) -> Dict[str, Any]:
+    """Fields of ``context`` that differ from ``baseline``"""
+    return {key: value for key, value in context.items() if baseline.get(key, None) != value}
+
+
+def encode_context(context: Dict[str, Any]) -> str:
+    """Sorted, whitespace-free JSON"""
+    return json.dumps(context, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class _Unknown(dict):
+    def __missing__(self, key):
+        return "unknown"
+
+
+class PromptBudgetError(Exception):
+    """Raised when a prompt cannot be made to fit the token budget"""
+    pass
+
+
+class Prompt:
+    """One model call: the instruction it runs under and the user message"""
+
+    __slots__ = ("variant", "instruction", "text", "instruction_tokens", "message_tokens", "trimmed")
+
+    def __init__(self, variant: str, instruction: str, text: str, instruction_tokens: int, message_tokens: int, trimmed: bool):
+        self.variant = variant
+        self.instruction = instruction
+        self.text = text
+        self.instruction_tokens = instruction_tokens
+        self.message_tokens = message_tokens
+        self.trimmed = trimmed
+
+    @property
+    def total_tokens(self) -> int:
+        return self.instruction_tokens + self.message_tokens
+
+
+class PromptBuilder:
+    """
+    Builds the per-action user message under one instruction variant.
+
+    The session context goes out as compact JSON holding only the fields
+    that differ from a new session. With a ``token_budget``, a prompt
+    that would exceed it is sent without the context; if even that does
+    not fit, ``PromptBudgetError`` is raised and the caller skips the
+    model. With ``record_path``, every call's inputs are appended as a
+    JSON line for ``benchmarks/bench_prompts.py`` to replay.
+    """
+
+    def __init__(self, variant: str = "compact", token_budget: Optional[int] = None, record_path: Optional[str] = None):
+        if variant not in INSTRUCTION_VARIANTS:
+            raise ValueError(f"Unknown prompt variant {variant!r} (choose from {', '.join(INSTRUCTION_VARIANTS)})")
+        self.variant = variant
+        self.instruction = f"{INSTRUCTION_VARIANTS[variant]}\n\n{CONTEXT_NOTE}"
+        self.instruction_tokens = count_tokens(self.instruction)
+        self.token_budget = token_budget
+        self.record_path = record_path
+        self.calls = 0
+        self.trimmed = 0
+        self.over_budget = 0
+        self.message_tokens = 0
+        self.max_message_tokens = 0
+        if record_path:
+            directory = os.path.dirname(record_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+    def message(
+        self,
+        action: str,
+        context: Optional[Dict[str, Any]],
+        data: Optional[Dict[str, Any]],
+        tool_name: Optional[str]
+    ) -> str:
+        """User message for one action; ``context=None`` leaves the session out"""
+        template = ACTION_TEMPLATES.get(action)
+        lines = [template.format_map(_Unknown(data or {})) if template else f"Action: {action}"]
+        if context is not None:
+            lines.append(f"Session: {encode_context(context_delta(context))}")
+        if tool_name:
+            lines.append(f"Call {tool_name}.")
+        return "\n".join(lines)
+
+    def build(
+        self,
+        action: str,
+        session_context: Dict[str, Any],
+        data: Optional[Dict[str, Any]] = None,
+        tool_name: Optional[str] = None
+    ) -> Prompt:
+        """Prompt for one action, within the token budget"""
+        if self.record_path:
+            self._record(action, session_context, data)
+
+        text = self.message(action, session_context, data, tool_name)
+        tokens = count_tokens(text)
+        trimmed = False
+        if self.token_budget and self.instruction_tokens + tokens > self.token_budget:
+            text = self.message(action, None, data, tool_name)
+            tokens = count_tokens(text)
+            trimmed = True
+            if self.instruction_tokens + tokens > self.token_budget:
+                self.over_budget += 1
+                raise PromptBudgetError(
+                    f"{action}: {self.instruction_tokens + tokens} tokens exceeds budget of {self.token_budget}"
+                )
+
+        self.calls += 1
+        self.trimmed += trimmed
+        self.message_tokens += tokens
+        self.max_message_tokens = max(self.max_message_tokens, tokens)
+        return Prompt(self.variant, self.instruction, text, self.instruction_tokens, tokens, trimmed)
+
+    def _record(self, action: str, session_context: Dict[str, Any], data: Optional[Dict[str, Any]]):
+        line = json.dumps({"action": action, "context": session_context, "data": data}, default=str)
+        with open(self.record_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def stats(self) -> Dict[str, Any]:
+        """Token usage so far"""
+        return {
+            "variant": self.variant,
+            "token_budget": self.token_budget,
+            "calls": self.calls,
+            "instruction_tokens": self.instruction_tokens,
+            "avg_message_tokens": round(self.message_tokens / self.calls, 1) if self.calls else 0.0,
+            "max_message_tokens": self.max_message_tokens,
+            "avg_tokens_per_call": round(self.instruction_tokens + self.message_tokens / self.calls, 1) if self.calls else 0.0,
+            "trimmed": self.trimmed,
+            "over_budget": self.over_budget
+        }
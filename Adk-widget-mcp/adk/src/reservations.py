@@ -0,0 +1,586 @@
+"""
+Reservation Store for ADK
+Concurrency-safe slot holds and bookings, in process with an append-only
+booking log or shared between workers through the session store backend
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from availability import DEFAULT_CALENDAR, AvailabilityEngine, get_availability_engine
+from session_store import (
+    RedisSessionStore, SQLiteSessionStore, configured_store_url, create_session_store, sqlite_connect
+)
+from tz_service import parse_value
+
+SlotKey = Tuple[str, str, str]
+
+
+def slot_key(date_value: str, time_value: str, calendar: Optional[Iterable[str]] = None) -> SlotKey:
+    """Key of a bookable slot: calendar scope, date and canonical time"""
+    scope = ",".join(sorted(calendar)) if calendar else DEFAULT_CALENDAR
+    return (scope, date_value, time_value)
+
+
+class Reservation:
+    """A hold or booking of one slot"""
+
+    __slots__ = ("key", "session_id", "state", "expires_at", "booking_id", "details")
+
+    def __init__(self, key: SlotKey, session_id: str, state: str, expires_at: float = 0.0):
+        self.key = key
+        self.session_id = session_id
+        self.state = state
+        self.expires_at = expires_at
+        self.booking_id: Optional[str] = None
+        self.details: Dict[str, Any] = {}
+
+    def is_live(self, now: float) -> bool:
+        return self.state == "booked" or self.expires_at > now
+
+
+class BookingLog:
+    """Append-only JSON-lines log of confirmed bookings"""
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def append(self, record: Dict[str, Any]):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def replay(self) -> List[Dict[str, Any]]:
+        """Every intact record in the log, oldest first"""
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Torn final write after a crash
+                    continue
+        return records
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class ReservationStore:
+    """
+    Slot index split into lock stripes.
+
+    A slot's stripe is picked by hashing its key, so holds and bookings of
+    different slots never wait on each other; there is no global lock.
+    ``hold`` and ``confirm`` are compare-and-reserve operations under the
+    slot's stripe lock.
+
+    With an ``availability`` engine, every booking (replayed or new) marks
+    its calendars busy there, so booked slots drop out of the widget.
+    """
+
+    # Holds live in this process only, so a restart hands them over in the snapshot
+    shared = False
+
+    def __init__(
+        self,
+        stripes: int = 64,
+        hold_seconds: float = 120.0,
+        log: Optional[BookingLog] = None,
+        availability: Optional[AvailabilityEngine] = None,
+        booking_minutes: int = 30
+    ):
+        self.hold_seconds = hold_seconds
+        self.log = log
+        self.availability = availability
+        self.booking_minutes = booking_minutes
+        self._stripe_count = max(1, stripes)
+        self._locks = [threading.Lock() for _ in range(self._stripe_count)]
+        self._slots: List[Dict[SlotKey, Reservation]] = [{} for _ in range(self._stripe_count)]
+        # session_id -> held slot; each session only ever touches its own entry
+        self._session_holds: Dict[str, SlotKey] = {}
+
+        if log is not None:
+            self._restore(log.replay())
+
+    def _stripe(self, key: SlotKey) -> int:
+        return hash(key) % self._stripe_count
+
+    def _restore(self, records: List[Dict[str, Any]]):
+        for record in records:
+            key = tuple(record["slot"])
+            reservation = Reservation(key, record["session_id"], "booked")
+            reservation.booking_id = record["booking_id"]
+            reservation.details = record.get("details", {})
+            self._slots[self._stripe(key)][key] = reservation
+            self._mark_busy(key)
+
+    def _mark_busy(self, key: SlotKey):
+        """Block a booked slot out of its calendars' availability"""
+        if self.availability is None:
+            return
+        scope, date_value, time_value = key
+        try:
+            start = datetime.combine(date.fromisoformat(date_value), datetime.min.time())
+            start += timedelta(minutes=parse_value(time_value))
+        except ValueError:
+            return
+        for resource_id in scope.split(","):
+            self.availability.add_busy(resource_id, start, start + timedelta(minutes=self.booking_minutes))
+
+    def hold(self, key: SlotKey, session_id: str) -> bool:
+        """Hold a slot for a session; fails if someone else holds or booked it"""
+        now = time.monotonic()
+        stripe = self._stripe(key)
+        with self._locks[stripe]:
+            current = self._slots[stripe].get(key)
+            if current and current.is_live(now) and current.session_id != session_id:
+                return False
+            if current and current.state == "booked":
+                return current.session_id == session_id
+            self._slots[stripe][key] = Reservation(
+                key, session_id, "held", now + self.hold_seconds
+            )
+
+        previous = self._session_holds.get(session_id)
+        self._session_holds[session_id] = key
+        if previous and previous != key:
+            self._release_key(previous, session_id)
+        return True
+
+    def confirm(self, key: SlotKey, session_id: str, details: Optional[Dict[str, Any]] = None) -> Optional[Reservation]:
+        """Turn the session's hold (or a free slot) into a booking"""
+        now = time.monotonic()
+        stripe = self._stripe(key)
+        with self._locks[stripe]:
+            current = self._slots[stripe].get(key)
+            if current and current.is_live(now) and current.session_id != session_id:
+                return None
+            if current and current.state == "booked":
+                return current
+
+            reservation = Reservation(key, session_id, "booked")
+            reservation.booking_id = str(uuid.uuid4())
+            reservation.details = details or {}
+            self._slots[stripe][key] = reservation
+
+        if self._session_holds.get(session_id) == key:
+            del self._session_holds[session_id]
+        self._mark_busy(key)
+
+        if self.log is not None:
+            self.log.append({
+                "booking_id": reservation.booking_id,
+                "slot": list(key),
+                "session_id": session_id,
+                "details": reservation.details,
+                "booked_at": time.time()
+            })
+        return reservation
+
+    def release(self, session_id: str):
+        """Drop the session's outstanding hold, if any"""
+        key = self._session_holds.pop(session_id, None)
+        if key:
+            self._release_key(key, session_id)
+
+    def _release_key(self, key: SlotKey, session_id: str):
+        stripe = self._stripe(key)
+        with self._locks[stripe]:
+            current = self._slots[stripe].get(key)
+            if current and current.state == "held" and current.session_id == session_id:
+                del self._slots[stripe][key]
+
+    def is_available(self, key: SlotKey, session_id: Optional[str] = None) -> bool:
+        """True if the slot is free or held/booked by ``session_id``"""
+        stripe = self._stripe(key)
+        current = self._slots[stripe].get(key)
+        return (
+            current is None or
+            not current.is_live(time.monotonic()) or
+            current.session_id == session_id
+        )
+
+    def purge_expired(self) -> int:
+        """Remove expired holds, stripe by stripe"""
+        now = time.monotonic()
+        removed = 0
+        for stripe, lock in enumerate(self._locks):
+            with lock:
+                slots = self._slots[stripe]
+                expired = [key for key, r in slots.items() if not r.is_live(now)]
+                for key in expired:
+                    del slots[key]
+                removed += len(expired)
+        return removed
+
+    def bookings(self) -> List[Reservation]:
+        """All confirmed bookings"""
+        result = []
+        for stripe, lock in enumerate(self._locks):
+            with lock:
+                result.extend(r for r in self._slots[stripe].values() if r.state == "booked")
+        return result
+
+    def sync(self) -> int:
+        """Mark bookings made by other processes busy; nothing to do in process"""
+        return 0
+
+    def export_holds(self) -> List[Dict[str, Any]]:
+        """Live holds with the seconds each has left, for a session snapshot"""
+        if self.shared:
+            return []
+        now = time.monotonic()
+        holds = []
+        for stripe, lock in enumerate(self._locks):
+            with lock:
+                holds.extend(
+                    {"session_id": r.session_id, "slot": list(r.key), "expires_in": r.expires_at - now}
+                    for r in self._slots[stripe].values()
+                    if r.state == "held" and r.expires_at > now
+                )
+        return holds
+
+    def import_holds(self, holds: Iterable[Dict[str, Any]]) -> int:
+        """Adopt holds from ``export_holds`` where the slot is still free"""
+        if self.shared:
+            return 0
+        now = time.monotonic()
+        adopted = 0
+        for hold in holds:
+            if hold["expires_in"] <= 0:
+                continue
+            key = tuple(hold["slot"])
+            stripe = self._stripe(key)
+            with self._locks[stripe]:
+                current = self._slots[stripe].get(key)
+                if current is not None and current.is_live(now):
+                    continue
+                self._slots[stripe][key] = Reservation(key, hold["session_id"], "held", now + hold["expires_in"])
+            self._session_holds[hold["session_id"]] = key
+            adopted += 1
+        return adopted
+
+
+def _booking(key: SlotKey, record: Dict[str, Any]) -> Reservation:
+    reservation = Reservation(key, record["session_id"], "booked")
+    reservation.booking_id = record["booking_id"]
+    reservation.details = record.get("details") or {}
+    return reservation
+
+
+class SQLiteReservationStore(ReservationStore):
+    """
+    Slots in a SQLite table shared by every worker on the host.
+
+    One row per slot, keyed by the slot. ``hold`` and ``confirm`` are
+    single conditional upserts, which SQLite serializes across processes,
+    so two workers can never both take a slot. Bookings carry a sequence
+    number that ``sync`` follows to mark other workers' bookings busy.
+    """
+
+    shared = True
+
+    def __init__(
+        self,
+        path: str,
+        hold_seconds: float = 120.0,
+        availability: Optional[AvailabilityEngine] = None,
+        booking_minutes: int = 30
+    ):
+        super().__init__(
+            stripes=1, hold_seconds=hold_seconds,
+            availability=availability, booking_minutes=booking_minutes
+        )
+        self.path = path
+        self._local = threading.local()
+        self._seen_seq = 0
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS reservations ("
+            "scope TEXT NOT NULL, date TEXT NOT NULL, time TEXT NOT NULL, "
+            "session_id TEXT NOT NULL, state TEXT NOT NULL, expires_at REAL NOT NULL, "
+            "booking_id TEXT, details TEXT, seq INTEGER, "
+            "PRIMARY KEY (scope, date, time))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS reservations_session ON reservations (session_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS reservations_seq ON reservations (seq)")
+        self.sync()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite_connect(self.path)
+        return conn
+
+    def _row(self, key: SlotKey):
+        return self._conn().execute(
+            "SELECT session_id, state, expires_at, booking_id, details FROM reservations "
+            "WHERE scope = ? AND date = ? AND time = ?",
+            key
+        ).fetchone()
+
+    def hold(self, key: SlotKey, session_id: str) -> bool:
+        now = time.time()
+        cursor = self._conn().execute(
+            "INSERT INTO reservations (scope, date, time, session_id, state, expires_at) "
+            "VALUES (?, ?, ?, ?, 'held', ?) "
+            "ON CONFLICT (scope, date, time) DO UPDATE SET "
+            "session_id = excluded.session_id, state = 'held', expires_at = excluded.expires_at "
+            "WHERE reservations.state = 'held' AND "
+            "(reservations.expires_at <= ? OR reservations.session_id = excluded.session_id)",
+            (*key, session_id, now + self.hold_seconds, now)
+        )
+        if cursor.rowcount == 0:
+            row = self._row(key)
+            return row is not None and row[1] == "booked" and row[0] == session_id
+
+        # One hold per session
+        self._conn().execute(
+            "DELETE FROM reservations WHERE session_id = ? AND state = 'held' "
+            "AND NOT (scope = ? AND date = ? AND time = ?)",
+            (session_id, *key)
+        )
+        return True
+
+    def confirm(self, key: SlotKey, session_id: str, details: Optional[Dict[str, Any]] = None) -> Optional[Reservation]:
+        now = time.time()
+        record = {"session_id": session_id, "booking_id": str(uuid.uuid4()), "details": details or {}}
+        cursor = self._conn().execute(
+            "INSERT INTO reservations "
+            "(scope, date, time, session_id, state, expires_at, booking_id, details, seq) "
+            "VALUES (?, ?, ?, ?, 'booked', 0, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM reservations)) "
+            "ON CONFLICT (scope, date, time) DO UPDATE SET "
+            "session_id = excluded.session_id, state = 'booked', expires_at = 0, "
+            "booking_id = excluded.booking_id, details = excluded.details, seq = excluded.seq "
+            "WHERE reservations.state = 'held' AND "
+            "(reservations.expires_at <= ? OR reservations.session_id = excluded.session_id)",
+            (*key, session_id, record["booking_id"], json.dumps(record["details"]), now)
+        )
+        if cursor.rowcount == 0:
+            row = self._row(key)
+            if row is None or row[1] != "booked" or row[0] != session_id:
+                return None
+            record = {"session_id": row[0], "booking_id": row[3], "details": json.loads(row[4] or "{}")}
+        self.sync()
+        return _booking(key, record)
+
+    def release(self, session_id: str):
+        self._conn().execute(
+            "DELETE FROM reservations WHERE session_id = ? AND state = 'held'", (session_id,)
+        )
+
+    def is_available(self, key: SlotKey, session_id: Optional[str] = None) -> bool:
+        row = self._row(key)
+        return (
+            row is None or
+            (row[1] == "held" and row[2] <= time.time()) or
+            row[0] == session_id
+        )
+
+    def purge_expired(self) -> int:
+        cursor = self._conn().execute(
+            "DELETE FROM reservations WHERE state = 'held' AND expires_at <= ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+    def bookings(self) -> List[Reservation]:
+        rows = self._conn().execute(
+            "SELECT scope, date, time, session_id, booking_id, details FROM reservations "
+            "WHERE state = 'booked' ORDER BY seq"
+        ).fetchall()
+        return [
+            _booking(tuple(row[:3]), {"session_id": row[3], "booking_id": row[4], "details": json.loads(row[5] or "{}")})
+            for row in rows
+        ]
+
+    def sync(self) -> int:
+        rows = self._conn().execute(
+            "SELECT scope, date, time, seq FROM reservations "
+            "WHERE state = 'booked' AND seq > ? ORDER BY seq",
+            (self._seen_seq,)
+        ).fetchall()
+        for row in rows:
+            self._mark_busy(tuple(row[:3]))
+            self._seen_seq = row[3]
+        return len(rows)
+
+
+class RedisReservationStore(ReservationStore):
+    """
+    Slots on the Redis session backend.
+
+    A hold is ``SET NX PX`` on the slot's hold key and a booking is
+    ``SET NX`` (no expiry) on its booking key, so Redis arbitrates between
+    workers and hosts. Every booking is also appended under a counter,
+    which ``sync`` follows to mark other workers' bookings busy.
+    """
+
+    shared = True
+
+    def __init__(
+        self,
+        redis: RedisSessionStore,
+        hold_seconds: float = 120.0,
+        availability: Optional[AvailabilityEngine] = None,
+        booking_minutes: int = 30,
+        prefix: str = "adk:slot:"
+    ):
+        super().__init__(
+            stripes=1, hold_seconds=hold_seconds,
+            availability=availability, booking_minutes=booking_minutes
+        )
+        self.redis = redis
+        self.prefix = prefix
+        self._seen_seq = 0
+        self.sync()
+
+    def _key(self, kind: str, key: SlotKey) -> bytes:
+        return f"{self.prefix}{kind}:{'|'.join(key)}".encode()
+
+    def _booked(self, key: SlotKey) -> Optional[Dict[str, Any]]:
+        value = self.redis.command(b"GET", self._key("book", key))
+        return json.loads(value) if value is not None else None
+
+    def _holder(self, key: SlotKey) -> Optional[str]:
+        value = self.redis.command(b"GET", self._key("hold", key))
+        return value.decode() if value is not None else None
+
+    def hold(self, key: SlotKey, session_id: str) -> bool:
+        booked = self._booked(key)
+        if booked is not None:
+            return booked["session_id"] == session_id
+
+        hold_key = self._key("hold", key)
+        ttl = str(int(self.hold_seconds * 1000)).encode()
+        held = self.redis.command(b"SET", hold_key, session_id.encode(), b"PX", ttl, b"NX") is not None
+        if not held:
+            if self._holder(key) != session_id:
+                return False
+            self.redis.command(b"SET", hold_key, session_id.encode(), b"PX", ttl)
+
+        previous = self._session_holds.get(session_id)
+        self._session_holds[session_id] = key
+        if previous and previous != key:
+            self._release_key(previous, session_id)
+        return True
+
+    def confirm(self, key: SlotKey, session_id: str, details: Optional[Dict[str, Any]] = None) -> Optional[Reservation]:
+        holder = self._holder(key)
+        if holder is not None and holder != session_id:
+            return None
+
+        record = {
+            "slot": list(key),
+            "session_id": session_id,
+            "booking_id": str(uuid.uuid4()),
+            "details": details or {},
+            "booked_at": time.time()
+        }
+        value = json.dumps(record, separators=(",", ":")).encode()
+        if self.redis.command(b"SET", self._key("book", key), value, b"NX") is None:
+            booked = self._booked(key)
+            return _booking(key, booked) if booked and booked["session_id"] == session_id else None
+
+        seq = self.redis.command(b"INCR", f"{self.prefix}bookings".encode())
+        self.redis.command(b"SET", f"{self.prefix}booking:{seq}".encode(), value)
+        if self._session_holds.get(session_id) == key:
+            del self._session_holds[session_id]
+        self._release_key(key, session_id)
+        self.sync()
+        return _booking(key, record)
+
+    def _release_key(self, key: SlotKey, session_id: str):
+        if self._holder(key) == session_id:
+            self.redis.command(b"DEL", self._key("hold", key))
+
+    def is_available(self, key: SlotKey, session_id: Optional[str] = None) -> bool:
+        booked = self._booked(key)
+        if booked is not None:
+            return booked["session_id"] == session_id
+        holder = self._holder(key)
+        return holder is None or holder == session_id
+
+    def purge_expired(self) -> int:
+        # Redis expires holds itself
+        return 0
+
+    def _records(self, after: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """(seq, record) of every booking numbered above ``after``"""
+        last = int(self.redis.command(b"GET", f"{self.prefix}bookings".encode()) or 0)
+        records = []
+        for seq in range(after + 1, last + 1):
+            value = self.redis.command(b"GET", f"{self.prefix}booking:{seq}".encode())
+            if value is None:
+                # Counter bumped, record not written yet; pick it up next time
+                break
+            records.append((seq, json.loads(value)))
+        return records
+
+    def bookings(self) -> List[Reservation]:
+        return [_booking(tuple(record["slot"]), record) for _, record in self._records(0)]
+
+    def sync(self) -> int:
+        records = self._records(self._seen_seq)
+        for seq, record in records:
+            self._mark_busy(tuple(record["slot"]))
+            self._seen_seq = seq
+        return len(records)
+
+
+def create_reservation_store(
+    url: Optional[str],
+    log_path: Optional[str] = None,
+    hold_seconds: float = 120.0,
+    availability: Optional[AvailabilityEngine] = None
+) -> ReservationStore:
+    """
+    Reservations on the same backend as sessions: a ``sqlite://`` or
+    ``redis://`` store is shared by every worker, anything else keeps
+    them in process with the booking log at ``log_path``.
+    """
+    store = create_session_store(url)
+    if isinstance(store, SQLiteSessionStore):
+        return SQLiteReservationStore(store.path, hold_seconds, availability)
+    if isinstance(store, RedisSessionStore):
+        return RedisReservationStore(store, hold_seconds, availability)
+    return ReservationStore(
+        hold_seconds=hold_seconds,
+        log=BookingLog(log_path) if log_path else None,
+        availability=availability
+    )
+
+
+# Singleton instance
+_reservation_store = None
+
+
+def get_reservation_store() -> ReservationStore:
+    """Get or create singleton ReservationStore instance"""
+    global _reservation_store
+    if _reservation_store is None:
+        log_path = os.getenv(
+            "BOOKING_LOG",
+            os.path.join(os.path.dirname(__file__), "..", "data", "bookings.jsonl")
+        )
+        _reservation_store = create_reservation_store(
+            configured_store_url(),
+            log_path=log_path,
+            hold_seconds=float(os.getenv("SLOT_HOLD_SECONDS", "120")),
+            availability=get_availability_engine()
+        )
+    return _reservation_store
@@ -0,0 +1,152 @@
+"""
+Response Cache for ADK
+LLM responses keyed on a normalized hash of the prompt
+"""
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+_WHITESPACE = re.compile(r"\s+")
+# Set on a shared call whose caller was cancelled: a waiter makes the call itself
+_RETRY = object()
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so formatting-only differences share an entry"""
+    return _WHITESPACE.sub(" ", prompt).strip()
+
+
+class ResponseCache:
+    """
+    Caches LLM responses for actions whose prompt is fully determined by
+    the action, its data and the session context.
+
+    Only actions listed in ``actions`` are cached (``"*"`` caches all).
+    Entries expire after ``ttl`` seconds and the least recently used entry
+    is evicted beyond ``max_entries``. Concurrent misses on the same key
+    share one call; a failed call is not cached and every waiter sees the
+    error. If the caller making the shared call is cancelled, the waiters
+    are not: one of them makes the call instead.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 2048, actions: Iterable[str] = ()):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.actions = frozenset(actions)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.expired = 0
+        self.evictions = 0
+        self.by_action: Dict[str, Dict[str, int]] = {}
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def enabled_for(self, action: str) -> bool:
+        return "*" in self.actions or action in self.actions
+
+    @staticmethod
+    def key(model: str, instruction: str, action: str, prompt: str) -> str:
+        """
+        Hash of everything that decides the model's answer. ``prompt``
+        should encode the session canonically (``PromptBuilder`` does) so
+        equivalent sessions share an entry.
+        """
+        digest = hashlib.sha256()
+        for part in (model, instruction, action, normalize_prompt(prompt)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def _count(self, action: str, outcome: str):
+        counts = self.by_action.setdefault(action, {"hits": 0, "misses": 0, "coalesced": 0})
+        counts[outcome] += 1
+
+    def get(self, key: str) -> Any:
+        """Fresh cached response, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        response, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expired += 1
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def put(self, key: str, response: Any):
+        self._entries[key] = (response, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_call(self, action: str, key: str, call: Callable[[], Awaitable[Any]]) -> tuple:
+        """
+        ``(response, outcome)`` where outcome is ``hit``, ``coalesced`` or
+        ``miss``. ``call`` runs only on a miss.
+        """
+        while True:
+            response = self.get(key)
+            if response is not None:
+                self.hits += 1
+                self._count(action, "hits")
+                return response, "hit"
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            response = await asyncio.shield(pending)
+            if response is not _RETRY:
+                self.coalesced += 1
+                self._count(action, "coalesced")
+                return response, "coalesced"
+
+        self.misses += 1
+        self._count(action, "misses")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await call()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.set_result(_RETRY)
+            else:
+                future.set_exception(e)
+                # Retrieved by waiters if there are any; silence "never retrieved" otherwise
+                future.exception()
+            raise
+        else:
+            if response is not None:
+                self.put(key, response)
+            future.set_result(response)
+            return response, "miss"
+        finally:
+            del self._inflight[key]
+
+    def invalidate(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-ratio instrumentation, overall and per action"""
+        total = self.hits + self.coalesced + self.misses
+        return {
+            "actions": sorted(self.actions),
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.coalesced) / total if total else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "by_action": self.by_action
+        }
+
+
+def parse_actions(value: Optional[str]) -> frozenset:
+    """``LLM_CACHE_ACTIONS`` value ("connect,change_timezone" or "*") to a set"""
+    return frozenset(a.strip() for a in (value or "").split(",") if a.strip())
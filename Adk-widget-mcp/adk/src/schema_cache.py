@@ -0,0 +1,111 @@
+"""
+Schema Cache for ADK
+Client-side cache of MCP widget schemas with etag revalidation
+"""
+import asyncio
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from tracing import get_tracer
+
+
+class SchemaCache:
+    """
+    Caches tool results that carry an ``etag``.
+
+    Within ``max_age`` seconds a cached result is served without any MCP
+    round trip. After that the tool is called with ``if_none_match`` and a
+    ``not_modified`` answer only refreshes the entry. Every response also
+    carries the server's ``registry_version``; seeing it move marks every
+    other entry stale, so a schema change is picked up on the next fetch.
+    """
+
+    def __init__(self, mcp_client, max_age: float = 30.0):
+        self.mcp_client = mcp_client
+        self.max_age = max_age
+        self.registry_version: Optional[str] = None
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._entries: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Cached equivalent of ``MCPClient.call_tool``"""
+        arguments = arguments or {}
+        key = (tool_name, json.dumps(arguments, sort_keys=True))
+
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry["checked_at"] < self.max_age:
+            self.hits += 1
+            return entry["result"]
+
+        with get_tracer().start_span("schema_cache.fetch", {"mcp.tool": tool_name}) as span:
+            return await self._fetch(tool_name, arguments, key, span)
+
+    async def _fetch(self, tool_name: str, arguments: Dict[str, Any], key: Tuple[str, str], span) -> Dict[str, Any]:
+        """Revalidate or fetch an entry that is missing or past ``max_age``"""
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another caller may have refreshed the entry while we waited
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry["checked_at"] < self.max_age:
+                span.set_attribute("cache.result", "coalesced")
+                self.hits += 1
+                return entry["result"]
+
+            if entry:
+                result = await self.mcp_client.call_tool(
+                    tool_name, {**arguments, "if_none_match": entry["etag"]}
+                )
+            else:
+                result = await self.mcp_client.call_tool(tool_name, arguments)
+
+            self._observe_version(result, key)
+
+            if entry and result.get("not_modified"):
+                span.set_attribute("cache.result", "revalidated")
+                self.revalidations += 1
+                entry["checked_at"] = time.monotonic()
+                return entry["result"]
+
+            span.set_attribute("cache.result", "miss")
+            self.misses += 1
+            if result.get("success") and result.get("etag"):
+                self._entries[key] = {
+                    "result": result,
+                    "etag": result["etag"],
+                    "checked_at": time.monotonic()
+                }
+            return result
+
+    def _observe_version(self, result: Dict[str, Any], current_key: Tuple[str, str]):
+        """Mark other entries stale when the server's registry version moves"""
+        version = result.get("registry_version")
+        if version is None:
+            return
+        if self.registry_version is not None and version != self.registry_version:
+            for key, entry in self._entries.items():
+                if key != current_key:
+                    entry["checked_at"] = float("-inf")
+        self.registry_version = version
+
+    def invalidate(self, tool_name: Optional[str] = None):
+        """Force revalidation of one tool's entries, or of everything"""
+        for key, entry in self._entries.items():
+            if tool_name is None or key[0] == tool_name:
+                entry["checked_at"] = float("-inf")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate instrumentation"""
+        total = self.hits + self.revalidations + self.misses
+        return {
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.revalidations) / total if total else 0.0,
+            "round_trip_rate": (self.revalidations + self.misses) / total if total else 0.0,
+            "registry_version": self.registry_version,
+            "entries": len(self._entries)
+        }
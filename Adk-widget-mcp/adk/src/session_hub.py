@@ -0,0 +1,104 @@
+"""
+Session Hub for ADK
+Connections subscribed to each session, with render fan-out
+"""
+from typing import Any, Dict, Optional, Set
+
+from json_patch import WidgetStream
+from outbound import OutboundQueue
+
+
+class SessionHub:
+    """
+    Lets several connections (tabs, or a delegate) share one session.
+
+    Each session has a set of subscribers (their ``OutboundQueue``) and a
+    ``WidgetStream``. A published render becomes one ``WidgetFrame`` that
+    every subscriber's queue sends, so it is serialized once however many
+    tabs are open, while each queue keeps its own backpressure: a slow
+    tab drops stale renders or is disconnected without holding up the
+    others. A session's stream lives as long as it has subscribers.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[OutboundQueue]] = {}
+        self._streams: Dict[str, WidgetStream] = {}
+        self.published = 0
+        self.deliveries = 0
+        self.peak_subscribers = 0
+
+    def join(self, session_id: str, outbound: OutboundQueue) -> int:
+        """Subscribe a connection; returns how many the session now has"""
+        subscribers = self._subscribers.setdefault(session_id, set())
+        subscribers.add(outbound)
+        if session_id not in self._streams:
+            self._streams[session_id] = WidgetStream(session_id)
+        self.peak_subscribers = max(self.peak_subscribers, len(subscribers))
+        return len(subscribers)
+
+    def leave(self, session_id: str, outbound: OutboundQueue) -> int:
+        """Unsubscribe a connection; returns how many are left"""
+        subscribers = self._subscribers.get(session_id)
+        if subscribers is None:
+            return 0
+        subscribers.discard(outbound)
+        if subscribers:
+            return len(subscribers)
+        del self._subscribers[session_id]
+        self._streams.pop(session_id, None)
+        return 0
+
+    def subscriber_count(self, session_id: str) -> int:
+        return len(self._subscribers.get(session_id, ()))
+
+    def publish_widget(
+        self,
+        session_id: str,
+        widget: Dict[str, Any],
+        widget_json: Optional[bytes] = None
+    ) -> int:
+        """Queue a render for every subscriber; returns how many got it"""
+        subscribers = self._subscribers.get(session_id)
+        if not subscribers:
+            return 0
+        frame = self._streams[session_id].publish(widget, widget_json)
+        for outbound in subscribers:
+            outbound.put_frame(frame)
+        self.published += 1
+        self.deliveries += len(subscribers)
+        return len(subscribers)
+
+    def send_private(
+        self,
+        session_id: str,
+        outbound: OutboundQueue,
+        widget: Dict[str, Any],
+        widget_json: Optional[bytes] = None
+    ) -> bool:
+        """Queue a render for one subscriber only (its first render, a resync)"""
+        stream = self._streams.get(session_id)
+        if stream is None:
+            return False
+        outbound.put_frame(stream.private(widget, widget_json))
+        return True
+
+    def publish_text(self, session_id: str, text: str) -> int:
+        """Queue an encoded message for every subscriber"""
+        subscribers = self._subscribers.get(session_id, ())
+        for outbound in subscribers:
+            outbound.put_text(text)
+        return len(subscribers)
+
+    def stats(self) -> Dict[str, Any]:
+        """Fan-out instrumentation"""
+        sessions = len(self._subscribers)
+        connections = sum(len(s) for s in self._subscribers.values())
+        return {
+            "sessions": sessions,
+            "connections": connections,
+            "shared_sessions": sum(1 for s in self._subscribers.values() if len(s) > 1),
+            "peak_subscribers": self.peak_subscribers,
+            "published": self.published,
+            "deliveries": self.deliveries,
+            "fanout": round(self.deliveries / self.published, 2) if self.published else 0.0
+        }
@@ -2,19 +2,87 @@
 Session Manager for ADK
 Handles in-memory session storage with automatic cleanup
 """
+import asyncio
+import json
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
+from typing import Any, Callable, Dict, Iterable, List, Optional
 import threading
 
+from history_store import SessionHistory, HistoryCompactor, estimate_size
+from session_store import SessionStore, configured_store_url, create_session_store
+from tracing import traced
+
+# Context every new session starts with
+DEFAULT_CONTEXT = {
+    "timezone": "Eastern Time (ET)",
+    "timezone_abbr": "ET",
+    "selected_date": None,
+    "selected_date_value": None,
+    "selected_time": None,
+    "selected_time_value": None,
+    "current_widget": "schedule_meeting",
+    "current_action": None
+}
+
 
 class SessionManager:
-    """In-memory session storage for demo purposes"""
+    """
+    In-memory session storage for demo purposes.
+
+    With a ``store``, every change is written through to it and sessions
+    missing locally are loaded from it, so the local dict is just a cache
+    of the sessions this process is serving. That lets a client reconnect
+    to any worker sharing the store. Writes are write-behind: a session is
+    serialized under the lock and a writer thread does the store I/O,
+    keeping only the latest value of a session that changes again before
+    it is written. Store reads never happen under the lock; use
+    ``load_session`` from the event loop so they happen off it, too.
+
+    On a shared store every write bumps the session's ``rev`` and records
+    this process as its ``writer``. ``load_session`` re-reads a session
+    with no local write pending and adopts the stored copy if another
+    worker wrote since, so two connections to one session on different
+    workers see each other's changes instead of diverging.
+
+    ``in_use`` (set by the server to the session hub's subscriber count)
+    marks sessions with open connections; the memory budget never evicts
+    those, or the next click on an open tab would find no session.
+    """
     
-    def __init__(self, session_timeout: int = 1800):
-        self._sessions: Dict[str, Dict[str, Any]] = {}
+    def __init__(
+        self,
+        session_timeout: int = 1800,
+        history_capacity: int = 50,
+        compactor_factory: Optional[Callable[[], HistoryCompactor]] = None,
+        memory_budget_bytes: Optional[int] = 64 * 1024 * 1024,
+        store: Optional[SessionStore] = None,
+        in_use: Optional[Callable[[str], Any]] = None
+    ):
+        # Ordered by recency: coldest session first, hottest last
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._session_bytes: Dict[str, int] = {}
+        self._total_bytes = 0
         self._lock = threading.Lock()
         self.session_timeout = session_timeout
+        self.history_capacity = history_capacity
+        self.compactor_factory = compactor_factory
+        self.memory_budget_bytes = memory_budget_bytes
+        self.evicted_count = 0
+        self.store = store
+        self.in_use = in_use
+        self.store_writes = 0
+        self.coalesced_writes = 0
+        self.adopted_count = 0
+        self.writer_id = uuid.uuid4().hex
+        # session_id -> serialized session, or None for a delete; in order
+        self._pending: "OrderedDict[str, Optional[bytes]]" = OrderedDict()
+        # Taken by the writer, not yet in the store
+        self._writing: Dict[str, Optional[bytes]] = {}
+        self._pending_cond = threading.Condition()
+        if store is not None:
+            threading.Thread(target=self._write_loop, name="session-writer", daemon=True).start()
     
     def create_session(self) -> str:
         """Create new session and return session_id"""
@@ -25,35 +93,44 @@ class SessionManager:
                 "session_id": session_id,
                 "created_at": datetime.utcnow(),
                 "last_activity": datetime.utcnow(),
-                "context": {
-                    "timezone": "Eastern Time (ET)",
-                    "timezone_abbr": "ET",
-                    "selected_date": None,
-                    "selected_date_value": None,
-                    "selected_time": None,
-                    "selected_time_value": None,
-                    "current_widget": "schedule_meeting",
-                    "current_action": None
-                },
-                "conversation_history": []
+                "context": dict(DEFAULT_CONTEXT),
+                "conversation_history": self._new_history()
             }
+            self._account(session_id)
+            self._enforce_budget(keep=session_id)
+            self._persist(session_id)
         
         return session_id
     
+    @traced("session.get")
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve session by ID"""
         with self._lock:
-            session = self._sessions.get(session_id)
-            
-            if session:
-                if self._is_expired(session):
-                    del self._sessions[session_id]
-                    return None
-                
-                session["last_activity"] = datetime.utcnow()
-            
-            return session
+            local = session_id in self._sessions
+        data = self._read(session_id) if not local and self.store is not None else None
+        with self._lock:
+            if data is not None:
+                self._adopt(session_id, data)
+            return self._touch(session_id)
     
+    async def load_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        ``get_session`` for the event loop: the store read runs in a thread.
+        On a shared store it also picks up another worker's newer copy.
+        """
+        data = None
+        if self.store is not None:
+            with self._lock:
+                local = session_id in self._sessions
+            if not local or (self.store.shared and self._queued(session_id) is False):
+                data = await asyncio.to_thread(self._read, session_id)
+        # Adopt and touch in one step: the session may have been released while we read
+        with self._lock:
+            if data is not None:
+                self._adopt(session_id, data)
+            return self._touch(session_id)
+    
+    @traced("session.update")
     def update_session(self, session_id: str, data: Dict[str, Any]) -> bool:
         """Update session context"""
         with self._lock:
@@ -69,16 +146,55 @@ class SessionManager:
                 session["conversation_history"].extend(data["conversation_history"])
             
             session["last_activity"] = datetime.utcnow()
+            self._sessions.move_to_end(session_id)
+            self._account(session_id)
+            self._enforce_budget(keep=session_id)
+            self._persist(session_id)
             return True
     
     def delete_session(self, session_id: str) -> bool:
         """Delete session"""
         with self._lock:
+            if self.store is not None:
+                self._queue_write(session_id, None)
             if session_id in self._sessions:
-                del self._sessions[session_id]
+                self._remove(session_id)
                 return True
             return False
     
+    def release_session(self, session_id: str):
+        """Client went away: keep the session in the store for a reconnect"""
+        if self.store is None:
+            self.delete_session(session_id)
+            return
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+    
+    def get_session_bytes(self, session_id: str) -> int:
+        """Approximate memory held by a session"""
+        with self._lock:
+            return self._session_bytes.get(session_id, 0)
+    
+    @property
+    def total_bytes(self) -> int:
+        """Approximate memory held by all sessions"""
+        return self._total_bytes
+    
+    def purge_store(self) -> int:
+        """Delete expired rows from a store that does not expire them itself"""
+        purge = getattr(self.store, "purge_expired", None)
+        if purge is None:
+            return 0
+        return self._store_call(purge) or 0
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued write has reached the store"""
+        with self._pending_cond:
+            return self._pending_cond.wait_for(
+                lambda: not self._pending and not self._writing, timeout
+            )
+    
     def cleanup_expired_sessions(self):
         """Remove all expired sessions"""
         with self._lock:
@@ -88,10 +204,221 @@ class SessionManager:
             ]
             
             for sid in expired_ids:
-                del self._sessions[sid]
+                self._remove(sid)
             
             return len(expired_ids)
     
+    def export_sessions(self) -> List[Dict[str, Any]]:
+        """Plain records of every live session, coldest first (for a snapshot)"""
+        with self._lock:
+            return [
+                {
+                    "session_id": session_id,
+                    "created_at": session["created_at"],
+                    "last_activity": session["last_activity"],
+                    "context": dict(session["context"]),
+                    "conversation_history": session["conversation_history"].to_dict()
+                }
+                for session_id, session in self._sessions.items()
+                if not self._is_expired(session)
+            ]
+    
+    def import_sessions(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Adopt sessions exported by another process; returns how many were
+        loaded. Expired records are skipped and recency order is kept.
+        """
+        loaded = 0
+        # Sessions share a handful of distinct contexts; size each once
+        context_sizes: Dict[Any, int] = {}
+        with self._lock:
+            for record in records:
+                if self._is_expired(record):
+                    continue
+                history = self._new_history()
+                if record["conversation_history"].get("turns") or record["conversation_history"].get("summary"):
+                    history.load(record["conversation_history"])
+                session_id = record["session_id"]
+                context = record["context"]
+                self._sessions[session_id] = {
+                    "session_id": session_id,
+                    "created_at": record["created_at"],
+                    "last_activity": record["last_activity"],
+                    "context": context,
+                    "conversation_history": history
+                }
+                self._sessions.move_to_end(session_id)
+                try:
+                    key = tuple(context.items())
+                    context_bytes = context_sizes.get(key)
+                    if context_bytes is None:
+                        context_bytes = context_sizes[key] = estimate_size(context)
+                except TypeError:
+                    context_bytes = None
+                self._account(session_id, context_bytes)
+                self._persist(session_id)
+                loaded += 1
+            self._enforce_budget()
+        return loaded
+    
+    def _new_history(self) -> SessionHistory:
+        """Create a bounded history buffer for a new session"""
+        compactor = self.compactor_factory() if self.compactor_factory else None
+        return SessionHistory(capacity=self.history_capacity, compactor=compactor)
+    
+    def _persist(self, session_id: str):
+        """Queue a session for writing to the store (lock held)"""
+        if self.store is None:
+            return
+        session = self._sessions[session_id]
+        session["rev"] = session.get("rev", 0) + 1
+        session["writer"] = self.writer_id
+        value = json.dumps({
+            "session_id": session_id,
+            "rev": session["rev"],
+            "writer": self.writer_id,
+            "created_at": session["created_at"].isoformat(),
+            "last_activity": session["last_activity"].isoformat(),
+            "context": session["context"],
+            "conversation_history": session["conversation_history"].to_dict()
+        }, separators=(",", ":")).encode("utf-8")
+        self._queue_write(session_id, value)
+    
+    def _queue_write(self, session_id: str, value: Optional[bytes]):
+        """Hand a put (or a delete, for None) to the writer thread"""
+        with self._pending_cond:
+            if session_id in self._pending:
+                self.coalesced_writes += 1
+            self._pending[session_id] = value
+            self._pending.move_to_end(session_id)
+            self._pending_cond.notify_all()
+    
+    def _queued(self, session_id: str):
+        """Newest value not yet in the store: bytes, None (deleted) or False"""
+        with self._pending_cond:
+            if session_id in self._pending:
+                return self._pending[session_id]
+            return self._writing.get(session_id, False)
+    
+    def _write_loop(self):
+        """Writer thread: apply queued puts and deletes to the store"""
+        while True:
+            with self._pending_cond:
+                self._pending_cond.wait_for(lambda: self._pending)
+                self._writing = dict(self._pending)
+                self._pending.clear()
+            
+            for session_id, value in self._writing.items():
+                if value is None:
+                    self._store_call(self.store.delete, session_id)
+                else:
+                    self._store_call(self.store.put, session_id, value, self.session_timeout)
+                self.store_writes += 1
+            
+            with self._pending_cond:
+                self._writing = {}
+                self._pending_cond.notify_all()
+    
+    def _read(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Newest record of a session, queued or stored (lock not held)"""
+        value = self._queued(session_id)
+        if value is False:
+            value = self._store_call(self.store.get, session_id)
+        return json.loads(value) if value is not None else None
+    
+    def _adopt(self, session_id: str, data: Dict[str, Any]):
+        """Install a record read by ``_read`` unless the local copy is as new (lock held)"""
+        session = self._sessions.get(session_id)
+        if session is None:
+            self._install(session_id, data)
+        elif self._queued(session_id) is False and (
+            data.get("rev", 0) > session.get("rev", 0)
+            or (data.get("rev", 0) == session.get("rev", 0) and data.get("writer") != session.get("writer"))
+        ):
+            # Another worker wrote since our last write: the store's copy wins
+            self._install(session_id, data)
+            self.adopted_count += 1
+    
+    def _touch(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Local session, marked used; None if missing or expired (lock held)"""
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        if self._is_expired(session):
+            self._remove(session_id)
+            if self.store is not None:
+                self._queue_write(session_id, None)
+            return None
+        session["last_activity"] = datetime.utcnow()
+        self._sessions.move_to_end(session_id)
+        return session
+    
+    def _install(self, session_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Adopt a decoded store record as the local copy (lock held)"""
+        history = self._new_history()
+        history.load(data["conversation_history"])
+        session = {
+            "session_id": session_id,
+            "created_at": datetime.fromisoformat(data["created_at"]),
+            "last_activity": datetime.fromisoformat(data["last_activity"]),
+            "context": data["context"],
+            "conversation_history": history,
+            "rev": data.get("rev", 0),
+            "writer": data.get("writer")
+        }
+        self._sessions[session_id] = session
+        self._account(session_id)
+        self._enforce_budget(keep=session_id)
+        return session
+    
+    def _store_call(self, method, *args):
+        """Call the store; a failing store degrades to local-only sessions"""
+        try:
+            return method(*args)
+        except Exception as e:
+            print(f"⚠️  Session store error: {e}")
+            return None
+    
+    def _account(self, session_id: str, context_bytes: Optional[int] = None):
+        """Refresh the approximate byte count of a session (lock held)"""
+        session = self._sessions[session_id]
+        if context_bytes is None:
+            context_bytes = estimate_size(session["context"])
+        size = context_bytes + session["conversation_history"].approx_bytes
+        self._total_bytes += size - self._session_bytes.get(session_id, 0)
+        self._session_bytes[session_id] = size
+    
+    def _remove(self, session_id: str):
+        """Drop a session and its accounting (lock held)"""
+        del self._sessions[session_id]
+        self._total_bytes -= self._session_bytes.pop(session_id, 0)
+    
+    def _enforce_budget(self, keep: Optional[str] = None):
+        """
+        Evict the coldest sessions until under the memory budget (lock held).
+        ``keep`` and sessions with open connections are skipped, so the
+        budget can be exceeded while every session over it is in use.
+        """
+        if self.memory_budget_bytes is None:
+            return
+        
+        excess = self._total_bytes - self.memory_budget_bytes
+        if excess <= 0:
+            return
+        
+        victims = []
+        for session_id in self._sessions:
+            if excess <= 0:
+                break
+            if session_id == keep or (self.in_use is not None and self.in_use(session_id)):
+                continue
+            victims.append(session_id)
+            excess -= self._session_bytes.get(session_id, 0)
+        
+        for session_id in victims:
+            self._remove(session_id)
+            self.evicted_count += 1
+    
     def _is_expired(self, session: Dict[str, Any]) -> bool:
         """Check if session is expired"""
         last_activity = session["last_activity"]
@@ -107,5 +434,5 @@ def get_session_manager() -> SessionManager:
     """Get or create singleton SessionManager instance"""
     global _session_manager
     if _session_manager is None:
-        _session_manager = SessionManager()
+        _session_manager = SessionManager(store=create_session_store(configured_store_url()))
     return _session_manager
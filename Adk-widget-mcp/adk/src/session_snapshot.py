@@ -0,0 +1,247 @@
+"""
+Session Snapshot for ADK
+Compact binary export/import of live sessions for drain-and-handoff deploys
+"""
+import gc
+import json
+import os
+import struct
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+
+SNAPSHOT_MAGIC = b"ADKSNAP"
+SNAPSHOT_VERSION = 3
+# Version 2 is version 3 without slot holds
+_READABLE_VERSIONS = (2, 3)
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# magic, version, session count, tables length, written_at (µs since epoch)
+_HEADER = struct.Struct("<7sBIIq")
+# uuid bytes, created_at, last_activity (µs since epoch), then 1-based
+# indexes into the text id, context and history tables (0: none)
+_RECORD = struct.Struct("<16sqqIII")
+_NO_UUID = bytes(16)
+_EMPTY_HISTORY = {"summary": None, "turns": []}
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is truncated, corrupt or from another format version"""
+    pass
+
+
+def _micros(value: datetime) -> int:
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _uuid_bytes(session_id: str) -> bytes:
+    """16 raw bytes for a canonical (lowercase, hyphenated) uuid, else b''"""
+    if len(session_id) != 36 or session_id != session_id.lower() or session_id.count("-") != 4 \
+            or session_id[8] != "-" or session_id[13] != "-" or session_id[18] != "-" or session_id[23] != "-":
+        return b""
+    try:
+        return bytes.fromhex(session_id.replace("-", ""))
+    except ValueError:
+        return b""
+
+
+def _uuid_text(raw: bytes) -> str:
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def encode_sessions(
+    sessions: Iterable[Dict[str, Any]],
+    level: int = 1,
+    holds: Iterable[Dict[str, Any]] = ()
+) -> bytes:
+    """
+    Encode session records (as produced by ``SessionManager.export_sessions``)
+    and the slot holds of those sessions (``ReservationStore.export_holds``).
+
+    Layout: a fixed header, then a zlib body holding a JSON block of
+    tables followed by one fixed-size struct record per session. Contexts
+    are interned whole, since sessions mostly share the same handful of
+    timezone/date/time combinations, and only non-empty histories and
+    non-uuid session ids get a table entry. Fixed records let the loader
+    unpack every session in one ``iter_unpack`` pass.
+    """
+    contexts: Dict[Any, int] = {}
+    context_values: List[Dict[str, Any]] = []
+    histories: List[Dict[str, Any]] = []
+    text_ids: List[str] = []
+    records = bytearray()
+    pack = _RECORD.pack
+    count = 0
+
+    for session in sessions:
+        count += 1
+        session_id = session["session_id"]
+        raw_id = _uuid_bytes(session_id)
+        text_index = 0
+        if not raw_id:
+            text_ids.append(session_id)
+            text_index = len(text_ids)
+            raw_id = _NO_UUID
+
+        context = session["context"]
+        try:
+            key = tuple(context.items())
+            hash(key)
+        except TypeError:
+            key = json.dumps(context, sort_keys=True, separators=(",", ":"))
+        context_index = contexts.get(key)
+        if context_index is None:
+            context_values.append(context)
+            context_index = contexts[key] = len(context_values)
+
+        history = session["conversation_history"]
+        history_index = 0
+        if history.get("summary") is not None or history.get("turns"):
+            histories.append(history)
+            history_index = len(histories)
+
+        records += pack(
+            raw_id,
+            _micros(session["created_at"]),
+            _micros(session["last_activity"]),
+            text_index,
+            context_index,
+            history_index
+        )
+
+    tables = json.dumps(
+        {
+            "ids": text_ids,
+            "contexts": context_values,
+            "histories": histories,
+            "holds": [
+                [hold["session_id"], *hold["slot"], round(hold["expires_in"], 3)]
+                for hold in holds
+            ]
+        },
+        separators=(",", ":")
+    ).encode("utf-8")
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, count, len(tables), _micros(datetime.utcnow()))
+    return header + zlib.compress(tables + records, level)
+
+
+def decode_sessions(data: bytes) -> List[Dict[str, Any]]:
+    """Inverse of ``encode_sessions``, sessions only"""
+    return decode_snapshot(data)[0]
+
+
+def decode_snapshot(data: bytes) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Inverse of ``encode_sessions``: (sessions, holds). A hold's
+    ``expires_in`` is reduced by the snapshot's age.
+    """
+    if len(data) < _HEADER.size:
+        raise SnapshotError("snapshot is truncated")
+    magic, version, count, tables_length, written_at = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError("not a session snapshot")
+    if version not in _READABLE_VERSIONS:
+        raise SnapshotError(f"unsupported snapshot version {version}")
+
+    try:
+        body = zlib.decompress(data[_HEADER.size:])
+        if len(body) != tables_length + count * _RECORD.size:
+            raise SnapshotError("snapshot is truncated")
+        tables = json.loads(body[:tables_length])
+        text_ids = [None] + tables["ids"]
+        contexts = [None] + tables["contexts"]
+        histories = [_EMPTY_HISTORY] + tables["histories"]
+
+        epoch = _EPOCH
+        micros = _MICROSECOND
+        sessions = []
+        for raw_id, created, active, text_index, context_index, history_index in _RECORD.iter_unpack(
+            body[tables_length:]
+        ):
+            history = histories[history_index]
+            sessions.append({
+                "session_id": text_ids[text_index] if text_index else _uuid_text(raw_id),
+                "created_at": epoch + created * micros,
+                "last_activity": epoch + active * micros,
+                "context": dict(contexts[context_index]),
+                "conversation_history": {"summary": history["summary"], "turns": list(history["turns"])}
+            })
+        
+        age = (_micros(datetime.utcnow()) - written_at) / 1e6
+        holds = [
+            {"session_id": session_id, "slot": [scope, date_value, time_value], "expires_in": expires_in - age}
+            for session_id, scope, date_value, time_value, expires_in in tables.get("holds", [])
+        ]
+    except SnapshotError:
+        raise
+    except (zlib.error, IndexError, KeyError, TypeError, struct.error, ValueError) as e:
+        raise SnapshotError(f"corrupt snapshot: {e}") from e
+    return sessions, holds
+
+
+def write_snapshot(path: str, sessions: Iterable[Dict[str, Any]], holds: Iterable[Dict[str, Any]] = ()) -> int:
+    """Atomically write a snapshot file; returns its size in bytes"""
+    data = encode_sessions(sessions, holds=holds)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp = f"{path}.tmp"
+    with open(temp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+    return len(data)
+
+
+def read_snapshot(path: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Read and decode a snapshot file: (sessions, holds)"""
+    with open(path, "rb") as f:
+        return decode_snapshot(f.read())
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Hold off cyclic GC during a bulk export/import: the sessions are
+    cycle-free, and with 100k of them live every collection that the
+    allocations would trigger rescans them all for nothing.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def snapshot_sessions(manager, path: str, reservations=None) -> Tuple[int, int, float]:
+    """
+    Write every live session of ``manager``, and their slot holds in
+    ``reservations``; returns (sessions, bytes, seconds)
+    """
+    start = time.perf_counter()
+    with _gc_paused():
+        records = manager.export_sessions()
+        holds = reservations.export_holds() if reservations is not None else []
+        size = write_snapshot(path, records, holds)
+    return len(records), size, time.perf_counter() - start
+
+
+def restore_sessions(manager, path: str, reservations=None) -> Tuple[int, int, float]:
+    """
+    Load a snapshot into ``manager`` and its slot holds into
+    ``reservations``; returns (loaded, expired, seconds)
+    """
+    start = time.perf_counter()
+    with _gc_paused():
+        records, holds = read_snapshot(path)
+        loaded = manager.import_sessions(records)
+        if reservations is not None:
+            reservations.import_holds(holds)
+    return loaded, len(records) - loaded, time.perf_counter() - start
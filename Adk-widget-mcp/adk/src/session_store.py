@@ -0,0 +1,288 @@
+"""
+Session Store for ADK
+Pluggable shared storage so sessions survive a reconnect to another worker
+"""
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+
+class SessionStoreError(Exception):
+    """Raised when a session store backend fails"""
+    pass
+
+
+class SessionStore:
+    """
+    Key/value store of serialized sessions with a per-entry TTL.
+
+    Values are opaque bytes; the SessionManager owns the encoding. Every
+    write refreshes the TTL, so a session lives as long as it is used.
+    """
+
+    # Seen by other processes, so another worker may have written a newer copy
+    shared = True
+
+    def get(self, session_id: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def put(self, session_id: str, value: bytes, ttl: float):
+        raise NotImplementedError
+
+    def delete(self, session_id: str):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """In-process store; sessions only survive reconnects to the same process"""
+
+    shared = False
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[session_id]
+                return None
+            return entry[0]
+
+    def put(self, session_id: str, value: bytes, ttl: float):
+        with self._lock:
+            self._entries[session_id] = (value, time.time() + ttl)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+
+def sqlite_connect(path: str, mmap_bytes: int = 64 * 1024 * 1024) -> sqlite3.Connection:
+    """Autocommit connection in WAL mode, as every worker on the host opens it"""
+    conn = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA mmap_size={int(mmap_bytes)}")
+    return conn
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Store in a local SQLite file shared by every worker on the host.
+
+    WAL mode lets readers run alongside the single writer, and the memory-
+    mapped database keeps hot pages in the page cache shared between
+    processes. Each thread gets its own connection.
+    """
+
+    def __init__(self, path: str, mmap_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.mmap_bytes = mmap_bytes
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_expiry ON sessions (expires_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite_connect(self.path, self.mmap_bytes)
+        return conn
+
+    def get(self, session_id: str) -> Optional[bytes]:
+        row = self._conn().execute(
+            "SELECT value FROM sessions WHERE session_id = ? AND expires_at > ?",
+            (session_id, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, session_id: str, value: bytes, ttl: float):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO sessions (session_id, value, expires_at) VALUES (?, ?, ?)",
+            (session_id, value, time.time() + ttl)
+        )
+
+    def delete(self, session_id: str):
+        self._conn().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def purge_expired(self) -> int:
+        """Delete expired rows (Redis does this itself)"""
+        cursor = self._conn().execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+        return cursor.rowcount
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Store on any server speaking the Redis protocol (RESP2).
+
+    Uses plain GET / SET PX / DEL over one socket per thread, so it works
+    against Redis, KeyDB, Dragonfly or the stand-in in
+    ``benchmarks/resp_server.py`` without a client library.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        prefix: str = "adk:session:",
+        timeout: float = 2.0
+    ):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.prefix = prefix
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._local.sock = sock
+        self._local.reader = sock.makefile("rb")
+        if self.password:
+            self._roundtrip(b"AUTH", self.password.encode())
+        if self.db:
+            self._roundtrip(b"SELECT", str(self.db).encode())
+
+    def _close_socket(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                self._local.reader.close()
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = None
+
+    def _roundtrip(self, *args: bytes):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        self._local.sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._local.reader.readline()
+        if not line:
+            raise ConnectionError("connection closed by server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body
+        if kind == b"-":
+            raise SessionStoreError(body.decode(errors="replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._local.reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(body)
+            if count < 0:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise SessionStoreError(f"unexpected reply: {line!r}")
+
+    def command(self, *args: bytes):
+        """Run a command, reconnecting once if the socket went away"""
+        for attempt in range(2):
+            if getattr(self._local, "sock", None) is None:
+                self._connect()
+            try:
+                return self._roundtrip(*args)
+            except (ConnectionError, OSError):
+                self._close_socket()
+                if attempt:
+                    raise
+
+    def _key(self, session_id: str) -> bytes:
+        return (self.prefix + session_id).encode()
+
+    def get(self, session_id: str) -> Optional[bytes]:
+        return self.command(b"GET", self._key(session_id))
+
+    def put(self, session_id: str, value: bytes, ttl: float):
+        self.command(b"SET", self._key(session_id), value, b"PX", str(int(ttl * 1000)).encode())
+
+    def delete(self, session_id: str):
+        self.command(b"DEL", self._key(session_id))
+
+    def ping(self) -> bool:
+        return self.command(b"PING") == b"PONG"
+
+    def close(self):
+        self._close_socket()
+
+
+def create_session_store(url: Optional[str]) -> Optional[SessionStore]:
+    """
+    Build a store from a URL:
+
+    - ``memory://``
+    - ``sqlite:///path/to/sessions.db``
+    - ``redis://[:password@]host[:port][/db]``
+    """
+    if not url:
+        return None
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        return MemorySessionStore()
+    if parsed.scheme == "sqlite":
+        path = parsed.path if not parsed.netloc else parsed.netloc + parsed.path
+        return SQLiteSessionStore(path)
+    if parsed.scheme == "redis":
+        db = parsed.path.lstrip("/")
+        return RedisSessionStore(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=int(db) if db else 0,
+            password=parsed.password
+        )
+    raise ValueError(f"Unsupported session store: {url}")
+
+
+def default_store_url(workers: int) -> Optional[str]:
+    """Store to use when SESSION_STORE is unset"""
+    if workers <= 1:
+        return None
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "sessions.db")
+    return "sqlite:///" + os.path.normpath(path)
+
+
+def configured_store_url() -> Optional[str]:
+    """SESSION_STORE, or the default for ADK_WORKERS"""
+    return os.getenv("SESSION_STORE") or default_store_url(int(os.getenv("ADK_WORKERS", "1")))
+
+
+def is_shared_store_url(url: Optional[str]) -> bool:
+    """True if the store is visible to other processes"""
+    return bool(url) and urlparse(url).scheme in ("sqlite", "redis")
+
@@ -0,0 +1,193 @@
+"""
+Speculative Renderer for ADK
+Pre-renders the widgets a session is likely to ask for next
+"""
+import asyncio
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from tracing import get_tracer
+
+# Actions whose response depends only on the session context
+SPECULATABLE_ACTIONS = {
+    "select_date", "select_time", "change_timezone", "confirm_timezone", "cancel_timezone"
+}
+
+
+class SpeculativeRenderer:
+    """
+    Predicts the next actions after each render and renders their widgets
+    in the background.
+
+    Results are keyed by the tool the action maps to plus every context
+    field the widget depends on, so a stale prediction can never match.
+    Entries are capped per session and by total payload bytes, evicting
+    least recently stored first.
+    """
+
+    def __init__(
+        self,
+        agent,
+        max_entries_per_session: int = 16,
+        max_total_bytes: int = 32 * 1024 * 1024
+    ):
+        self.agent = agent
+        self.max_entries_per_session = max_entries_per_session
+        self.max_total_bytes = max_total_bytes
+        self.hits = 0
+        self.misses = 0
+        self.rendered = 0
+        self.evicted_unused = 0
+        self._entries: "OrderedDict[Tuple[str, Tuple], Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._session_keys: Dict[str, "OrderedDict[Tuple, None]"] = {}
+        self._total_bytes = 0
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _fingerprint(self, action: str, context: Dict[str, Any]) -> Optional[Tuple]:
+        tool_name = self.agent._determine_tool_for_action(action)
+        if tool_name is None:
+            return None
+        availability = self.agent.widget_populator.availability
+        return (
+            tool_name,
+            context.get("timezone"),
+            context.get("timezone_abbr"),
+            context.get("selected_date_value"),
+            context.get("selected_time_value"),
+            tuple(context.get("attendees") or ()),
+            # Anything that changes the rendered output without touching the context
+            date.today(),
+            self.agent.schema_cache.registry_version,
+            availability.version if availability is not None else None,
+        )
+
+    def take(self, session_id: str, action: str, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Pre-rendered response for this action and context, if one exists"""
+        if action not in SPECULATABLE_ACTIONS:
+            return None
+        key = self._fingerprint(action, context)
+        entry = self._entries.pop((session_id, key), None)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        response, size = entry
+        self._total_bytes -= size
+        self._session_keys[session_id].pop(key, None)
+        self.hits += 1
+        return response
+
+    def schedule(self, session_id: str, context: Dict[str, Any], response: Dict[str, Any]):
+        """Start speculating on the actions likely to follow ``response``"""
+        if response.get("type") != "widget_render":
+            return
+        previous = self._tasks.get(session_id)
+        if previous and not previous.done():
+            previous.cancel()
+        self._tasks[session_id] = asyncio.create_task(
+            self._speculate(session_id, dict(context), response["widget"])
+        )
+
+    def _predict(self, context: Dict[str, Any], widget: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Likely (action, resulting context) pairs after showing ``widget``"""
+        predictions = []
+        properties = widget.get("properties", {})
+
+        if widget.get("widget_type") == "schedule_meeting":
+            predictions.append(("change_timezone", {**context, "current_action": "selecting_timezone"}))
+            for option in properties.get("date_selector", {}).get("options", []):
+                if option["value"] != context.get("selected_date_value"):
+                    predictions.append(("select_date", {
+                        **context,
+                        "selected_date_value": option["value"],
+                        "selected_date": option.get("label", option["value"])
+                    }))
+            if context.get("selected_date_value"):
+                for option in properties.get("time_slots", {}).get("options", []):
+                    if option["value"] != context.get("selected_time_value"):
+                        predictions.append(("select_time", {
+                            **context,
+                            "selected_time_value": option["value"],
+                            "selected_time": option.get("label", option["value"])
+                        }))
+
+        elif widget.get("widget_type") == "timezone_selector":
+            predictions.append(("cancel_timezone", {**context, "current_action": None}))
+            for option in properties.get("timezone_list", {}).get("options", []):
+                predictions.append(("confirm_timezone", {
+                    **context,
+                    "timezone": option["label"],
+                    "timezone_abbr": option["value"],
+                    "current_action": None
+                }))
+
+        return predictions
+
+    async def _speculate(self, session_id: str, context: Dict[str, Any], widget: Dict[str, Any]):
+        try:
+            for action, predicted in self._predict(context, widget):
+                key = self._fingerprint(action, predicted)
+                if key is None or (session_id, key) in self._entries:
+                    continue
+                # Yield between renders so real traffic is never held up
+                await asyncio.sleep(0)
+                if session_id not in self._tasks:
+                    return
+                # Background work gets its own trace, not the triggering action's
+                with get_tracer().start_span("speculative.render", {"widget.action": action}, parent=None):
+                    response = await self.agent.render_action(action, predicted)
+                if response is not None:
+                    self._store(session_id, key, response)
+                    self.rendered += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"⚠️  Speculative render failed: {e}")
+
+    def _store(self, session_id: str, key: Tuple, response: Dict[str, Any]):
+        payload = response.get("widget_json")
+        size = len(payload) if payload is not None else 4096
+
+        keys = self._session_keys.setdefault(session_id, OrderedDict())
+        self._entries[(session_id, key)] = (response, size)
+        keys[key] = None
+        self._total_bytes += size
+
+        while len(keys) > self.max_entries_per_session:
+            oldest, _ = keys.popitem(last=False)
+            self._evict((session_id, oldest))
+
+        while self._total_bytes > self.max_total_bytes and self._entries:
+            (evict_session, evict_key), _ = next(iter(self._entries.items()))
+            self._session_keys.get(evict_session, {}).pop(evict_key, None)
+            self._evict((evict_session, evict_key))
+
+    def _evict(self, entry_key: Tuple[str, Tuple]):
+        entry = self._entries.pop(entry_key, None)
+        if entry is not None:
+            self._total_bytes -= entry[1]
+            self.evicted_unused += 1
+
+    def drop_session(self, session_id: str):
+        """Forget everything speculated for a session"""
+        task = self._tasks.pop(session_id, None)
+        if task and not task.done():
+            task.cancel()
+        for key in self._session_keys.pop(session_id, {}):
+            entry = self._entries.pop((session_id, key), None)
+            if entry is not None:
+                self._total_bytes -= entry[1]
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate metrics"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "rendered": self.rendered,
+            "evicted_unused": self.evicted_unused,
+            "entries": len(self._entries),
+            "bytes": self._total_bytes
+        }
@@ -0,0 +1,104 @@
+"""
+Worker Supervisor for ADK
+Forks N server processes that share one port through SO_REUSEPORT
+"""
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from typing import Callable, Dict
+
+
+def supports_reuse_port() -> bool:
+    """True if the kernel load-balances connections across SO_REUSEPORT sockets"""
+    if not hasattr(socket, "SO_REUSEPORT"):
+        return False
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _worker_main(target: Callable[[], None], index: int):
+    os.environ["ADK_WORKER_INDEX"] = str(index)
+    # The supervisor handles Ctrl+C; workers stop on its SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    target()
+
+
+class Supervisor:
+    """
+    Keeps ``workers`` copies of ``target`` running.
+
+    Each worker binds the same host/port with SO_REUSEPORT and the kernel
+    spreads new connections between them. Workers share nothing but the
+    session store, so a crashed worker is simply replaced; its clients
+    reconnect to a sibling and resume by session_id.
+    """
+
+    def __init__(
+        self,
+        target: Callable[[], None],
+        workers: int,
+        restart_backoff: float = 1.0,
+        stop_timeout: float = 10.0
+    ):
+        self.target = target
+        self.workers = workers
+        self.restart_backoff = restart_backoff
+        self.stop_timeout = stop_timeout
+        self.restarts = 0
+        self._context = multiprocessing.get_context("fork")
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._stopping = False
+
+    def _spawn(self, index: int):
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self.target, index),
+            name=f"adk-worker-{index}",
+            daemon=False
+        )
+        process.start()
+        self._processes[index] = process
+        print(f"👷 Worker {index} started (pid {process.pid})")
+
+    def _request_stop(self, signum, frame):
+        self._stopping = True
+
+    def run(self):
+        """Start the workers and restart any that exit until signalled"""
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        for index in range(self.workers):
+            self._spawn(index)
+
+        while not self._stopping:
+            time.sleep(0.5)
+            for index, process in list(self._processes.items()):
+                if process.is_alive() or self._stopping:
+                    continue
+                print(f"⚠️  Worker {index} exited with code {process.exitcode}, restarting")
+                self.restarts += 1
+                time.sleep(self.restart_backoff)
+                self._spawn(index)
+
+        self.stop()
+
+    def stop(self):
+        """SIGTERM every worker, then kill whatever is left after the timeout"""
+        print(f"🛑 Stopping {len(self._processes)} workers")
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()
+
+        deadline = time.monotonic() + self.stop_timeout
+        for process in self._processes.values():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
@@ -0,0 +1,352 @@
+"""
+Tracing for ADK
+Lightweight spans across the widget action pipeline, exported as OTLP/JSON
+"""
+import asyncio
+import atexit
+import functools
+import json
+import os
+import random
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+# OTLP status codes
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_MISSING = object()
+
+
+class _NoopSpan:
+    """Stand-in returned when tracing is off or the trace was not sampled"""
+
+    __slots__ = ()
+    sampled = False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_error(self, message: str):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _UnsampledRoot(_NoopSpan):
+    """Marks the rest of an unsampled trace so children skip it too"""
+
+    __slots__ = ("_token",)
+
+    def __enter__(self):
+        self._token = _current_span.set(NOOP_SPAN)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        return False
+
+
+_current_span: ContextVar[Any] = ContextVar("adk_current_span", default=None)
+
+
+class Span:
+    """One timed operation; use as a context manager"""
+
+    __slots__ = (
+        "tracer", "name", "kind", "trace_id", "span_id", "parent_id",
+        "start_ns", "end_ns", "attributes", "status", "status_message", "_token"
+    )
+    sampled = True
+
+    def __init__(self, tracer: "Tracer", name: str, kind: int, trace_id: str, parent_id: Optional[str]):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_ns = 0
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = {}
+        self.status = 0
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_error(self, message: str):
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    def __enter__(self):
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc is not None and not isinstance(exc, asyncio.CancelledError):
+            self.set_error(f"{exc_type.__name__}: {exc}")
+        self.tracer._finish(self)
+        return False
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status:
+            span["status"] = {"code": self.status, "message": self.status_message}
+        return span
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class SpanExporter:
+    """Receives finished spans as one OTLP ExportTraceServiceRequest body"""
+
+    def export(self, body: Dict[str, Any]):
+        raise NotImplementedError
+
+
+class FileSpanExporter(SpanExporter):
+    """JSON lines, one export request per line (the OTLP file exporter format)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, body: Dict[str, Any]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(body, separators=(",", ":")) + "\n")
+
+
+class OTLPHttpSpanExporter(SpanExporter):
+    """POSTs OTLP/JSON to a collector (e.g. http://localhost:4318/v1/traces)"""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def export(self, body: Dict[str, Any]):
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(body, separators=(",", ":")).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class Tracer:
+    """
+    Creates spans and ships finished ones to an exporter in batches.
+
+    The sampling decision is made once per trace at the root span and
+    inherited through a context variable, which also carries the parent
+    across ``await`` and into tasks. With no exporter the tracer is
+    disabled and ``start_span`` returns a shared no-op span.
+    """
+
+    def __init__(
+        self,
+        exporter: Optional[SpanExporter] = None,
+        sample_rate: float = 1.0,
+        service_name: str = "adk-widget-server",
+        flush_interval: float = 2.0,
+        max_batch: int = 512,
+        max_queue: int = 8192
+    ):
+        self.exporter = exporter
+        self.enabled = exporter is not None and sample_rate > 0
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.finished = 0
+        self.dropped = 0
+        self.export_errors = 0
+        self._queue: deque = deque()
+        self._max_queue = max_queue
+        self._wakeup = threading.Event()
+        self._resource = {"service.name": service_name, "process.pid": os.getpid()}
+        worker = os.getenv("ADK_WORKER_INDEX")
+        if worker is not None:
+            self._resource["service.instance.id"] = worker
+        self._thread: Optional[threading.Thread] = None
+
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: int = KIND_INTERNAL,
+        parent: Any = _MISSING
+    ):
+        """Child of the current span (or of ``parent``), or a new sampled root"""
+        if not self.enabled:
+            return NOOP_SPAN
+
+        if parent is _MISSING:
+            parent = _current_span.get()
+        if parent is None:
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                return _UnsampledRoot()
+            span = Span(self, name, kind, f"{random.getrandbits(128):032x}", None)
+        elif not parent.sampled:
+            return NOOP_SPAN
+        else:
+            span = Span(self, name, kind, parent.trace_id, parent.span_id)
+
+        if attributes:
+            span.attributes.update(attributes)
+        return span
+
+    def _finish(self, span: Span):
+        if len(self._queue) >= self._max_queue:
+            self.dropped += 1
+            return
+        self._queue.append(span)
+        self.finished += 1
+        if self._thread is None:
+            self._start_thread()
+        if len(self._queue) >= self.max_batch:
+            self._wakeup.set()
+
+    def _start_thread(self):
+        self._thread = threading.Thread(target=self._export_loop, name="span-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _export_loop(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Export everything queued so far"""
+        while self._queue:
+            batch = []
+            while self._queue and len(batch) < self.max_batch:
+                batch.append(self._queue.popleft())
+            try:
+                self.exporter.export(self._export_body(batch))
+            except Exception as e:
+                self.export_errors += 1
+                print(f"⚠️  Span export failed: {e}")
+                return
+
+    def _export_body(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes(self._resource)},
+                "scopeSpans": [{
+                    "scope": {"name": "adk-widget"},
+                    "spans": [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "finished": self.finished,
+            "queued": len(self._queue),
+            "dropped": self.dropped,
+            "export_errors": self.export_errors
+        }
+
+
+def current_span():
+    """The active span, or the no-op span"""
+    return _current_span.get() or NOOP_SPAN
+
+
+def traced(name: str, kind: int = KIND_INTERNAL):
+    """Decorator running a function (sync or async) inside a span"""
+    def decorate(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                tracer = _tracer or get_tracer()
+                if not tracer.enabled:
+                    return await func(*args, **kwargs)
+                with tracer.start_span(name, kind=kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer or get_tracer()
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.start_span(name, kind=kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# Singleton instance
+_tracer = None
+
+
+def get_tracer() -> Tracer:
+    """Get or create singleton Tracer instance"""
+    global _tracer
+    if _tracer is None:
+        exporter_name = os.getenv("TRACE_EXPORTER", "none").lower()
+        exporter: Optional[SpanExporter] = None
+        if exporter_name == "file":
+            exporter = FileSpanExporter(os.getenv(
+                "TRACE_FILE",
+                os.path.join(os.path.dirname(__file__), "..", "data", "traces.jsonl")
+            ))
+        elif exporter_name == "otlp":
+            endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318")
+            exporter = OTLPHttpSpanExporter(endpoint.rstrip("/") + "/v1/traces")
+        _tracer = Tracer(
+            exporter=exporter,
+            sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "1.0")),
+            service_name=os.getenv("OTEL_SERVICE_NAME", "adk-widget-server")
+        )
+    return _tracer
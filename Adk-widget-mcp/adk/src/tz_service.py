@@ -0,0 +1,138 @@
+"""
+Timezone Service for ADK
+DST-aware slot conversion on top of zoneinfo with precomputed offset
+tables and cached label sets
+"""
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+# Supported zones by the abbreviation the widgets use
+ZONES = {
+    "ET": "America/New_York",
+    "CT": "America/Chicago",
+    "MT": "America/Denver",
+    "PT": "America/Los_Angeles",
+}
+
+# Slot values ("13:45") are wall-clock times in this zone
+CANONICAL_ZONE = "ET"
+
+
+class TimezoneService:
+    """
+    Converts canonical slots into labels for the viewer's zone.
+
+    A slot is identified by its canonical value (wall-clock time in
+    ``CANONICAL_ZONE``) and resolved to a UTC instant for a given date.
+    UTC offsets are precomputed per zone and day; US transitions happen at
+    2 AM local time, so an offset taken at local noon is exact for every
+    business-hours slot of that day. Rendered label sets are cached per
+    (date, zone, slots), so a timezone switch is a dictionary lookup.
+    """
+
+    def __init__(self, table_days: int = 400, label_cache_size: int = 4096):
+        self.table_days = table_days
+        self.label_cache_size = label_cache_size
+        self._zones = {abbr: ZoneInfo(name) for abbr, name in ZONES.items()}
+        self._offsets: Dict[str, Dict[date, int]] = {abbr: {} for abbr in ZONES}
+        self._table_start: date = date.min
+        self._labels: "OrderedDict[Tuple, List[Dict[str, str]]]" = OrderedDict()
+        self.build_offset_tables(date.today() - timedelta(days=7))
+
+    def build_offset_tables(self, start: date):
+        """Precompute each zone's UTC offset (minutes) for ``table_days`` days"""
+        for abbr, zone in self._zones.items():
+            table = {}
+            for i in range(self.table_days):
+                day = start + timedelta(days=i)
+                offset = datetime.combine(day, time(12, 0), tzinfo=zone).utcoffset()
+                table[day] = int(offset.total_seconds() // 60)
+            self._offsets[abbr] = table
+        self._table_start = start
+
+    def offset_minutes(self, abbr: str, day: date) -> int:
+        """UTC offset of a zone on ``day`` (from the table, computed on a miss)"""
+        abbr = abbr if abbr in self._zones else CANONICAL_ZONE
+        offset = self._offsets[abbr].get(day)
+        if offset is None:
+            offset = int(
+                datetime.combine(day, time(12, 0), tzinfo=self._zones[abbr]).utcoffset().total_seconds() // 60
+            )
+            self._offsets[abbr][day] = offset
+        return offset
+
+    def offset_string(self, abbr: str, day: date) -> str:
+        """UTC offset formatted as +HH:MM"""
+        offset = self.offset_minutes(abbr, day)
+        sign = "-" if offset < 0 else "+"
+        hours, minutes = divmod(abs(offset), 60)
+        return f"{sign}{hours:02d}:{minutes:02d}"
+
+    def to_utc(self, day: date, canonical_minute: int) -> datetime:
+        """UTC instant of a canonical slot on ``day``"""
+        local = datetime.combine(day, time(0, 0)) + timedelta(minutes=canonical_minute)
+        offset = self.offset_minutes(CANONICAL_ZONE, day)
+        return (local - timedelta(minutes=offset)).replace(tzinfo=timezone.utc)
+
+    def localize(self, day: date, canonical_minute: int, abbr: str) -> Tuple[int, int]:
+        """(day shift, minute of day) of a canonical slot in zone ``abbr``"""
+        shift = self.offset_minutes(abbr, day) - self.offset_minutes(CANONICAL_ZONE, day)
+        minute = canonical_minute + shift
+        day_shift, minute = divmod(minute, 24 * 60)
+        return day_shift, minute
+
+    def render_slots(self, day: date, canonical_minutes: Sequence[int], abbr: str) -> List[Dict[str, str]]:
+        """Time options labelled in ``abbr``, valued by canonical time"""
+        key = (day, abbr, tuple(canonical_minutes))
+        labels = self._labels.get(key)
+        if labels is not None:
+            self._labels.move_to_end(key)
+            return labels
+
+        labels = []
+        for canonical_minute in canonical_minutes:
+            day_shift, minute = self.localize(day, canonical_minute, abbr)
+            labels.append({
+                "label": format_label(minute, abbr, day_shift),
+                "value": format_value(canonical_minute)
+            })
+
+        self._labels[key] = labels
+        if len(self._labels) > self.label_cache_size:
+            self._labels.popitem(last=False)
+        return labels
+
+
+def parse_value(value: str) -> int:
+    """Minute of day from an "HH:MM" slot value"""
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def format_value(minute: int) -> str:
+    """"HH:MM" slot value from a minute of day"""
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def format_label(minute: int, abbr: str, day_shift: int = 0) -> str:
+    """Display label such as "1:45 PM PT" (with a day marker if it wraps)"""
+    hour, minutes = divmod(minute, 60)
+    suffix = "AM" if hour < 12 else "PM"
+    label = f"{hour % 12 or 12}:{minutes:02d} {suffix} {abbr}"
+    if day_shift:
+        label += f" ({day_shift:+d}d)"
+    return label
+
+
+# Singleton instance
+_timezone_service = None
+
+
+def get_timezone_service() -> TimezoneService:
+    """Get or create singleton TimezoneService instance"""
+    global _timezone_service
+    if _timezone_service is None:
+        _timezone_service = TimezoneService()
+    return _timezone_service
@@ -2,87 +2,209 @@
 Widget Populator for ADK
 Populates widget schemas with actual data based on context
 """
-from datetime import datetime, timedelta
-from typing import Dict, Any, List
-import copy
+import hashlib
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from availability import DEFAULT_CALENDAR, AvailabilityEngine, get_availability_engine
+from tracing import traced
+from tz_service import TimezoneService, get_timezone_service, parse_value
+from widget_template import OptionSet, RenderedWidget, WidgetTemplate, compile_template, encode_json
 
 
 class WidgetPopulator:
     """Populates widget schemas with real data"""
     
     TIMEZONES = [
-        {"label": "Eastern Time (ET)", "value": "ET", "offset": "-05:00"},
-        {"label": "Central Time (CT)", "value": "CT", "offset": "-06:00"},
-        {"label": "Mountain Time (MT)", "value": "MT", "offset": "-07:00"},
-        {"label": "Pacific Time (PT)", "value": "PT", "offset": "-08:00"},
+        {"label": "Eastern Time (ET)", "value": "ET", "zone": "America/New_York"},
+        {"label": "Central Time (CT)", "value": "CT", "zone": "America/Chicago"},
+        {"label": "Mountain Time (MT)", "value": "MT", "zone": "America/Denver"},
+        {"label": "Pacific Time (PT)", "value": "PT", "zone": "America/Los_Angeles"},
     ]
     
+    # Default slots as canonical (Eastern) wall-clock times
+    DEFAULT_TIME_SLOTS = ["11:30", "13:45", "15:00"]
+    
+    SCHEDULE_MEETING_SLOTS = {
+        "timezone": ("properties", "timezone", "value"),
+        "dates": ("properties", "date_selector", "options"),
+        "times": ("properties", "time_slots", "options"),
+        "schedule_enabled": ("properties", "actions", "buttons", 0, "enabled"),
+    }
+    
+    TIMEZONE_SELECTOR_SLOTS = {
+        "timezones": ("properties", "timezone_list", "options"),
+    }
+    
+    TIME_OPTIONS_CACHE_SIZE = 1024
+    TEMPLATE_CACHE_SIZE = 64
+    # How far ahead to look for days with a free slot
+    DATE_HORIZON_DAYS = 60
+    
+    def __init__(
+        self,
+        availability: Optional[AvailabilityEngine] = None,
+        tz_service: Optional[TimezoneService] = None,
+        slot_duration_minutes: int = 30,
+        slot_granularity_minutes: int = 30,
+        max_time_slots: int = 8
+    ):
+        self.availability = availability
+        self.tz_service = tz_service or get_timezone_service()
+        self.slot_duration_minutes = slot_duration_minutes
+        self.slot_granularity_minutes = slot_granularity_minutes
+        self.max_time_slots = max_time_slots
+        self._templates: "OrderedDict[Tuple[str, str], WidgetTemplate]" = OrderedDict()
+        # id(schema) -> (schema, key): schema dicts from the schema cache are reused
+        self._schema_keys: "OrderedDict[int, Tuple[dict, Tuple[str, str]]]" = OrderedDict()
+        self._date_options: "OrderedDict[Tuple, OptionSet]" = OrderedDict()
+        self._time_options: "OrderedDict[Tuple, OptionSet]" = OrderedDict()
+        self._no_options = OptionSet([])
+        self._timezone_options = OptionSet([
+            {"label": tz["label"], "value": tz["value"]} for tz in self.TIMEZONES
+        ])
+    
     def populate_schedule_meeting_widget(self, schema: dict, context: dict) -> dict:
         """Populate schedule meeting widget with dates and times"""
-        widget = copy.deepcopy(schema)
+        return self.render_schedule_meeting_widget(schema, context).widget
+    
+    def populate_timezone_selector_widget(self, schema: dict, context: dict) -> dict:
+        """Populate timezone selector with available timezones"""
+        return self.render_timezone_selector_widget(schema, context).widget
+    
+    @traced("populate.schedule_meeting")
+    def render_schedule_meeting_widget(self, schema: dict, context: dict) -> RenderedWidget:
+        """Fill the compiled schedule meeting template from session context"""
+        template = self._get_template(schema, self.SCHEDULE_MEETING_SLOTS)
         
-        # Set timezone
         tz_value = context.get("timezone", "Eastern Time (ET)")
         tz_abbr = context.get("timezone_abbr", "ET")
-        widget["properties"]["timezone"]["value"] = tz_value
-        
-        # Populate dates
-        dates = self._get_next_dates(5)
-        widget["properties"]["date_selector"]["options"] = [
-            {
-                "label": date["day"],
-                "sublabel": date["date_str"],
-                "value": date["value"],
-                "selected": date["value"] == context.get("selected_date_value")
-            }
-            for date in dates
-        ]
-        
-        # Populate time slots
-        times = self._get_time_slots(tz_abbr)
-        widget["properties"]["time_slots"]["options"] = [
-            {
-                "label": time["label"],
-                "value": time["value"],
-                "selected": time["value"] == context.get("selected_time_value")
-            }
-            for time in times
-        ]
         
         # Enable schedule button if both date and time selected
-        has_selections = (
-            context.get("selected_date_value") and 
+        has_selections = bool(
+            context.get("selected_date_value") and
             context.get("selected_time_value")
         )
-        widget["properties"]["actions"]["buttons"][0]["enabled"] = has_selections
         
-        return widget
-    
-    def populate_timezone_selector_widget(self, schema: dict, context: dict) -> dict:
-        """Populate timezone selector with available timezones"""
-        widget = copy.deepcopy(schema)
+        date_options = self._get_date_options(context.get("attendees"))
+        # No bookable day within the horizon: no dates, so no times either
+        date_value = context.get("selected_date_value") or next(iter(date_options.values), None)
+        time_options = self._get_time_options(
+            tz_abbr, date_value, context.get("attendees")
+        ) if date_value else self._no_options
         
+        return template.fill({
+            "timezone": tz_value,
+            "dates": date_options.select(context.get("selected_date_value")),
+            "times": time_options.select(context.get("selected_time_value")),
+            "schedule_enabled": has_selections,
+        })
+    
+    @traced("populate.timezone_selector")
+    def render_timezone_selector_widget(self, schema: dict, context: dict) -> RenderedWidget:
+        """Fill the compiled timezone selector template from session context"""
+        template = self._get_template(schema, self.TIMEZONE_SELECTOR_SLOTS)
         current_tz_abbr = context.get("timezone_abbr", "ET")
         
-        widget["properties"]["timezone_list"]["options"] = [
-            {
-                "label": tz["label"],
-                "value": tz["value"],
-                "selected": tz["value"] == current_tz_abbr
-            }
-            for tz in self.TIMEZONES
-        ]
+        return template.fill({
+            "timezones": self._timezone_options.select(current_tz_abbr),
+        })
+    
+    def _get_template(self, schema: dict, slots: Dict[str, Tuple]) -> WidgetTemplate:
+        """Compile a schema once per distinct content"""
+        key = self._schema_key(schema)
+        template = self._templates.get(key)
+        if template is None:
+            template = compile_template(schema, slots)
+            self._templates[key] = template
+            if len(self._templates) > self.TEMPLATE_CACHE_SIZE:
+                self._templates.popitem(last=False)
+        else:
+            self._templates.move_to_end(key)
+        return template
+    
+    def _schema_key(self, schema: dict) -> Tuple[str, str]:
+        """
+        (widget_type, content hash) of a schema.
+        
+        Keyed on content rather than ``schema_version``, so an edit that
+        keeps the version still recompiles. The hash is remembered per
+        schema object (schemas are read-only), so a cached schema costs a
+        lookup rather than a re-encode.
+        """
+        cached = self._schema_keys.get(id(schema))
+        if cached is not None and cached[0] is schema:
+            self._schema_keys.move_to_end(id(schema))
+            return cached[1]
+        key = (schema.get("widget_type"), hashlib.sha256(encode_json(schema)).hexdigest()[:16])
+        self._schema_keys[id(schema)] = (schema, key)
+        if len(self._schema_keys) > self.TEMPLATE_CACHE_SIZE:
+            self._schema_keys.popitem(last=False)
+        return key
+    
+    def _get_date_options(self, attendees: Optional[Sequence[str]] = None) -> OptionSet:
+        """Date options for the next bookable business days, per day and attendee set"""
+        key = (
+            datetime.now().strftime("%Y-%m-%d"),
+            tuple(sorted(attendees or ())),
+            self.availability.version if self.availability is not None else None
+        )
+        options = self._date_options.get(key)
+        if options is None:
+            options = OptionSet([
+                {
+                    "label": date["day"],
+                    "sublabel": date["date_str"],
+                    "value": date["value"]
+                }
+                for date in self._get_next_dates(5, attendees)
+            ])
+            self._date_options[key] = options
+            if len(self._date_options) > self.TIME_OPTIONS_CACHE_SIZE:
+                self._date_options.popitem(last=False)
+        else:
+            self._date_options.move_to_end(key)
+        return options
+    
+    def is_offered_date(self, date_value: Any, attendees: Optional[Sequence[str]] = None) -> bool:
+        """Whether ``date_value`` is one of the dates the widget currently offers"""
+        return date_value in self._get_date_options(attendees)
+    
+    def _get_time_options(
+        self,
+        timezone_abbr: str,
+        date_value: Optional[str] = None,
+        attendees: Optional[Sequence[str]] = None
+    ) -> OptionSet:
+        """Time slot options per timezone, date and attendee set"""
+        # Engine version invalidates cached slots when calendars or bookings change
+        key = (
+            timezone_abbr,
+            date_value,
+            tuple(sorted(attendees or ())),
+            self.availability.version if self.availability is not None else None
+        )
         
-        return widget
+        options = self._time_options.get(key)
+        if options is None:
+            options = OptionSet(self._get_time_slots(timezone_abbr, date_value, attendees))
+            self._time_options[key] = options
+            if len(self._time_options) > self.TIME_OPTIONS_CACHE_SIZE:
+                self._time_options.popitem(last=False)
+        else:
+            self._time_options.move_to_end(key)
+        return options
     
-    def _get_next_dates(self, count: int) -> List[Dict[str, str]]:
-        """Get next N business days"""
+    def _get_next_dates(self, count: int, attendees: Optional[Sequence[str]] = None) -> List[Dict[str, str]]:
+        """Get next N business days that still have a free slot"""
         dates = []
         current = datetime.now()
+        horizon = current + timedelta(days=self.DATE_HORIZON_DAYS)
         
-        while len(dates) < count:
-            # Skip weekends
-            if current.weekday() < 5:  # Monday = 0, Friday = 4
+        while len(dates) < count and current < horizon:
+            # Skip weekends (Monday = 0, Friday = 4) and fully booked days
+            if current.weekday() < 5 and self._available_minutes(current.date(), attendees, limit=1):
                 dates.append({
                     "day": current.strftime("%a").upper(),
                     "date_str": current.strftime("%b %d"),
@@ -92,22 +214,68 @@ class WidgetPopulator:
         
         return dates
     
-    def _get_time_slots(self, timezone_abbr: str) -> List[Dict[str, str]]:
-        """Get available time slots"""
-        return [
-            {"label": f"11:30 AM {timezone_abbr}", "value": "11:30"},
-            {"label": f"1:45 PM {timezone_abbr}", "value": "13:45"},
-            {"label": f"3:00 PM {timezone_abbr}", "value": "15:00"}
+    def _get_time_slots(
+        self,
+        timezone_abbr: str,
+        date_value: Optional[str] = None,
+        attendees: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Get available time slots, labelled in the viewer's timezone.
+        
+        Slot values stay canonical (Eastern wall-clock time) so selections
+        survive a timezone switch; only the labels are converted.
+        """
+        day = date.fromisoformat(date_value) if date_value else date.today()
+        minutes = self._available_minutes(day, attendees, limit=self.max_time_slots)
+        return self.tz_service.render_slots(day, minutes, timezone_abbr)
+    
+    def _available_minutes(
+        self,
+        day: date,
+        attendees: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None
+    ) -> List[int]:
+        """
+        Free slot starts on ``day`` (canonical minutes). With attendees,
+        every common free slot in working hours; without, the default
+        slots minus those booked on the default calendar.
+        """
+        if self.availability is None:
+            return [parse_value(value) for value in self.DEFAULT_TIME_SLOTS][:limit]
+        
+        if attendees:
+            return self.availability.find_slots(
+                attendees,
+                day,
+                duration_minutes=self.slot_duration_minutes,
+                granularity_minutes=self.slot_granularity_minutes,
+                limit=limit
+            )
+        
+        minutes = [
+            minute for minute in map(parse_value, self.DEFAULT_TIME_SLOTS)
+            if self.availability.is_free((DEFAULT_CALENDAR,), day, minute, self.slot_duration_minutes)
         ]
+        return minutes[:limit]
     
     def get_timezone_by_abbr(self, abbr: str) -> Dict[str, str]:
-        """Get timezone details by abbreviation"""
+        """Get timezone details by abbreviation, with today's UTC offset"""
         for tz in self.TIMEZONES:
             if tz["value"] == abbr:
-                return tz
-        return self.TIMEZONES[0]  # Default to ET
+                break
+        else:
+            tz = self.TIMEZONES[0]  # Default to ET
+        return {**tz, "offset": self.tz_service.offset_string(tz["value"], date.today())}
+
+
+# Singleton instance - keeps compiled templates across requests
+_widget_populator = None
 
 
 def get_widget_populator() -> WidgetPopulator:
-    """Get widget populator instance"""
-    return WidgetPopulator()
+    """Get or create singleton WidgetPopulator instance"""
+    global _widget_populator
+    if _widget_populator is None:
+        _widget_populator = WidgetPopulator(availability=get_availability_engine())
+    return _widget_populator
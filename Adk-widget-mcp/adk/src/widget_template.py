@@ -0,0 +1,190 @@
+"""
+Widget Template Compiler for ADK
+Compiles a widget schema once into a render plan of pre-encoded JSON
+fragments and dynamic slots, so each render is a byte join instead of a
+deepcopy + json.dumps of the whole widget
+"""
+import copy
+import json
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+Path = Tuple[Hashable, ...]
+
+_SEPARATORS = (",", ":")
+
+
+def encode_json(value: Any) -> bytes:
+    """Compact JSON encoding used for every widget payload"""
+    return json.dumps(value, separators=_SEPARATORS, ensure_ascii=False).encode("utf-8")
+
+
+class Fragment:
+    """A slot value together with its pre-encoded JSON bytes"""
+
+    __slots__ = ("value", "encoded")
+
+    def __init__(self, value: Any, encoded: Optional[bytes] = None):
+        self.value = value
+        self.encoded = encoded if encoded is not None else encode_json(value)
+
+
+class OptionSet:
+    """
+    Selectable option list with every option pre-encoded in both its
+    selected and unselected state.
+
+    ``select`` only picks fragments, so a click never rebuilds or
+    re-serializes the option dicts. The returned option dicts are shared
+    between renders and must be treated as read-only. A value that is not
+    in the list selects nothing, so the cache holds at most one fragment
+    per option plus one, whatever clients send.
+    """
+
+    def __init__(self, options: Sequence[Dict[str, Any]]):
+        self._values = [option["value"] for option in options]
+        self._value_set = set(self._values)
+        self._variants = {}
+        for option in options:
+            for selected in (False, True):
+                variant = dict(option, selected=selected)
+                self._variants[(option["value"], selected)] = (variant, encode_json(variant))
+        self._cache: Dict[Any, Fragment] = {}
+
+    @property
+    def values(self) -> List[Any]:
+        return list(self._values)
+
+    def __contains__(self, value: Any) -> bool:
+        try:
+            return value in self._value_set
+        except TypeError:
+            return False
+
+    def select(self, selected_value: Any) -> Fragment:
+        """Fragment for the option list with ``selected_value`` marked"""
+        if selected_value not in self:
+            selected_value = None
+        if selected_value not in self._cache:
+            variants = [
+                self._variants[(value, value == selected_value)]
+                for value in self._values
+            ]
+            self._cache[selected_value] = Fragment(
+                [variant for variant, _ in variants],
+                b"[" + b",".join(encoded for _, encoded in variants) + b"]"
+            )
+        return self._cache[selected_value]
+
+
+class RenderedWidget:
+    """Result of a template render: the widget dict and its JSON payload"""
+
+    __slots__ = ("template", "values", "_widget", "_payload")
+
+    def __init__(self, template: "WidgetTemplate", values: Dict[str, Any]):
+        self.template = template
+        self.values = values
+        self._widget = None
+        self._payload = None
+
+    @property
+    def widget(self) -> Dict[str, Any]:
+        if self._widget is None:
+            self._widget = self.template.build(self.values)
+        return self._widget
+
+    @property
+    def payload(self) -> bytes:
+        if self._payload is None:
+            self._payload = self.template.render(self.values)
+        return self._payload
+
+
+class WidgetTemplate:
+    """
+    Render plan for a widget schema.
+
+    The schema is serialized once with a sentinel in place of every slot;
+    the surrounding JSON is kept as static byte fragments and each render
+    only encodes the slot values in between.
+    """
+
+    def __init__(self, schema: Dict[str, Any], slots: Dict[str, Path]):
+        self.schema = copy.deepcopy(schema)
+        self.slots = dict(slots)
+        self._fragments, self._order = self._compile()
+
+    def _compile(self) -> Tuple[List[bytes], List[str]]:
+        marked = copy.deepcopy(self.schema)
+        markers = {}
+        for name, path in self.slots.items():
+            marker = f"\u0000slot:{name}\u0000"
+            try:
+                parent = self._resolve(marked, path[:-1])
+                parent[path[-1]]
+            except (KeyError, IndexError, TypeError):
+                raise KeyError(f"Slot path not found in schema: {path}")
+            parent[path[-1]] = marker
+            markers[name] = encode_json(marker)
+
+        encoded = encode_json(marked)
+        positions = sorted((encoded.index(marker), name) for name, marker in markers.items())
+
+        fragments = []
+        order = []
+        cursor = 0
+        for position, name in positions:
+            fragments.append(encoded[cursor:position])
+            order.append(name)
+            cursor = position + len(markers[name])
+        fragments.append(encoded[cursor:])
+        return fragments, order
+
+    @staticmethod
+    def _resolve(node: Any, path: Path) -> Any:
+        for key in path:
+            node = node[key]
+        return node
+
+    def render(self, values: Dict[str, Any]) -> bytes:
+        """Encode the widget with ``values`` filled into its slots"""
+        fragments = self._fragments
+        parts = [fragments[0]]
+        for index, name in enumerate(self._order, start=1):
+            value = values[name]
+            parts.append(value.encoded if isinstance(value, Fragment) else encode_json(value))
+            parts.append(fragments[index])
+        return b"".join(parts)
+
+    def build(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Widget dict with ``values`` filled in.
+
+        Only containers on a slot path are copied; every static subtree is
+        shared with the template and must not be mutated by callers.
+        """
+        root = copy.copy(self.schema)
+        copied = {(): root}
+
+        for name, path in self.slots.items():
+            node = root
+            for depth in range(1, len(path)):
+                prefix = path[:depth]
+                if prefix not in copied:
+                    copied[prefix] = copy.copy(node[path[depth - 1]])
+                    node[path[depth - 1]] = copied[prefix]
+                node = copied[prefix]
+
+            value = values[name]
+            node[path[-1]] = value.value if isinstance(value, Fragment) else value
+
+        return root
+
+    def fill(self, values: Dict[str, Any]) -> RenderedWidget:
+        """Lazy render - dict and bytes are produced on first access"""
+        return RenderedWidget(self, values)
+
+
+def compile_template(schema: Dict[str, Any], slots: Dict[str, Path]) -> WidgetTemplate:
+    """Compile a widget schema into a reusable render plan"""
+    return WidgetTemplate(schema, slots)
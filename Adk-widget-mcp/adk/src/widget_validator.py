@@ -0,0 +1,428 @@
+"""
+Widget Validator for ADK
+Compiled JSON-schema checks on populated widgets before they are sent
+"""
+import random
+import re
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# (JSON pointer, reason) for the first violation found
+Violation = Tuple[str, str]
+Check = Callable[[Any], Optional[Violation]]
+
+
+class SchemaCompileError(ValueError):
+    """A schema uses a keyword or form the compiler does not support"""
+
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "null": type(None),
+}
+
+_SUPPORTED = {
+    "$ref", "definitions", "type", "enum", "const", "properties", "required",
+    "additionalProperties", "items", "minItems", "maxItems", "minLength", "pattern",
+    "title", "description",
+}
+
+
+def _type_check(name: str) -> Check:
+    if name == "integer":
+        def check(value):
+            if isinstance(value, bool) or not isinstance(value, int):
+                return "", "expected integer"
+        return check
+    if name == "number":
+        def check(value):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return "", "expected number"
+        return check
+    if name not in _TYPES:
+        raise SchemaCompileError(f"unknown type: {name}")
+    # Widgets are built from JSON, so exact types suffice (and keep bool out of int)
+    expected = _TYPES[name]
+    reason = f"expected {name}"
+
+    def check(value):
+        if type(value) is not expected:
+            return "", reason
+    return check
+
+
+def _all(checks) -> Check:
+    """Run checks in order, stopping at the first violation"""
+    checks = tuple(checks)
+    if not checks:
+        return lambda value: None
+    if len(checks) == 1:
+        return checks[0]
+
+    def check(value):
+        for c in checks:
+            violation = c(value)
+            if violation is not None:
+                return violation
+    return check
+
+
+class _Compiler:
+    """Turns a JSON schema (draft-07 subset) into nested closures"""
+
+    def __init__(self, root: Dict[str, Any]):
+        self.root = root
+        self.refs: Dict[str, Check] = {}
+
+    def compile(self, schema: Dict[str, Any]) -> Check:
+        unknown = set(schema) - _SUPPORTED
+        if unknown:
+            raise SchemaCompileError(f"unsupported keyword(s): {', '.join(sorted(unknown))}")
+
+        if "$ref" in schema:
+            return self._ref(schema["$ref"])
+
+        checks = []
+        kind = schema.get("type")
+        if kind is not None:
+            checks.append(_type_check(kind))
+
+        if "const" in schema:
+            expected = schema["const"]
+            reason = f"expected {expected!r}"
+            checks.append(lambda value: None if value == expected else ("", reason))
+
+        if "enum" in schema:
+            allowed = tuple(schema["enum"])
+            reason = f"expected one of {list(allowed)}"
+            checks.append(lambda value: None if value in allowed else ("", reason))
+
+        if "minLength" in schema:
+            min_length = schema["minLength"]
+            reason = f"shorter than {min_length}"
+            checks.append(lambda value: ("", reason) if type(value) is str and len(value) < min_length else None)
+
+        if "pattern" in schema:
+            match = re.compile(schema["pattern"]).search
+            reason = f"does not match {schema['pattern']}"
+            checks.append(lambda value: ("", reason) if type(value) is str and not match(value) else None)
+
+        if kind == "object":
+            checks.extend(self._object(schema))
+        elif kind == "array":
+            checks.extend(self._array(schema))
+        return _all(checks)
+
+    def _ref(self, ref: str) -> Check:
+        if not ref.startswith("#/definitions/"):
+            raise SchemaCompileError(f"only local #/definitions refs are supported: {ref}")
+        name = ref[len("#/definitions/"):]
+        if name not in self.refs:
+            definition = self.root.get("definitions", {}).get(name)
+            if definition is None:
+                raise SchemaCompileError(f"unresolved $ref: {ref}")
+            # Placeholder first so recursive definitions terminate
+            target = []
+            self.refs[name] = lambda value: target[0](value)
+            compiled = self.compile(definition)
+            target.append(compiled)
+            self.refs[name] = compiled
+        return self.refs[name]
+
+    def _object(self, schema: Dict[str, Any]):
+        properties = {key: self.compile(sub) for key, sub in schema.get("properties", {}).items()}
+        required = tuple(schema.get("required", ()))
+        closed = schema.get("additionalProperties", True) is False
+        if not isinstance(schema.get("additionalProperties", True), bool):
+            raise SchemaCompileError("additionalProperties must be a boolean")
+
+        if required:
+            def check_required(value):
+                for key in required:
+                    if key not in value:
+                        return "", f"missing required property {key!r}"
+            yield check_required
+
+        if properties:
+            items = tuple(properties.items())
+
+            def check_properties(value):
+                for key, check in items:
+                    if key in value:
+                        violation = check(value[key])
+                        if violation is not None:
+                            return f"/{key}{violation[0]}", violation[1]
+            yield check_properties
+
+        if closed:
+            known = frozenset(properties)
+
+            def check_closed(value):
+                for key in value:
+                    if key not in known:
+                        return f"/{key}", "unexpected property"
+            yield check_closed
+
+    def _array(self, schema: Dict[str, Any]):
+        if "minItems" in schema:
+            min_items = schema["minItems"]
+            yield lambda value: ("", f"fewer than {min_items} items") if len(value) < min_items else None
+        if "maxItems" in schema:
+            max_items = schema["maxItems"]
+            yield lambda value: ("", f"more than {max_items} items") if len(value) > max_items else None
+        if "items" in schema:
+            item = self.compile(schema["items"])
+
+            def check_items(value):
+                for index, element in enumerate(value):
+                    violation = item(element)
+                    if violation is not None:
+                        return f"/{index}{violation[0]}", violation[1]
+            yield check_items
+
+
+def compile_schema(schema: Dict[str, Any]) -> Check:
+    """Compile a JSON schema into a function returning the first violation or None"""
+    return _Compiler(schema).compile(schema)
+
+
+# Populated widgets as the React components read them
+
+_COMMON_DEFINITIONS = {
+    "text": {"type": "string", "minLength": 1},
+    "metadata": {
+        "type": "object",
+        "required": ["title"],
+        "properties": {
+            "title": {"type": "string"},
+            "description": {"type": "string"},
+        },
+    },
+    "styling": {
+        "type": "object",
+        "properties": {
+            "theme": {"type": "string"},
+            "background_color": {"type": "string", "pattern": "^#[0-9A-Fa-f]{6}$"},
+            "text_color": {"type": "string", "pattern": "^#[0-9A-Fa-f]{6}$"},
+        },
+    },
+    "actions": {
+        "type": "object",
+        "required": ["type", "buttons"],
+        "properties": {
+            "type": {"const": "action_buttons"},
+            "buttons": {
+                "type": "array",
+                "minItems": 1,
+                "items": {
+                    "type": "object",
+                    "required": ["id", "label", "style", "enabled", "action"],
+                    "properties": {
+                        "id": {"$ref": "#/definitions/text"},
+                        "label": {"$ref": "#/definitions/text"},
+                        "style": {"enum": ["primary", "secondary"]},
+                        "enabled": {"type": "boolean"},
+                        "action": {"$ref": "#/definitions/text"},
+                    },
+                },
+            },
+        },
+    },
+}
+
+SCHEDULE_MEETING_SCHEMA = {
+    "title": "Populated schedule_meeting widget",
+    "type": "object",
+    "required": ["widget_type", "metadata", "properties"],
+    "properties": {
+        "widget_type": {"const": "schedule_meeting"},
+        "schema_version": {"type": "string"},
+        "metadata": {"$ref": "#/definitions/metadata"},
+        "styling": {"$ref": "#/definitions/styling"},
+        "properties": {
+            "type": "object",
+            "required": ["timezone", "date_selector", "time_slots", "actions"],
+            "properties": {
+                "timezone": {
+                    "type": "object",
+                    "required": ["label", "value", "editable"],
+                    "properties": {
+                        "type": {"const": "timezone_display"},
+                        "label": {"type": "string"},
+                        "value": {"$ref": "#/definitions/text"},
+                        "editable": {"type": "boolean"},
+                        "action": {"type": "string"},
+                    },
+                },
+                "date_selector": {
+                    "type": "object",
+                    "required": ["label", "options"],
+                    "properties": {
+                        "type": {"const": "button_group"},
+                        "label": {"type": "string"},
+                        "options": {
+                            "type": "array",
+                            "minItems": 1,
+                            "items": {
+                                "type": "object",
+                                "required": ["label", "sublabel", "value", "selected"],
+                                "properties": {
+                                    "label": {"$ref": "#/definitions/text"},
+                                    "sublabel": {"$ref": "#/definitions/text"},
+                                    "value": {"type": "string", "pattern": "^\\d{4}-\\d{2}-\\d{2}$"},
+                                    "selected": {"type": "boolean"},
+                                },
+                            },
+                        },
+                    },
+                },
+                "time_slots": {
+                    "type": "object",
+                    "required": ["label", "options"],
+                    "properties": {
+                        "type": {"const": "button_list"},
+                        "label": {"type": "string"},
+                        "options": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "required": ["label", "value", "selected"],
+                                "properties": {
+                                    "label": {"$ref": "#/definitions/text"},
+                                    "value": {"type": "string", "pattern": "^\\d{2}:\\d{2}$"},
+                                    "selected": {"type": "boolean"},
+                                },
+                            },
+                        },
+                    },
+                },
+                "actions": {"$ref": "#/definitions/actions"},
+            },
+        },
+    },
+    "definitions": _COMMON_DEFINITIONS,
+}
+
+TIMEZONE_SELECTOR_SCHEMA = {
+    "title": "Populated timezone_selector widget",
+    "type": "object",
+    "required": ["widget_type", "metadata", "properties"],
+    "properties": {
+        "widget_type": {"const": "timezone_selector"},
+        "schema_version": {"type": "string"},
+        "metadata": {"$ref": "#/definitions/metadata"},
+        "styling": {"$ref": "#/definitions/styling"},
+        "properties": {
+            "type": "object",
+            "required": ["timezone_list", "actions"],
+            "properties": {
+                "timezone_list": {
+                    "type": "object",
+                    "required": ["label", "options"],
+                    "properties": {
+                        "type": {"const": "radio_list"},
+                        "label": {"type": "string"},
+                        "options": {
+                            "type": "array",
+                            "minItems": 1,
+                            "items": {
+                                "type": "object",
+                                "required": ["label", "value", "selected"],
+                                "properties": {
+                                    "label": {"$ref": "#/definitions/text"},
+                                    "value": {"$ref": "#/definitions/text"},
+                                    "selected": {"type": "boolean"},
+                                },
+                            },
+                        },
+                    },
+                },
+                "actions": {"$ref": "#/definitions/actions"},
+            },
+        },
+    },
+    "definitions": _COMMON_DEFINITIONS,
+}
+
+WIDGET_SCHEMAS = {
+    "schedule_meeting": SCHEDULE_MEETING_SCHEMA,
+    "timezone_selector": TIMEZONE_SELECTOR_SCHEMA,
+}
+
+
+class WidgetValidator:
+    """
+    Checks outgoing widgets against the schemas of what the UI renders.
+
+    Every schema is compiled once, at construction, into plain Python
+    closures; a check is then a walk of the widget with no keyword
+    lookups. ``sample_rate`` bounds the cost in production: below 1.0
+    only that fraction of renders is checked, the rest pass unchecked.
+    Widgets of a type with no schema always fail, since the UI cannot
+    render them either.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        schemas: Optional[Dict[str, Dict[str, Any]]] = None,
+        seed: Optional[int] = None
+    ):
+        self.sample_rate = min(1.0, max(0.0, sample_rate))
+        self._checks: Dict[str, Check] = {
+            widget_type: compile_schema(schema)
+            for widget_type, schema in (schemas or WIDGET_SCHEMAS).items()
+        }
+        self._random = random.Random(seed)
+        self.checked = 0
+        self.skipped = 0
+        self.failures = 0
+        self.failures_by_type: Dict[str, int] = {}
+        self.check_seconds = 0.0
+
+    @property
+    def widget_types(self):
+        return sorted(self._checks)
+
+    def check(self, widget: Any) -> Optional[str]:
+        """Validate unconditionally; returns a description of the first violation"""
+        start = time.perf_counter()
+        if not isinstance(widget, dict):
+            error = "widget is not an object"
+            widget_type = None
+        else:
+            widget_type = widget.get("widget_type")
+            check = self._checks.get(widget_type)
+            if check is None:
+                error = f"no schema for widget_type {widget_type!r}"
+            else:
+                violation = check(widget)
+                error = None if violation is None else f"{violation[0] or '/'}: {violation[1]}"
+        self.check_seconds += time.perf_counter() - start
+        self.checked += 1
+        if error is not None:
+            self.failures += 1
+            key = str(widget_type)
+            self.failures_by_type[key] = self.failures_by_type.get(key, 0) + 1
+        return error
+
+    def validate(self, widget: Any) -> Optional[str]:
+        """Validate subject to ``sample_rate``; unsampled widgets pass"""
+        if self.sample_rate < 1.0 and self._random.random() >= self.sample_rate:
+            self.skipped += 1
+            return None
+        return self.check(widget)
+
+    def stats(self) -> Dict[str, Any]:
+        """Validation instrumentation"""
+        return {
+            "sample_rate": self.sample_rate,
+            "checked": self.checked,
+            "skipped": self.skipped,
+            "failures": self.failures,
+            "failures_by_type": dict(self.failures_by_type),
+            "us_per_check": self.check_seconds / self.checked * 1e6 if self.checked else 0.0
+        }
@@ -0,0 +1,143 @@
+"""
+LLM response caching in ADKAgent._run_llm, against a fake ADK runner
+"""
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+pytest.importorskip("google.genai")
+
+from adk_agent import ADKAgent  # noqa: E402
+from prompt_builder import Prompt  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+
+
+class FakeEvent:
+    def __init__(self, text, final):
+        self.content = SimpleNamespace(parts=[SimpleNamespace(text=text)])
+        self._final = final
+
+    def is_final_response(self):
+        return self._final
+
+
+class FakeRunner:
+    """Yields a tool-call step then the answer, like Runner.run_async"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.runs = 0
+
+    async def run_async(self, *, user_id, session_id, new_message):
+        self.runs += 1
+        yield FakeEvent("calling tool", final=False)
+        await asyncio.sleep(self.delay)
+        yield FakeEvent(f"answer {self.runs} to {new_message.parts[0].text}", final=True)
+
+
+class FakeSessionService:
+    def __init__(self):
+        self.live = set()
+        self._ids = 0
+
+    async def create_session(self, *, app_name, user_id):
+        self._ids += 1
+        self.live.add(self._ids)
+        return SimpleNamespace(id=self._ids)
+
+    async def delete_session(self, *, app_name, user_id, session_id):
+        self.live.discard(session_id)
+
+
+def make_agent(ttl=300.0):
+    agent = ADKAgent(api_key=None)
+    agent.runner = FakeRunner()
+    agent.session_service = FakeSessionService()
+    agent.response_cache = ResponseCache(ttl=ttl, actions={"connect"})
+    return agent
+
+
+def make_prompt(text="render the widget"):
+    return Prompt(
+        variant="compact", instruction="instruction", text=text,
+        instruction_tokens=1, message_tokens=1, trimmed=False
+    )
+
+
+def test_hit_returns_the_materialized_answer():
+    agent = make_agent()
+
+    async def scenario():
+        first = await agent._run_llm("connect", make_prompt())
+        second = await agent._run_llm("connect", make_prompt())
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second == "answer 1 to render the widget"
+    assert agent.runner.runs == 1
+    assert agent.response_cache.hits == 1
+    assert agent.session_service.live == set()
+
+
+def test_concurrent_misses_share_one_run():
+    agent = make_agent()
+
+    async def scenario():
+        return await asyncio.gather(*(agent._run_llm("connect", make_prompt()) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert set(results) == {"answer 1 to render the widget"}
+    assert agent.runner.runs == 1
+    assert agent.response_cache.misses == 1
+    assert agent.response_cache.coalesced == 4
+
+
+def test_expired_entry_runs_the_model_again():
+    agent = make_agent(ttl=0.01)
+
+    async def scenario():
+        first = await agent._run_llm("connect", make_prompt())
+        time.sleep(0.02)
+        second = await agent._run_llm("connect", make_prompt())
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert (first, second) == ("answer 1 to render the widget", "answer 2 to render the widget")
+    assert agent.runner.runs == 2
+    assert agent.response_cache.expired == 1
+
+
+def test_uncached_action_always_runs():
+    agent = make_agent()
+
+    async def scenario():
+        for _ in range(2):
+            await agent._run_llm("select_date", make_prompt())
+
+    asyncio.run(scenario())
+    assert agent.runner.runs == 2
+    assert agent.response_cache.stats()["entries"] == 0
+
+
+def test_cancelled_leader_hands_the_call_to_a_waiter():
+    agent = make_agent()
+
+    async def scenario():
+        leader = asyncio.ensure_future(agent._run_llm("connect", make_prompt()))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.ensure_future(agent._run_llm("connect", make_prompt())) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await asyncio.gather(*waiters)
+
+    results = asyncio.run(scenario())
+    assert set(results) == {"answer 2 to render the widget"}
+    assert agent.runner.runs == 2
+    assert agent.response_cache.misses == 2
+    assert agent.response_cache.coalesced == 2
@@ -5,91 +5,137 @@ Provides widget contracts/structures for ADK to populate
 """
 import json
 import os
+import sys
 from pathlib import Path
 from fastmcp import FastMCP
 
+from schema_registry import SchemaRegistry
+
 # Initialize FastMCP server
 mcp = FastMCP("Widget Schema Server")
 
 # Get schemas directory
 SCHEMAS_DIR = Path(__file__).parent / "schemas"
 
+# All schemas are loaded once and hot-reloaded when files change
+registry = SchemaRegistry(
+    SCHEMAS_DIR,
+    poll_interval=float(os.getenv("SCHEMA_POLL_INTERVAL", "2.0"))
+)
+
 
 def load_schema(schema_name: str) -> dict:
-    """Load a widget schema from JSON file"""
-    schema_path = SCHEMAS_DIR / f"{schema_name}.json"
-    if not schema_path.exists():
-        raise FileNotFoundError(f"Schema not found: {schema_name}")
+    """Return a widget schema from the registry"""
+    return registry.get(schema_name).schema
+
+
+def _widget_response(schema_name: str, message: str, if_none_match: str = "") -> str:
+    """
+    Compact JSON tool result built from the pre-serialized schema.
     
-    with open(schema_path, 'r') as f:
-        return json.load(f)
+    When ``if_none_match`` equals the schema's current etag the schema body
+    is omitted and the client keeps using its cached copy.
+    """
+    entry = registry.get(schema_name)
+    if if_none_match and if_none_match == entry.etag:
+        return (
+            '{"success":true,"not_modified":true,"etag":"' + entry.etag + '"' +
+            ',"registry_version":' + json.dumps(registry.version) + '}'
+        )
+    return (
+        '{"success":true,"widget":' + entry.compact +
+        ',"message":' + json.dumps(message) +
+        ',"etag":"' + entry.etag + '"' +
+        ',"registry_version":' + json.dumps(registry.version) + '}'
+    )
 
 
 @mcp.tool()
-def get_schedule_meeting_widget() -> dict:
+def get_schedule_meeting_widget(if_none_match: str = "") -> str:
     """
     Returns the complete schedule meeting widget schema.
     ADK will populate the date_selector options and time_slots options.
     
+    Args:
+        if_none_match: Etag of a cached copy; returns not_modified if unchanged
+    
     Returns:
-        dict: Widget schema with empty options arrays to be populated by ADK
+        str: JSON widget schema with empty options arrays to be populated by ADK
     """
-    schema = load_schema("schedule_meeting")
-    return {
-        "success": True,
-        "widget": schema,
-        "message": "Schedule meeting widget schema retrieved"
-    }
+    return _widget_response(
+        "schedule_meeting", "Schedule meeting widget schema retrieved", if_none_match
+    )
 
 
 @mcp.tool()
-def get_timezone_selector_widget() -> dict:
+def get_timezone_selector_widget(if_none_match: str = "") -> str:
     """
     Returns the timezone selector widget schema.
     ADK will populate the timezone_list options.
     
+    Args:
+        if_none_match: Etag of a cached copy; returns not_modified if unchanged
+    
     Returns:
-        dict: Widget schema for timezone selection
+        str: JSON widget schema for timezone selection
     """
-    schema = load_schema("timezone_selector")
-    return {
-        "success": True,
-        "widget": schema,
-        "message": "Timezone selector widget schema retrieved"
-    }
+    return _widget_response(
+        "timezone_selector", "Timezone selector widget schema retrieved", if_none_match
+    )
 
 
 @mcp.tool()
-def list_available_widgets() -> dict:
+def list_available_widgets() -> str:
     """
     Lists all available widget schemas in the MCP server.
     
     Returns:
-        dict: List of available widget types
+        str: JSON list of available widget types
+    """
+    listing = registry.listing()
+    return (
+        '{"success":true,"widgets":' + registry.listing_json() +
+        ',"count":' + str(len(listing)) +
+        ',"registry_version":' + json.dumps(registry.version) + '}'
+    )
+
+
+@mcp.tool()
+def get_registry_version() -> dict:
     """
-    widgets = []
-    for schema_file in SCHEMAS_DIR.glob("*.json"):
-        schema = load_schema(schema_file.stem)
-        widgets.append({
-            "name": schema_file.stem,
-            "widget_type": schema.get("widget_type"),
-            "version": schema.get("schema_version"),
-            "title": schema.get("metadata", {}).get("title")
-        })
+    Returns the current schema registry version.
+    The version is a hash of every schema's etag, so it changes whenever a
+    schema file does and is the same in every server process.
     
+    Returns:
+        dict: Registry version and per-schema etags
+    """
     return {
         "success": True,
-        "widgets": widgets,
-        "count": len(widgets)
+        "registry_version": registry.version,
+        "etags": {entry["name"]: entry["etag"] for entry in registry.listing()}
     }
 
 
 if __name__ == "__main__":
-    # Run MCP server
-    print("🚀 Starting MCP Widget Schema Server...")
-    print("📦 Available tools:")
-    print("   - get_schedule_meeting_widget()")
-    print("   - get_timezone_selector_widget()")
-    print("   - list_available_widgets()")
+    # Run MCP server - banner goes to stderr, stdout carries the protocol
+    # stdio (spawned by the ADK client) or http (streamable HTTP on /mcp)
+    transport = os.getenv("MCP_SERVER_TRANSPORT", "stdio")
+    if transport not in ("stdio", "http"):
+        sys.exit(f"MCP_SERVER_TRANSPORT must be stdio or http, not {transport!r}")
+    print("🚀 Starting MCP Widget Schema Server...", file=sys.stderr)
+    print(f"🔌 Transport: {transport}", file=sys.stderr)
+    print("📦 Available tools:", file=sys.stderr)
+    print("   - get_schedule_meeting_widget()", file=sys.stderr)
+    print("   - get_timezone_selector_widget()", file=sys.stderr)
+    print("   - list_available_widgets()", file=sys.stderr)
+    print("   - get_registry_version()", file=sys.stderr)
     
-    mcp.run(transport="stdio")
+    registry.start_watching()
+    if transport == "http":
+        host = os.getenv("MCP_HTTP_HOST", "127.0.0.1")
+        port = int(os.getenv("MCP_HTTP_PORT", "8001"))
+        print(f"🌐 Listening on http://{host}:{port}/mcp", file=sys.stderr)
+        mcp.run(transport="http", host=host, port=port, path="/mcp", show_banner=False)
+    else:
+        mcp.run(transport="stdio", show_banner=False)
@@ -0,0 +1,158 @@
+"""
+Schema Registry for the MCP Widget Server
+Loads every widget schema once, keeps compact pre-serialized payloads and
+hot-reloads files that change on disk
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+class SchemaEntry:
+    """A loaded schema with its pre-serialized forms"""
+
+    __slots__ = ("name", "schema", "compact", "etag", "mtime_ns", "size")
+
+    def __init__(self, name: str, schema: Dict[str, Any], mtime_ns: int, size: int):
+        self.name = name
+        self.schema = schema
+        self.compact = _compact(schema)
+        self.etag = hashlib.sha256(self.compact.encode("utf-8")).hexdigest()[:16]
+        self.mtime_ns = mtime_ns
+        self.size = size
+
+    def listing(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "widget_type": self.schema.get("widget_type"),
+            "version": self.schema.get("schema_version"),
+            "title": self.schema.get("metadata", {}).get("title"),
+            "etag": self.etag
+        }
+
+
+class SchemaRegistry:
+    """
+    In-memory registry of widget schemas.
+
+    Everything is read at start-up. A background thread polls file mtimes
+    and reloads changed, added or removed schemas. ``version`` is a hash
+    of every schema's etag, so it moves with any change and is the same in
+    every server process serving the same files (a pooled client talks to
+    several).
+    """
+
+    def __init__(self, schemas_dir: Path, poll_interval: float = 2.0):
+        self.schemas_dir = Path(schemas_dir)
+        self.poll_interval = poll_interval
+        self.version = ""
+        self._entries: Dict[str, SchemaEntry] = {}
+        self._listing: List[Dict[str, Any]] = []
+        self._listing_json = "[]"
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, List[str]], None]] = []
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.reload()
+
+    def _scan(self) -> Dict[str, os.stat_result]:
+        return {path.stem: path.stat() for path in sorted(self.schemas_dir.glob("*.json"))}
+
+    def reload(self) -> List[str]:
+        """Reload changed schemas; returns the names that changed"""
+        stats = self._scan()
+        changed = []
+        entries = dict(self._entries)
+
+        for name in list(entries):
+            if name not in stats:
+                del entries[name]
+                changed.append(name)
+
+        for name, stat in stats.items():
+            current = entries.get(name)
+            if current and current.mtime_ns == stat.st_mtime_ns and current.size == stat.st_size:
+                continue
+            try:
+                with open(self.schemas_dir / f"{name}.json", "r") as f:
+                    schema = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                # Keep serving the last good version of a half-written file
+                print(f"⚠️  Could not load schema {name}: {e}", file=sys.stderr)
+                continue
+            entry = SchemaEntry(name, schema, stat.st_mtime_ns, stat.st_size)
+            if current is None or current.etag != entry.etag:
+                changed.append(name)
+            entries[name] = entry
+
+        with self._lock:
+            self._entries = entries
+            if changed or not self._listing:
+                self._listing = [entry.listing() for entry in entries.values()]
+                self._listing_json = _compact(self._listing)
+            if changed or not self.version:
+                self.version = self._content_version(entries)
+            version = self.version
+            listeners = list(self._listeners)
+
+        if changed:
+            print(f"🔄 Schema registry {version}: reloaded {', '.join(changed)}", file=sys.stderr)
+            for listener in listeners:
+                listener(version, changed)
+        return changed
+
+    @staticmethod
+    def _content_version(entries: Dict[str, SchemaEntry]) -> str:
+        """Registry version derived from content: a hash of (name, etag) pairs"""
+        digest = hashlib.sha256()
+        for name in sorted(entries):
+            digest.update(f"{name}:{entries[name].etag};".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def get(self, name: str) -> SchemaEntry:
+        """Loaded schema entry by name"""
+        entry = self._entries.get(name)
+        if entry is None:
+            raise FileNotFoundError(f"Schema not found: {name}")
+        return entry
+
+    def listing(self) -> List[Dict[str, Any]]:
+        """Precomputed list of available widgets"""
+        return self._listing
+
+    def listing_json(self) -> str:
+        """Precomputed compact JSON of the widget listing"""
+        return self._listing_json
+
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+    def subscribe(self, listener: Callable[[str, List[str]], None]):
+        """Call ``listener(version, changed_names)`` after every reload that changed something"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def start_watching(self):
+        """Poll schema file mtimes in a daemon thread"""
+        if self._watcher is not None or self.poll_interval <= 0:
+            return
+        self._watcher = threading.Thread(target=self._watch, name="schema-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.reload()
+            except OSError as e:
+                print(f"⚠️  Schema watcher error: {e}", file=sys.stderr)
@@ -1,21 +1,42 @@
-import React from 'react';
+import React, { useState } from 'react';
 import { useWebSocket } from './hooks/useWebSocket';
 import { WidgetRenderer } from './components/WidgetRenderer';
 import './index.css';
 import './App.css';
 
 function App() {
-  const { isConnected, widget, message, sendMessage } = useWebSocket();
+  const { isConnected, widget, sessionId, message, sendMessage } = useWebSocket();
+  const [linkCopied, setLinkCopied] = useState(false);
 
   const handleAction = (action, data = {}) => {
     sendMessage(action, data);
   };
 
+  // Opening this link on another device or tab joins the same session
+  const shareSession = async () => {
+    const params = new URLSearchParams(window.location.search);
+    params.set('session_id', sessionId);
+    const link = `${window.location.origin}${window.location.pathname}?${params}`;
+    try {
+      await navigator.clipboard.writeText(link);
+      setLinkCopied(true);
+      setTimeout(() => setLinkCopied(false), 2000);
+    } catch (error) {
+      // Clipboard needs a secure context; let the user copy it by hand
+      window.prompt('Open this link on another device to join:', link);
+    }
+  };
+
   return (
     <div className="app">
       <div className="connection-indicator">
         <div className={`status-dot ${isConnected ? 'connected' : 'disconnected'}`}></div>
         <span>{isConnected ? 'Connected to ADK' : 'Disconnected'}</span>
+        {sessionId && (
+          <button className="share-button" onClick={shareSession}>
+            {linkCopied ? 'Link copied' : 'Share session'}
+          </button>
+        )}
       </div>
 
       {message && (
@@ -1,6 +1,10 @@
 import { useState, useEffect, useRef } from 'react';
+import { applyPatch } from '../utils/jsonPatch';
+import { decodeDictionary, decodeFrame } from '../utils/widgetCompression';
 
-const WS_URL = 'ws://localhost:8000';
+// The ADK server on the host that served this page, so a shared link works
+// from another device; set VITE_ADK_WS_URL when it lives elsewhere
+const WS_URL = import.meta.env.VITE_ADK_WS_URL || `ws://${window.location.hostname}:8000`;
 
 export function useWebSocket() {
   const [isConnected, setIsConnected] = useState(false);
@@ -8,6 +12,14 @@ export function useWebSocket() {
   const [sessionId, setSessionId] = useState(null);
   const [message, setMessage] = useState(null);
   const wsRef = useRef(null);
+  const widgetRef = useRef(null);
+  const versionRef = useRef(0);
+  // Open the page with ?session_id=... to join a session from another tab,
+  // or ?attendees=a,b to offer only times free on those calendars
+  const pageParams = new URLSearchParams(window.location.search);
+  const sessionIdRef = useRef(pageParams.get('session_id'));
+  const attendeesRef = useRef(pageParams.get('attendees'));
+  const dictionaryRef = useRef(null);
 
   useEffect(() => {
     connectWebSocket();
@@ -21,7 +33,17 @@ export function useWebSocket() {
 
   const connectWebSocket = () => {
     try {
-      const ws = new WebSocket(WS_URL);
+      // Opt in to compressed frames; join a shared session or resume ours
+      // on reconnect, whichever server worker we land on
+      const params = new URLSearchParams({ compress: 'zdict' });
+      if (sessionIdRef.current) {
+        params.set('session_id', sessionIdRef.current);
+      }
+      if (attendeesRef.current) {
+        params.set('attendees', attendeesRef.current);
+      }
+      const ws = new WebSocket(`${WS_URL}/?${params}`);
+      ws.binaryType = 'arraybuffer';
       wsRef.current = ws;
 
       ws.onopen = () => {
@@ -31,18 +53,48 @@ export function useWebSocket() {
 
       ws.onmessage = (event) => {
         try {
-          const data = JSON.parse(event.data);
+          const text = typeof event.data === 'string'
+            ? event.data
+            : decodeFrame(event.data, dictionaryRef.current);
+          const data = JSON.parse(text);
           console.log('📨 Received:', data);
 
-          if (data.type === 'widget_render') {
+          if (data.type === 'compression') {
+            dictionaryRef.current = decodeDictionary(data);
+          } else if (data.type === 'widget_render') {
+            widgetRef.current = data.widget;
+            versionRef.current = data.version ?? 0;
             setWidget(data.widget);
+            sessionIdRef.current = data.session_id;
             setSessionId(data.session_id);
+          } else if (data.type === 'widget_patch') {
+            if (!widgetRef.current || data.base_version !== versionRef.current) {
+              // Out of sync - ask the server for a full render
+              console.warn('⚠️ Widget version mismatch, requesting resync');
+              ws.send(JSON.stringify({ action: 'resync' }));
+              return;
+            }
+            try {
+              const patched = applyPatch(widgetRef.current, data.patch);
+              widgetRef.current = patched;
+              versionRef.current = data.version;
+              setWidget(patched);
+            } catch (error) {
+              console.error('❌ Failed to apply widget patch:', error);
+              ws.send(JSON.stringify({ action: 'resync' }));
+            }
           } else if (data.type === 'meeting_scheduled') {
             setMessage({
               type: 'success',
               text: data.message
             });
             setTimeout(() => setMessage(null), 3000);
+          } else if (data.type === 'error') {
+            setMessage({
+              type: 'error',
+              text: data.message
+            });
+            setTimeout(() => setMessage(null), 4000);
           } else if (data.type === 'closed') {
             setMessage({
               type: 'info',
@@ -51,6 +103,9 @@ export function useWebSocket() {
           }
         } catch (error) {
           console.error('❌ Error parsing message:', error);
+          if (typeof event.data !== 'string') {
+            ws.send(JSON.stringify({ action: 'resync' }));
+          }
         }
       };
 
@@ -59,15 +114,20 @@ export function useWebSocket() {
         setIsConnected(false);
       };
 
-      ws.onclose = () => {
+      ws.onclose = (event) => {
         console.log('❌ Disconnected from ADK server');
         setIsConnected(false);
+        widgetRef.current = null;
+        versionRef.current = 0;
+        dictionaryRef.current = null;
         
-        // Reconnect after 3 seconds
+        // 1012: the server is restarting and hands our session to its
+        // replacement, so come back quickly; otherwise wait 3 seconds
+        const delay = event.code === 1012 ? 500 : 3000;
         setTimeout(() => {
           console.log('🔄 Reconnecting...');
           connectWebSocket();
-        }, 3000);
+        }, delay);
       };
     } catch (error) {
       console.error('❌ WebSocket connection error:', error);
@@ -79,6 +139,7 @@ export function useWebSocket() {
       const message = {
         action,
         session_id: sessionId,
+        widget_version: versionRef.current,
         ...data
       };
       console.log('📤 Sending:', message);
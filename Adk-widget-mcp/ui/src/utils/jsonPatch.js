@@ -0,0 +1,74 @@
+// RFC 6902 JSON Patch (add / remove / replace / test).
+// Returns a new document; only containers along each patched path are
+// copied, so unchanged subtrees keep their identity for React.
+
+const unescapeToken = (token) => token.replace(/~1/g, '/').replace(/~0/g, '~');
+
+const parsePath = (path) => path.split('/').slice(1).map(unescapeToken);
+
+const shallowCopy = (node) => (Array.isArray(node) ? node.slice() : { ...node });
+
+const isEqual = (a, b) => JSON.stringify(a) === JSON.stringify(b);
+
+function applyOperation(doc, op) {
+  const tokens = parsePath(op.path);
+
+  if (tokens.length === 0) {
+    if (op.op === 'add' || op.op === 'replace') return op.value;
+    if (op.op === 'test') {
+      if (!isEqual(doc, op.value)) throw new Error('JSON patch test failed at root');
+      return doc;
+    }
+    throw new Error(`Unsupported root operation: ${op.op}`);
+  }
+
+  const root = shallowCopy(doc);
+  let parent = root;
+  for (const token of tokens.slice(0, -1)) {
+    const key = Array.isArray(parent) ? Number(token) : token;
+    parent[key] = shallowCopy(parent[key]);
+    parent = parent[key];
+  }
+
+  const last = tokens[tokens.length - 1];
+  if (Array.isArray(parent)) {
+    const index = last === '-' ? parent.length : Number(last);
+    switch (op.op) {
+      case 'add':
+        parent.splice(index, 0, op.value);
+        break;
+      case 'remove':
+        parent.splice(index, 1);
+        break;
+      case 'replace':
+        parent[index] = op.value;
+        break;
+      case 'test':
+        if (!isEqual(parent[index], op.value)) throw new Error(`JSON patch test failed at ${op.path}`);
+        return doc;
+      default:
+        throw new Error(`Unsupported operation: ${op.op}`);
+    }
+  } else {
+    switch (op.op) {
+      case 'add':
+      case 'replace':
+        parent[last] = op.value;
+        break;
+      case 'remove':
+        delete parent[last];
+        break;
+      case 'test':
+        if (!isEqual(parent[last], op.value)) throw new Error(`JSON patch test failed at ${op.path}`);
+        return doc;
+      default:
+        throw new Error(`Unsupported operation: ${op.op}`);
+    }
+  }
+
+  return root;
+}
+
+export function applyPatch(doc, patch) {
+  return patch.reduce(applyOperation, doc);
+}
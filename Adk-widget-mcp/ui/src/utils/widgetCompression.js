@@ -0,0 +1,31 @@
+// Decoder for the server's dictionary-compressed binary frames.
+// Frame layout: format byte, dictionary id (uint32 big-endian), raw deflate.
+import { inflateRaw } from 'pako';
+
+const FRAME_FORMAT = 1;
+const HEADER_SIZE = 5;
+
+export function decodeDictionary(message) {
+  const binary = atob(message.dictionary);
+  const data = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) {
+    data[i] = binary.charCodeAt(i);
+  }
+  return { id: message.dictionary_id, data };
+}
+
+export function decodeFrame(buffer, dictionary) {
+  const view = new DataView(buffer);
+  const format = view.getUint8(0);
+  const dictionaryId = view.getUint32(1);
+  if (format !== FRAME_FORMAT) {
+    throw new Error(`Unknown frame format ${format}`);
+  }
+  if (!dictionary || dictionary.id !== dictionaryId) {
+    throw new Error(`Missing compression dictionary ${dictionaryId}`);
+  }
+  return inflateRaw(new Uint8Array(buffer, HEADER_SIZE), {
+    dictionary: dictionary.data,
+    to: 'string'
+  });
+}
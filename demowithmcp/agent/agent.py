@@ -5,7 +5,8 @@ Only uses Google ADK - no fallbacks
 """
 import os
 import json
-from typing import Dict, Any, Optional
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -13,19 +14,35 @@ from pydantic import BaseModel
 from dotenv import load_dotenv
 
 # Import Google ADK and MCP tools
+from google.adk import Runner
 from google.adk.agents import Agent as ADKAgent
-from google.adk.tools.mcp_tool.mcp_toolset import McpToolset
+from google.adk.sessions import InMemorySessionService
 from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams, StdioServerParameters
+from google.genai import types
+
+# Pre-warmed MCP server processes behind the McpToolset interface
+from mcp_pool import McpServerPool, PooledMcpToolset
 
 load_dotenv()
 
 # Configuration
+MOCK_LLM_URL = os.getenv("MOCK_LLM_URL")
+if MOCK_LLM_URL:
+    # Offline mock server (mock-llm/) speaking the Gemini API
+    os.environ["GOOGLE_GEMINI_BASE_URL"] = MOCK_LLM_URL
+    os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "false"
+    os.environ.setdefault("GOOGLE_API_KEY", "mock-key")
+
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
 if not GOOGLE_API_KEY:
     raise ValueError("GOOGLE_API_KEY or GEMINI_API_KEY must be set in environment variables or .env file")
 
 MCP_SERVER_PATH = os.getenv("MCP_SERVER_PATH", None)
 
+APP_NAME = "banking_agent"
+# Every chat runs in its own ADK session under this user
+CHAT_USER_ID = "banking-chat"
+
 # Get absolute path to MCP server script
 if not MCP_SERVER_PATH:
     # Default: assume mcp_server.py is in ../mcp-server/
@@ -34,25 +51,36 @@ if not MCP_SERVER_PATH:
     mcp_server_script = mcp_server_dir / "mcp_server.py"
     MCP_SERVER_PATH = str(mcp_server_script.absolute())
 
+# MCP server process pool
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "2"))
+MCP_POOL_MAX_REQUESTS = int(os.getenv("MCP_POOL_MAX_REQUESTS", "1000"))  # tool calls per process; 0 = never recycle
+MCP_POOL_PROBE_INTERVAL = float(os.getenv("MCP_POOL_PROBE_INTERVAL", "10"))  # 0 = no liveness probes
+
 print(f"📁 MCP Server Path: {MCP_SERVER_PATH}")
 
 # Initialize MCP tools
 try:
-    mcp_tools = [
-        McpToolset(
-            connection_params=StdioConnectionParams(
-                server_params=StdioServerParameters(
-                    command='python',
-                    args=[
-                        MCP_SERVER_PATH,
-                    ],
-                ),
+    mcp_pool = McpServerPool(
+        StdioConnectionParams(
+            server_params=StdioServerParameters(
+                command='python',
+                args=[
+                    MCP_SERVER_PATH,
+                ],
             ),
+        ),
+        size=MCP_POOL_SIZE,
+        max_requests=MCP_POOL_MAX_REQUESTS,
+        probe_interval=MCP_POOL_PROBE_INTERVAL
+    )
+    mcp_tools = [
+        PooledMcpToolset(
+            pool=mcp_pool,
             # Optional: Filter which tools from the MCP server are exposed
             # tool_filter=['account_summary', 'deposit', 'withdrawal', 'general']
         )
     ]
-    print("✅ MCP Toolset configured successfully")
+    print(f"✅ MCP Toolset configured successfully ({MCP_POOL_SIZE} pooled server processes)")
 except Exception as e:
     raise RuntimeError(f"Failed to configure MCP Toolset: {e}") from e
 
@@ -87,11 +115,22 @@ A2UI format should be:
 Always call the appropriate MCP tool based on user intent.""",
         tools=mcp_tools
     )
+    session_service = InMemorySessionService()
+    runner = Runner(app_name=APP_NAME, agent=agent, session_service=session_service)
     print("✅ Google ADK Agent initialized successfully with MCP tools")
 except Exception as e:
     raise RuntimeError(f"Failed to initialize Google ADK Agent: {e}") from e
 
-app = FastAPI(title="Banking Agent with MCP")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the MCP server processes before the first request; stop them on shutdown"""
+    await mcp_pool.start()
+    yield
+    await runner.close()
+    await mcp_pool.close()
+
+
+app = FastAPI(title="Banking Agent with MCP", lifespan=lifespan)
 
 # Enable CORS
 app.add_middleware(
@@ -112,15 +151,49 @@ class ChatResponse(BaseModel):
     a2ui: Dict[str, Any] | None = None
 
 
+async def run_agent(prompt: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    One agent run in a fresh ADK session, consumed to the end. Returns the
+    final response text and the MCP tool results seen on the way.
+    """
+    session = await session_service.create_session(app_name=APP_NAME, user_id=CHAT_USER_ID)
+    try:
+        text = ""
+        tool_results = []
+        async for event in runner.run_async(
+            user_id=CHAT_USER_ID,
+            session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text=prompt)])
+        ):
+            for function_response in event.get_function_responses():
+                tool_results.append(function_response.response or {})
+            if event.is_final_response() and event.content and event.content.parts:
+                text = "".join(part.text or "" for part in event.content.parts)
+        return text, tool_results
+    finally:
+        await session_service.delete_session(app_name=APP_NAME, user_id=CHAT_USER_ID, session_id=session.id)
+
+
+def widget_from_tool_result(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """A2UI message from an MCP tool result ({"content": [{"type": "text", "text": widget JSON}]})"""
+    if result.get("isError"):
+        return None
+    for item in result.get("content") or []:
+        try:
+            data = json.loads(item.get("text") or "")
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict) and "widget_type" in data and "widget_data" in data:
+            return {"type": data["widget_type"], "data": data["widget_data"]}
+    return None
+
+
 async def process_with_ai(prompt: str) -> Optional[Dict[str, Any]]:
     """Process prompt using Google ADK agent with MCP tools"""
     try:
-        # Use ADK agent with MCP tools
         # The agent will automatically call the appropriate MCP tool
-        response = await agent.generate_content(prompt)
-        
-        # Parse response - ADK agent should return structured data
-        response_text = response.text.strip()
+        response_text, tool_results = await run_agent(prompt)
+        response_text = response_text.strip()
         
         # Try to extract JSON from response
         try:
@@ -149,11 +222,15 @@ async def process_with_ai(prompt: str) -> Optional[Dict[str, Any]]:
                 }
                 
         except json.JSONDecodeError:
-            # If response is not JSON, the agent might have called the tool but returned text
-            # In this case, we need to handle it differently
-            # For now, return None to trigger error handling
-            print(f"⚠️  Could not parse JSON from agent response: {response_text[:200]}")
-            return None
+            pass
+        
+        # Not A2UI: the agent called the tool but answered in prose, so use what the tool returned
+        for result in reversed(tool_results):
+            widget = widget_from_tool_result(result)
+            if widget is not None:
+                return widget
+        print(f"⚠️  Could not parse JSON from agent response: {response_text[:200]}")
+        return None
         
     except Exception as e:
         print(f"Error processing with AI: {e}")
@@ -190,7 +267,8 @@ async def root():
         "version": "1.0.0",
         "mcp_server_path": MCP_SERVER_PATH,
         "agent_type": "Google ADK with MCP",
-        "mcp_enabled": True
+        "mcp_enabled": True,
+        "mcp_pool": mcp_pool.stats()
     }
 
 
@@ -0,0 +1,334 @@
+"""
+Pre-warmed MCP Server Pool
+Keeps stdio MCP server processes running and initialized so tool calls
+never pay for a spawn, interpreter start-up or MCP handshake
+
+The pool plugs into Google ADK through McpToolset's session manager:
+PooledMcpToolset is an McpToolset whose sessions come from the pool
+instead of a fresh ``python mcp_server.py`` per connection.
+"""
+import asyncio
+import itertools
+import time
+from datetime import timedelta
+from typing import Any, Callable, List, Optional
+
+import anyio
+from mcp import ClientSession
+from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED, CallToolRequest
+
+from google.adk.tools.mcp_tool.mcp_toolset import McpToolset
+from google.adk.tools.mcp_tool.mcp_session_manager import MCPSessionManager, StdioConnectionParams
+
+
+class PoolError(Exception):
+    """No usable MCP server process in the pool"""
+
+
+def _describe(error: Optional[BaseException]) -> str:
+    return (str(error) or type(error).__name__) if error is not None else "unknown"
+
+
+class _CountingSession(ClientSession):
+    """ClientSession that counts its process's tool calls and requests in flight, and notices when it dies"""
+
+    worker: "McpWorker" = None
+
+    async def send_request(self, request, *args, **kwargs):
+        worker = self.worker
+        if isinstance(request.root, CallToolRequest):
+            worker.tool_calls += 1
+            if worker.on_tool_call is not None:
+                worker.on_tool_call(worker)
+        worker.in_flight += 1
+        try:
+            return await super().send_request(request, *args, **kwargs)
+        except (anyio.ClosedResourceError, anyio.BrokenResourceError) as e:
+            worker.broken = e
+            raise
+        except McpError as e:
+            if e.error.code == CONNECTION_CLOSED:
+                worker.broken = e
+            raise
+        finally:
+            worker.in_flight -= 1
+
+
+class McpWorker:
+    """
+    One MCP server process and its initialized session.
+
+    The stdio transport and session are opened and closed inside the
+    worker's own task (anyio requires both in the same task); ``stop``
+    only signals that task. Requests from any task share the session,
+    matched to responses by id, so one process serves many calls at once.
+    """
+
+    def __init__(
+        self,
+        worker_id: int,
+        connection_params: StdioConnectionParams,
+        on_tool_call: Optional[Callable[["McpWorker"], None]] = None
+    ):
+        self.id = worker_id
+        self.connection_params = connection_params
+        self.session: Optional[_CountingSession] = None
+        # tools/call requests sent over this session (list_tools, pings etc. are not counted)
+        self.tool_calls = 0
+        self.on_tool_call = on_tool_call
+        self.in_flight = 0
+        self.handed_out = 0.0
+        self.started_at = 0.0
+        self.retiring = False
+        self.broken: Optional[BaseException] = None
+        self.error: Optional[BaseException] = None
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Spawn the process and wait for the MCP handshake"""
+        self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        if self.session is None:
+            raise PoolError(f"MCP server {self.id} failed to start: {_describe(self.error)}")
+
+    async def _run(self):
+        timeout = timedelta(seconds=self.connection_params.timeout)
+        try:
+            async with stdio_client(self.connection_params.server_params) as (read_stream, write_stream):
+                async with _CountingSession(read_stream, write_stream, read_timeout_seconds=timeout) as session:
+                    session.worker = self
+                    await session.initialize()
+                    self.session = session
+                    self.started_at = time.monotonic()
+                    self._ready.set()
+                    await self._stop.wait()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    @property
+    def alive(self) -> bool:
+        return (
+            self.session is not None and self.broken is None
+            and self._task is not None and not self._task.done()
+        )
+
+    async def probe(self, timeout: float) -> bool:
+        """Liveness probe: an MCP ping answered within ``timeout``"""
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception as e:
+            self.error = e
+            return False
+
+    async def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except (asyncio.TimeoutError, Exception):
+            self._task.cancel()
+
+
+class McpServerPool:
+    """
+    A fixed number of warm MCP server processes.
+
+    ``acquire`` hands out the least busy live session; concurrent calls
+    multiplex over it. A background loop pings every process, replaces
+    the ones that die or stop answering, and recycles a process after
+    ``max_requests`` tool calls: its replacement is warmed first, then the old
+    one finishes what it has in flight and exits. The pool belongs to the
+    event loop that starts it.
+    """
+
+    def __init__(
+        self,
+        connection_params: StdioConnectionParams,
+        size: int = 2,
+        max_requests: int = 1000,
+        probe_interval: float = 10.0,
+        probe_timeout: float = 5.0,
+        drain_grace: float = 1.0
+    ):
+        self.connection_params = connection_params
+        self.size = max(1, size)
+        self.max_requests = max_requests
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.drain_grace = drain_grace
+        self.workers: List[McpWorker] = []
+        self.respawns = 0
+        self.recycled = 0
+        self._ids = itertools.count(1)
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._replacing: set = set()  # ids of workers being replaced
+        self._tasks: set = set()
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._started = False
+
+    async def _spawn(self) -> McpWorker:
+        worker = McpWorker(next(self._ids), self.connection_params, on_tool_call=self._count_tool_call)
+        try:
+            await worker.start()
+        except Exception:
+            await worker.stop()
+            raise
+        return worker
+
+    async def start(self):
+        """Spawn and initialize every process up front"""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+
+        async with self._start_lock:
+            if self._started:
+                return
+            start = time.perf_counter()
+            self.workers = list(await asyncio.gather(*(self._spawn() for _ in range(self.size))))
+            self._started = True
+            if self.probe_interval > 0:
+                self._monitor_task = asyncio.create_task(self._monitor())
+            print(f"🔥 MCP pool warm: {self.size} server process(es) in {time.perf_counter() - start:.2f}s")
+
+    def _pick(self) -> Optional[McpWorker]:
+        live = [w for w in self.workers if w.alive]
+        # A process being recycled still works until its replacement is swapped in
+        candidates = [w for w in live if not w.retiring] or live
+        return min(candidates, key=lambda w: (w.in_flight, w.tool_calls)) if candidates else None
+
+    async def acquire(self) -> ClientSession:
+        """Least busy live session; starts the pool on first use"""
+        if not self._started:
+            await self.start()
+
+        # Replace processes whose transport failed now rather than at the next probe
+        for dead in [w for w in self.workers if not w.alive and w.id not in self._replacing]:
+            self.respawns += 1
+            self._retire(dead, f"down: {_describe(dead.broken or dead.error)}")
+
+        worker = self._pick()
+        if worker is None:
+            deadline = time.monotonic() + self.connection_params.timeout + self.probe_timeout
+            while worker is None and self._replacing and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                worker = self._pick()
+            if worker is None:
+                raise PoolError("No live MCP server processes")
+
+        worker.handed_out = time.monotonic()
+        return worker.session
+
+    def _count_tool_call(self, worker: McpWorker):
+        """Recycle ``worker`` once it has sent ``max_requests`` tool calls"""
+        # The session may still be held after the swap, so keep the drain grace running
+        worker.handed_out = time.monotonic()
+        if self.max_requests and worker.tool_calls >= self.max_requests and not worker.retiring:
+            self.recycled += 1
+            self._retire(worker, f"recycled after {worker.tool_calls} tool calls")
+
+    def _retire(self, worker: McpWorker, reason: str):
+        """Stop handing ``worker`` out and replace it in the background"""
+        if worker.id in self._replacing:
+            return
+        worker.retiring = True
+        self._replacing.add(worker.id)
+        task = asyncio.create_task(self._replace(worker, reason))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _replace(self, old: McpWorker, reason: str):
+        """Warm a new process, swap it in for ``old``, then drain and stop ``old``"""
+        try:
+            try:
+                new = await self._spawn()
+            except Exception as e:
+                # Keep the old one in rotation; the next probe tries again
+                old.retiring = False
+                print(f"❌ MCP server {old.id} respawn failed: {e}")
+                return
+            if old not in self.workers:
+                await new.stop()
+                return
+            self.workers[self.workers.index(old)] = new
+            print(f"♻️  MCP server {old.id} -> {new.id} ({reason})")
+            await self._drain(old)
+        finally:
+            self._replacing.discard(old.id)
+
+    async def _drain(self, worker: McpWorker):
+        """Let calls already handed ``worker``'s session finish, then stop it"""
+        worker.retiring = True
+        deadline = time.monotonic() + self.probe_timeout + self.drain_grace
+        while worker.alive and time.monotonic() < deadline and (
+            worker.in_flight or time.monotonic() - worker.handed_out < self.drain_grace
+        ):
+            await asyncio.sleep(0.05)
+        await worker.stop()
+
+    async def _monitor(self):
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            for worker in list(self.workers):
+                if worker.id in self._replacing:
+                    continue
+                if not await worker.probe(self.probe_timeout):
+                    print(f"⚠️  MCP server {worker.id} failed liveness probe: {_describe(worker.error)}")
+                    self.respawns += 1
+                    self._retire(worker, "failed liveness probe")
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "live": sum(1 for w in self.workers if w.alive and not w.retiring),
+            "in_flight": sum(w.in_flight for w in self.workers),
+            "tool_calls": {w.id: w.tool_calls for w in self.workers},
+            "respawns": self.respawns,
+            "recycled": self.recycled
+        }
+
+    async def close(self):
+        """Stop monitoring and every process"""
+        if self._monitor_task:
+            self._monitor_task.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*(w.stop() for w in self.workers), return_exceptions=True)
+        self.workers = []
+        self._started = False
+
+
+class PooledSessionManager(MCPSessionManager):
+    """MCPSessionManager whose sessions are borrowed from an McpServerPool"""
+
+    def __init__(self, pool: McpServerPool):
+        super().__init__(connection_params=pool.connection_params)
+        self.pool = pool
+
+    async def create_session(self, headers: Optional[dict] = None, *args: Any, **kwargs: Any) -> ClientSession:
+        # Stdio servers take no headers; every caller shares the pool
+        return await self.pool.acquire()
+
+    async def close(self):
+        # McpToolset.close (e.g. from Runner.close) must not stop the shared
+        # pool's processes; the app's lifespan closes the pool itself
+        pass
+
+
+class PooledMcpToolset(McpToolset):
+    """McpToolset backed by a pool of warm MCP server processes"""
+
+    def __init__(self, *, pool: McpServerPool, **kwargs: Any):
+        super().__init__(connection_params=pool.connection_params, **kwargs)
+        self._mcp_session_manager = PooledSessionManager(pool)
+        self.pool = pool
@@ -0,0 +1,153 @@
+"""
+Tool Call Benchmark for the Banking MCP Server
+Tool calls per second, before and after pre-serializing widgets
+
+Measures the handler alone (the old per-call json.dumps(indent=2) and Tool
+construction against the registry's precomputed payloads) and full MCP
+round trips over an in-memory client/server session, which is what the
+agent sees minus the stdio pipe.
+
+Usage:
+    python bench_tool_calls.py [--calls 20000] [--session-calls 2000]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from mcp.server import Server
+from mcp.shared.memory import create_connected_server_and_client_session
+from mcp.types import TextContent, Tool
+
+import mcp_server
+from widgets import WIDGETS
+
+NAMES = list(WIDGETS.keys())
+
+
+def legacy_call_tool(name: str) -> list[TextContent]:
+    """call_tool as it was: serialize the widget on every call"""
+    widget_info = WIDGETS[name]
+    widget_data = {
+        "widget_type": widget_info["widget_type"],
+        "widget_data": widget_info["data"]
+    }
+    return [TextContent(type="text", text=json.dumps(widget_data, indent=2))]
+
+
+def legacy_list_tools() -> list[Tool]:
+    """list_tools as it was: build every Tool on every call"""
+    return [
+        Tool(
+            name=info["name"],
+            description=info["description"],
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "widget_type": {"type": "string", "description": f"The type of widget: {info['widget_type']}"}
+                },
+                "required": []
+            }
+        )
+        for info in WIDGETS.values()
+    ]
+
+
+def legacy_server() -> Server:
+    """The server as it was, for round-trip comparison"""
+    server = Server("banking-widgets-mcp-server")
+
+    @server.list_tools()
+    async def list_tools() -> list[Tool]:
+        return legacy_list_tools()
+
+    @server.call_tool()
+    async def call_tool(name: str, arguments: dict | None) -> list[TextContent]:
+        return legacy_call_tool(name)
+
+    return server
+
+
+def per_second(count: int, seconds: float) -> float:
+    return round(count / seconds, 1) if seconds else 0.0
+
+
+def bench_handlers(calls: int) -> dict:
+    start = time.perf_counter()
+    for i in range(calls):
+        legacy_call_tool(NAMES[i % len(NAMES)])
+    legacy_call_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(calls):
+        entry = mcp_server.registry.get(NAMES[i % len(NAMES)])
+        entry.validation_error({})
+        entry.content
+    call_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        legacy_list_tools()
+    legacy_list_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        mcp_server.registry.tools
+    list_s = time.perf_counter() - start
+
+    legacy_bytes = sum(len(legacy_call_tool(name)[0].text) for name in NAMES) / len(NAMES)
+    payload_bytes = sum(len(mcp_server.registry.get(name).payload) for name in NAMES) / len(NAMES)
+    return {
+        "legacy_call_tool_per_s": per_second(calls, legacy_call_s),
+        "call_tool_per_s": per_second(calls, call_s),
+        "legacy_list_tools_per_s": per_second(calls, legacy_list_s),
+        "list_tools_per_s": per_second(calls, list_s),
+        "legacy_payload_bytes": round(legacy_bytes),
+        "payload_bytes": round(payload_bytes)
+    }
+
+
+async def round_trips(server: Server, calls: int) -> tuple:
+    """(call_tool/s, list_tools/s) over an in-memory session"""
+    async with create_connected_server_and_client_session(server) as client:
+        await client.list_tools()
+        start = time.perf_counter()
+        for i in range(calls):
+            await client.call_tool(NAMES[i % len(NAMES)], {})
+        call_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(calls):
+            await client.list_tools()
+        list_s = time.perf_counter() - start
+
+    return per_second(calls, call_s), per_second(calls, list_s)
+
+
+async def bench_session(calls: int) -> dict:
+    legacy_call, legacy_list = await round_trips(legacy_server(), calls)
+    call, listed = await round_trips(mcp_server.server, calls)
+    return {
+        "legacy_session_call_tool_per_s": legacy_call,
+        "session_call_tool_per_s": call,
+        "legacy_session_list_tools_per_s": legacy_list,
+        "session_list_tools_per_s": listed
+    }
+
+
+def run(calls: int = 20000, session_calls: int = 2000) -> dict:
+    results = bench_handlers(calls)
+    results.update(asyncio.run(bench_session(session_calls)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--session-calls", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.calls, args.session_calls), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,83 +1,151 @@
 """
 Real MCP Server for Banking Widgets
 Uses MCP protocol with stdio transport
-Exposes widgets as MCP tools
+Exposes widgets as MCP tools (and as widget:// resources)
+
+Widget payloads and tool definitions are serialized once at startup by
+WidgetRegistry. While running, widgets.py is polled for changes and the
+connected client is notified (tools/list_changed, resources/updated).
 """
 import asyncio
-import json
+import os
 import sys
-from typing import Any, Sequence
-from mcp.server import Server
+import weakref
+from typing import Any, Iterable
+from mcp.server import NotificationOptions, Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
 from mcp.server.stdio import stdio_server
-from mcp.types import Tool, TextContent
+from mcp.types import Resource, TextContent, Tool
+
+# Widget definitions, pre-serialized
+from widget_registry import WidgetRegistry
 
-# Import widget definitions
-from widgets import WIDGETS
+registry = WidgetRegistry("widgets")
+
+# Seconds between checks of widgets.py (0 disables reloading)
+POLL_INTERVAL = float(os.getenv("WIDGETS_POLL_INTERVAL", "2"))
 
 # Create MCP server instance
 server = Server("banking-widgets-mcp-server")
 
+# Client sessions seen so far, and the widget:// URIs they subscribed to
+sessions: "weakref.WeakSet[Any]" = weakref.WeakSet()
+subscriptions: set[str] = set()
+
+
+def track_session():
+    """Remember the session of the current request so changes can be pushed to it"""
+    try:
+        sessions.add(server.request_context.session)
+    except LookupError:
+        pass
+
 
 @server.list_tools()
 async def list_tools() -> list[Tool]:
     """
     List all available tools (widgets) in MCP format
     """
-    tools = []
-    for widget_id, widget_info in WIDGETS.items():
-        tools.append(
-            Tool(
-                name=widget_info["name"],
-                description=widget_info["description"],
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "widget_type": {
-                            "type": "string",
-                            "description": f"The type of widget: {widget_info['widget_type']}"
-                        }
-                    },
-                    "required": []
-                }
-            )
-        )
-    return tools
-
-
-@server.call_tool()
+    track_session()
+    return registry.tools
+
+
+@server.call_tool(validate_input=False)
 async def call_tool(name: str, arguments: dict | None) -> list[TextContent]:
     """
     Call a tool (widget) and return its A2UI data
     """
-    if name not in WIDGETS:
-        raise ValueError(f"Tool '{name}' not found. Available tools: {list(WIDGETS.keys())}")
-    
-    widget_info = WIDGETS[name]
-    
-    # Return widget data as JSON string in MCP TextContent format
-    widget_data = {
-        "widget_type": widget_info["widget_type"],
-        "widget_data": widget_info["data"]
-    }
-    
-    return [
-        TextContent(
-            type="text",
-            text=json.dumps(widget_data, indent=2)
-        )
-    ]
+    track_session()
+    entry = registry.get(name)
+    if entry is None:
+        raise ValueError(f"Tool '{name}' not found. Available tools: {list(registry.entries.keys())}")
+
+    error = entry.validation_error(arguments)
+    if error is not None:
+        raise ValueError(f"Input validation error: {error}")
+
+    # Compact JSON with its content_hash, serialized when the widget was loaded
+    return entry.content
+
+
+@server.list_resources()
+async def list_resources() -> list[Resource]:
+    """
+    The same widgets as readable (and subscribable) resources
+    """
+    track_session()
+    return registry.resources
+
+
+@server.read_resource()
+async def read_resource(uri) -> Iterable[ReadResourceContents]:
+    """
+    Read a widget by its widget:// URI
+    """
+    entry = registry.get_by_uri(str(uri))
+    if entry is None:
+        raise ValueError(f"Unknown resource: {uri}")
+    return [ReadResourceContents(content=entry.payload, mime_type="application/json")]
+
+
+@server.subscribe_resource()
+async def subscribe_resource(uri) -> None:
+    track_session()
+    subscriptions.add(str(uri))
+
+
+@server.unsubscribe_resource()
+async def unsubscribe_resource(uri) -> None:
+    subscriptions.discard(str(uri))
+
+
+async def notify_changes(changed: list[str], tools_changed: bool):
+    """Tell every connected client what a reload changed"""
+    uris = {f"widget://{name}" for name in changed}
+    for session in list(sessions):
+        try:
+            if tools_changed:
+                await session.send_tool_list_changed()
+                await session.send_resource_list_changed()
+            for uri in sorted(uris & subscriptions):
+                await session.send_resource_updated(uri)
+        except Exception as e:
+            print(f"⚠️  Could not notify client: {e}", file=sys.stderr)
+
+
+async def watch_widgets():
+    """Reload widgets.py when it changes on disk"""
+    while True:
+        await asyncio.sleep(POLL_INTERVAL)
+        try:
+            changed, tools_changed = registry.reload_if_modified()
+        except Exception as e:
+            # Keep serving the last good widgets until the file is fixed
+            print(f"⚠️  Could not reload widgets: {e}", file=sys.stderr)
+            continue
+        if changed:
+            print(f"🔄 Widgets v{registry.version}: reloaded {', '.join(changed)}", file=sys.stderr)
+            await notify_changes(changed, tools_changed)
 
 
 async def main():
     """
     Run the MCP server using stdio transport
     """
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    options = server.create_initialization_options(
+        notification_options=NotificationOptions(tools_changed=True, resources_changed=True)
+    )
+    # The SDK always advertises subscribe=False, even with a subscribe handler
+    if options.capabilities.resources is not None:
+        options.capabilities.resources.subscribe = True
+
+    watcher = asyncio.create_task(watch_widgets()) if POLL_INTERVAL > 0 else None
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, options)
+    finally:
+        if watcher is not None:
+            watcher.cancel()
 
 
 if __name__ == "__main__":
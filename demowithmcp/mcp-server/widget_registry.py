@@ -0,0 +1,133 @@
+"""
+Widget Registry for the Banking MCP Server
+Pre-serializes every widget and its MCP tool definition once, and reloads
+them when widgets.py changes on disk
+"""
+import hashlib
+import importlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from jsonschema.validators import validator_for
+from mcp.types import Resource, TextContent, Tool
+
+WIDGET_URI_PREFIX = "widget://"
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+class WidgetEntry:
+    """One widget with everything a request needs, built ahead of time"""
+
+    __slots__ = ("name", "widget_type", "description", "content_hash", "payload", "content", "tool", "validator", "resource")
+
+    def __init__(self, info: Dict[str, Any]):
+        self.name = info["name"]
+        self.widget_type = info["widget_type"]
+        self.description = info["description"]
+        body = {"widget_type": self.widget_type, "widget_data": info["data"]}
+        self.content_hash = hashlib.sha256(_compact(body).encode("utf-8")).hexdigest()[:16]
+        self.payload = _compact({**body, "content_hash": self.content_hash})
+        # Handed out as-is on every call; nothing downstream mutates it
+        self.content = [TextContent(type="text", text=self.payload)]
+        self.tool = Tool(
+            name=self.name,
+            description=self.description,
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "widget_type": {
+                        "type": "string",
+                        "description": f"The type of widget: {self.widget_type}"
+                    }
+                },
+                "required": []
+            }
+        )
+        # Compiled once instead of per call (the SDK's default re-checks the schema)
+        self.validator = validator_for(self.tool.inputSchema)(self.tool.inputSchema)
+        self.resource = Resource(
+            uri=f"{WIDGET_URI_PREFIX}{self.name}",
+            name=self.name,
+            description=self.description,
+            mimeType="application/json"
+        )
+
+    def validation_error(self, arguments: Optional[Dict[str, Any]]) -> Optional[str]:
+        error = next(self.validator.iter_errors(arguments or {}), None)
+        return error.message if error is not None else None
+
+    def tool_signature(self) -> Tuple[str, str, str]:
+        return self.name, self.description, self.widget_type
+
+
+class WidgetRegistry:
+    """
+    Serialized widgets keyed by tool name.
+
+    ``reload`` re-imports the widget module and rebuilds only what
+    changed; ``version`` moves with every change, and each widget's
+    ``content_hash`` with its data, so clients can tell what is stale.
+    """
+
+    def __init__(self, module_name: str = "widgets"):
+        self.module = importlib.import_module(module_name)
+        self.path = self.module.__file__
+        self.version = 0
+        self.entries: Dict[str, WidgetEntry] = {}
+        self.tools: List[Tool] = []
+        self.resources: List[Resource] = []
+        self._mtime_ns: Optional[int] = None
+        self._build(self.module.WIDGETS)
+
+    def _build(self, widgets: Dict[str, Dict[str, Any]]) -> Tuple[List[str], bool]:
+        """Swap in entries for ``widgets``; returns (changed names, tool list changed)"""
+        entries = {}
+        for info in widgets.values():
+            previous = self.entries.get(info["name"])
+            entry = WidgetEntry(info)
+            entries[entry.name] = previous if previous and previous.payload == entry.payload \
+                and previous.tool_signature() == entry.tool_signature() else entry
+
+        changed = sorted(
+            name for name in set(entries) | set(self.entries)
+            if entries.get(name) is not self.entries.get(name)
+        )
+        tools_changed = [e.tool_signature() for e in entries.values()] != \
+            [e.tool_signature() for e in self.entries.values()]
+
+        self.entries = entries
+        self.tools = [entry.tool for entry in entries.values()]
+        self.resources = [entry.resource for entry in entries.values()]
+        self._mtime_ns = self._stat()
+        if changed:
+            self.version += 1
+        return changed, tools_changed
+
+    def _stat(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload(self) -> Tuple[List[str], bool]:
+        """Re-import the widget module; returns (changed names, tool list changed)"""
+        self.module = importlib.reload(self.module)
+        return self._build(self.module.WIDGETS)
+
+    def reload_if_modified(self) -> Tuple[List[str], bool]:
+        """Reload only if the widget file's mtime moved"""
+        if self._stat() == self._mtime_ns:
+            return [], False
+        return self.reload()
+
+    def get(self, name: str) -> Optional[WidgetEntry]:
+        return self.entries.get(name)
+
+    def get_by_uri(self, uri: str) -> Optional[WidgetEntry]:
+        if not uri.startswith(WIDGET_URI_PREFIX):
+            return None
+        return self.entries.get(uri[len(WIDGET_URI_PREFIX):])
@@ -155,12 +155,16 @@ def simple_after_model_modifier(
     """Inspect model responses - let ADK handle natural flow."""
     return None
 
+# Offline mock server (mock-llm/) speaking the OpenAI-compatible API
+MOCK_LLM_URL = os.getenv("MOCK_LLM_URL")
+MOCK_LLM_API_KEY = "mock-key"
+
 investment_agent = LlmAgent(
     name="InvestmentAgent",
     model=LiteLlm(
         model="openrouter/deepseek/deepseek-r1",
-        api_key=os.getenv("OPENROUTER_API_KEY"),
-        api_base="https://openrouter.ai/api/v1"
+        api_key=MOCK_LLM_API_KEY if MOCK_LLM_URL else os.getenv("OPENROUTER_API_KEY"),
+        api_base=f"{MOCK_LLM_URL.rstrip('/')}/v1" if MOCK_LLM_URL else "https://openrouter.ai/api/v1"
     ),
     instruction=f"""
     You are a human-in-the-loop investment advisor assistant that helps customers choose investment options with human oversight and approval.
@@ -0,0 +1,95 @@
+"""
+Mock LLM Throughput Benchmark
+Drives the mock server with concurrent chat requests and reports req/s and latency
+
+Usage:
+    python mock_llm_server.py --seed 1 &
+    python bench_throughput.py [--api gemini|openai] [--concurrency 32] [--requests 500] [--stream]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+
+def _request(api: str, prompt: str, stream: bool):
+    if api == "gemini":
+        method = "streamGenerateContent?alt=sse" if stream else "generateContent"
+        return f"/v1beta/models/gemini-2.0-flash:{method}", {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "tools": [{"functionDeclarations": [{"name": "get_schedule_meeting_widget"}]}]
+        }
+    return "/v1/chat/completions", {
+        "model": "mock",
+        "stream": stream,
+        "messages": [{"role": "user", "content": prompt}]
+    }
+
+
+async def run(url: str, api: str, concurrency: int, total: int, stream: bool):
+    prompts = ["Please fetch the schedule meeting widget.", "hello there", "What can you do?"]
+    latencies = []
+    ttfts = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        await client.post("/stats/reset")
+
+        async def worker():
+            nonlocal errors
+            for index in remaining:
+                path, body = _request(api, prompts[index % len(prompts)], stream)
+                start = time.perf_counter()
+                try:
+                    async with client.stream("POST", path, json=body) as response:
+                        first = None
+                        async for _ in response.aiter_bytes():
+                            if first is None:
+                                first = time.perf_counter()
+                        response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                end = time.perf_counter()
+                latencies.append(end - start)
+                ttfts.append((first or end) - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        server = (await client.get("/stats")).json()
+
+    latencies.sort()
+    return {
+        "api": api,
+        "stream": stream,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "req_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 1) if latencies else 0.0,
+        "latency_p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 1) if latencies else 0.0,
+        "ttft_p50_ms": round(statistics.median(ttfts) * 1000, 1) if ttfts else 0.0,
+        "server": server
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8090")
+    parser.add_argument("--api", choices=["gemini", "openai"], default="gemini")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--stream", action="store_true")
+    args = parser.parse_args()
+    result = asyncio.run(run(args.url, args.api, args.concurrency, args.requests, args.stream))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
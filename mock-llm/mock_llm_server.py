@@ -0,0 +1,510 @@
+"""
+Mock LLM Server
+Offline stand-in for the Gemini and OpenAI-compatible chat APIs
+
+Serves scripted text and tool-call responses with configurable latency and
+token-rate distributions, streamed or not, so every agent in the repo can
+be load-tested reproducibly without network access or API keys.
+
+Endpoints:
+    POST /v1beta/models/{model}:generateContent          (Gemini)
+    POST /v1beta/models/{model}:streamGenerateContent    (Gemini, SSE)
+    POST /v1beta/models/{model}:countTokens              (Gemini)
+    POST /v1/chat/completions                            (OpenAI, stream or not)
+    GET  /v1/models                                      (OpenAI)
+    GET  /stats, POST /stats/reset, GET /healthz
+
+Usage:
+    python mock_llm_server.py [--port 8090] [--script scripts/default.json] [--seed 42]
+
+Then start an agent with MOCK_LLM_URL=http://localhost:8090
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+SCRIPTS_DIR = Path(__file__).parent / "scripts"
+TOKEN_PATTERN = re.compile(r"\s*\S+")
+
+
+# ============================================================================
+# DISTRIBUTIONS
+# ============================================================================
+
+class Distribution:
+    """
+    A sampled quantity, configured as a number or a dict:
+
+    - ``250``                                      fixed
+    - ``{"dist": "uniform", "min": 100, "max": 400}``
+    - ``{"dist": "normal", "mean": 80, "stddev": 10}``
+    - ``{"dist": "lognormal", "median": 300, "sigma": 0.5}``
+    - ``{"dist": "exponential", "mean": 200}``
+
+    Samples are clamped to ``min_value`` (and ``max`` when given).
+    """
+
+    def __init__(self, spec: Any, min_value: float = 0.0):
+        if isinstance(spec, (int, float)):
+            spec = {"dist": "fixed", "value": spec}
+        self.spec = spec
+        self.kind = spec.get("dist", "fixed")
+        self.min_value = min_value
+        if self.kind not in ("fixed", "uniform", "normal", "lognormal", "exponential"):
+            raise ValueError(f"Unknown distribution: {self.kind}")
+
+    def sample(self, rng: random.Random) -> float:
+        spec = self.spec
+        if self.kind == "fixed":
+            value = spec["value"]
+        elif self.kind == "uniform":
+            value = rng.uniform(spec["min"], spec["max"])
+        elif self.kind == "normal":
+            value = rng.gauss(spec["mean"], spec["stddev"])
+        elif self.kind == "lognormal":
+            value = rng.lognormvariate(math.log(spec["median"]), spec["sigma"])
+        else:
+            value = rng.expovariate(1.0 / spec["mean"])
+        if "max" in spec and self.kind != "uniform":
+            value = min(value, spec["max"])
+        return max(self.min_value, value)
+
+
+# ============================================================================
+# CONVERSATIONS
+# ============================================================================
+
+class Conversation:
+    """Provider-neutral view of a request: messages, declared tools, model"""
+
+    def __init__(self, model: str, messages: List[Dict[str, Any]], tools: List[str]):
+        self.model = model
+        self.messages = messages
+        self.tools = tools
+
+    @property
+    def last(self) -> Dict[str, Any]:
+        return self.messages[-1] if self.messages else {"role": "user", "text": ""}
+
+    @property
+    def last_user_text(self) -> str:
+        for message in reversed(self.messages):
+            if message["role"] == "user":
+                return message["text"]
+        return ""
+
+    def prompt_tokens(self) -> int:
+        return sum(count_tokens(m["text"]) for m in self.messages)
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return max(1, math.ceil(len(text) / 4)) if text else 0
+
+
+def _gemini_parts_text(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    texts, tool_calls, tool_results = [], [], []
+    for part in parts:
+        if "text" in part:
+            texts.append(part["text"])
+        call = part.get("functionCall") or part.get("function_call")
+        if call:
+            tool_calls.append(call.get("name"))
+        result = part.get("functionResponse") or part.get("function_response")
+        if result:
+            tool_results.append({"name": result.get("name"), "content": json.dumps(result.get("response"))})
+    return {"text": "\n".join(texts), "tool_calls": tool_calls, "tool_results": tool_results}
+
+
+def from_gemini(model: str, body: Dict[str, Any]) -> Conversation:
+    messages = []
+    system = body.get("systemInstruction") or body.get("system_instruction")
+    if system:
+        messages.append({"role": "system", "text": _gemini_parts_text(system.get("parts", []))["text"]})
+    for content in body.get("contents", []):
+        parsed = _gemini_parts_text(content.get("parts", []))
+        if parsed["tool_results"]:
+            for result in parsed["tool_results"]:
+                messages.append({"role": "tool", "name": result["name"], "text": result["content"]})
+        else:
+            role = "assistant" if content.get("role") == "model" else "user"
+            messages.append({"role": role, "text": parsed["text"], "tool_calls": parsed["tool_calls"]})
+
+    tools = []
+    for tool in body.get("tools", []) or []:
+        for declaration in tool.get("functionDeclarations") or tool.get("function_declarations") or []:
+            tools.append(declaration["name"])
+    return Conversation(model, messages, tools)
+
+
+def _openai_content_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+def from_openai(body: Dict[str, Any]) -> Conversation:
+    messages = []
+    call_names: Dict[str, str] = {}
+    for message in body.get("messages", []):
+        role = message.get("role", "user")
+        if role in ("tool", "function"):
+            messages.append({
+                "role": "tool",
+                "name": message.get("name") or call_names.get(message.get("tool_call_id"), ""),
+                "text": _openai_content_text(message.get("content"))
+            })
+        else:
+            calls = message.get("tool_calls") or []
+            for call in calls:
+                call_names[call.get("id")] = call["function"]["name"]
+            messages.append({
+                "role": "system" if role in ("system", "developer") else role,
+                "text": _openai_content_text(message.get("content")),
+                "tool_calls": [c["function"]["name"] for c in calls]
+            })
+    tools = [t["function"]["name"] for t in body.get("tools", []) or [] if t.get("type") == "function"]
+    return Conversation(body.get("model", "mock"), messages, tools)
+
+
+# ============================================================================
+# SCRIPT
+# ============================================================================
+
+class Reply:
+    """What the mock model says: text and/or tool calls, plus timing"""
+
+    def __init__(self, text: str, tool_calls: List[Dict[str, Any]], ttft: float, tokens_per_second: float):
+        self.text = text
+        self.tool_calls = tool_calls
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+
+    @property
+    def text_tokens(self) -> List[str]:
+        return TOKEN_PATTERN.findall(self.text)
+
+    @property
+    def completion_tokens(self) -> int:
+        calls = sum(count_tokens(json.dumps(c["args"])) + 1 for c in self.tool_calls)
+        return len(self.text_tokens) + calls
+
+
+class _FormatDict(dict):
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+def _format_args(value: Any, values: _FormatDict) -> Any:
+    """Apply text templating to every string inside tool-call arguments"""
+    if isinstance(value, str):
+        return value.format_map(values)
+    if isinstance(value, list):
+        return [_format_args(v, values) for v in value]
+    if isinstance(value, dict):
+        return {k: _format_args(v, values) for k, v in value.items()}
+    return value
+
+
+class Script:
+    """
+    Rules tried in order against each request; the first match responds.
+
+    A rule is ``{"match": {...}, "respond": {...} or [...]}``. Match keys
+    (all optional, all must hold):
+
+    - ``contains`` / ``regex``: last user message (case-insensitive)
+    - ``after_tool``: the last message is a tool result (true/false)
+    - ``tool_available``: a tool of that name was declared
+    - ``model``: substring of the requested model name
+
+    A response is ``{"text": "..."}`` and/or ``{"tool_call": {"name", "args"}}``
+    (or ``"tool_calls": [...]``), optionally with its own ``latency_ms`` and
+    ``tokens_per_second``. A list of responses is served round-robin. Text
+    may use ``{last_user}``, ``{tool_name}`` and ``{tool_result}``.
+
+    Without a matching rule and with ``auto`` on, the model calls a declared
+    tool whose name appears in the user message, summarizes tool results,
+    and otherwise answers with ``default_text``.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        defaults = data.get("defaults", {})
+        self.latency = Distribution(defaults.get("latency_ms", {"dist": "lognormal", "median": 350, "sigma": 0.35}))
+        self.rate = Distribution(defaults.get("tokens_per_second", {"dist": "normal", "mean": 90, "stddev": 15}), 1.0)
+        self.default_text = defaults.get("default_text", "This is a mock response from the offline model server.")
+        self.auto = data.get("auto", True)
+        self.rules = data.get("rules", [])
+        self._cursors: Dict[int, int] = {}
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> "Script":
+        if not path:
+            return cls({})
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _matches(self, match: Dict[str, Any], conversation: Conversation) -> bool:
+        user_text = conversation.last_user_text.lower()
+        if "contains" in match and match["contains"].lower() not in user_text:
+            return False
+        if "regex" in match and not re.search(match["regex"], conversation.last_user_text, re.IGNORECASE):
+            return False
+        if "after_tool" in match and (conversation.last["role"] == "tool") != match["after_tool"]:
+            return False
+        if "tool_available" in match and match["tool_available"] not in conversation.tools:
+            return False
+        if "model" in match and match["model"] not in conversation.model:
+            return False
+        return True
+
+    def _auto(self, conversation: Conversation) -> Dict[str, Any]:
+        if conversation.last["role"] == "tool":
+            return {"text": "Here is the result of {tool_name}: {tool_result}"}
+        user_text = conversation.last_user_text.lower()
+        for tool in conversation.tools:
+            if tool.lower() in user_text or tool.lower().replace("_", " ") in user_text:
+                return {"tool_call": {"name": tool, "args": {}}}
+        return {"text": self.default_text}
+
+    def reply(self, conversation: Conversation, rng: random.Random) -> Reply:
+        response = None
+        for index, rule in enumerate(self.rules):
+            if self._matches(rule.get("match", {}), conversation):
+                response = rule["respond"]
+                if isinstance(response, list):
+                    cursor = self._cursors.get(index, 0)
+                    self._cursors[index] = cursor + 1
+                    response = response[cursor % len(response)]
+                break
+        if response is None:
+            response = self._auto(conversation) if self.auto else {"text": self.default_text}
+
+        last = conversation.last
+        values = _FormatDict(
+            last_user=conversation.last_user_text,
+            tool_name=last.get("name", "") if last["role"] == "tool" else "",
+            tool_result=last["text"][:200] if last["role"] == "tool" else ""
+        )
+        text = response.get("text", "").format_map(values)
+        tool_calls = list(response.get("tool_calls", []))
+        if "tool_call" in response:
+            tool_calls.append(response["tool_call"])
+        tool_calls = [{"name": c["name"], "args": _format_args(c.get("args", {}), values)} for c in tool_calls]
+
+        latency = Distribution(response["latency_ms"]) if "latency_ms" in response else self.latency
+        rate = Distribution(response["tokens_per_second"], 1.0) if "tokens_per_second" in response else self.rate
+        return Reply(text, tool_calls, latency.sample(rng) / 1000.0, rate.sample(rng))
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+class MockLLM:
+    def __init__(self, script: Script, seed: Optional[int] = None, time_scale: float = 1.0):
+        self.script = script
+        self.rng = random.Random(seed)
+        self.time_scale = time_scale
+        self.stats = {"requests": 0, "streamed": 0, "tool_calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self.by_api: Dict[str, int] = {}
+
+    def reply(self, api: str, conversation: Conversation, stream: bool) -> Reply:
+        reply = self.script.reply(conversation, self.rng)
+        self.stats["requests"] += 1
+        self.stats["streamed"] += int(stream)
+        self.stats["tool_calls"] += len(reply.tool_calls)
+        self.stats["prompt_tokens"] += conversation.prompt_tokens()
+        self.stats["completion_tokens"] += reply.completion_tokens
+        self.by_api[api] = self.by_api.get(api, 0) + 1
+        return reply
+
+    async def sleep(self, seconds: float):
+        if seconds > 0 and self.time_scale > 0:
+            await asyncio.sleep(seconds * self.time_scale)
+
+    def chunks(self, reply: Reply, tokens_per_chunk: int = 4) -> List[str]:
+        tokens = reply.text_tokens
+        return ["".join(tokens[i:i + tokens_per_chunk]) for i in range(0, len(tokens), tokens_per_chunk)]
+
+
+def _usage_gemini(conversation: Conversation, reply: Reply) -> Dict[str, int]:
+    prompt = conversation.prompt_tokens()
+    return {
+        "promptTokenCount": prompt,
+        "candidatesTokenCount": reply.completion_tokens,
+        "totalTokenCount": prompt + reply.completion_tokens
+    }
+
+
+def _usage_openai(conversation: Conversation, reply: Reply) -> Dict[str, int]:
+    prompt = conversation.prompt_tokens()
+    return {
+        "prompt_tokens": prompt,
+        "completion_tokens": reply.completion_tokens,
+        "total_tokens": prompt + reply.completion_tokens
+    }
+
+
+def create_app(mock: MockLLM) -> FastAPI:
+    app = FastAPI(title="Mock LLM Server")
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    @app.get("/stats")
+    async def stats():
+        return {**mock.stats, "by_api": mock.by_api}
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        for key in mock.stats:
+            mock.stats[key] = 0
+        mock.by_api.clear()
+        return {"status": "reset"}
+
+    # ---------------------------------------------------------------- Gemini
+
+    @app.post("/{version}/models/{target}")
+    async def gemini(version: str, target: str, request: Request):
+        model, _, method = target.partition(":")
+        body = await request.json()
+        conversation = from_gemini(model, body)
+
+        if method == "countTokens":
+            return {"totalTokens": conversation.prompt_tokens()}
+        if method not in ("generateContent", "streamGenerateContent"):
+            raise HTTPException(status_code=404, detail=f"Unsupported method: {method}")
+
+        stream = method == "streamGenerateContent"
+        reply = mock.reply("gemini", conversation, stream)
+
+        def candidate(parts: List[Dict[str, Any]], finish: Optional[str]) -> Dict[str, Any]:
+            result = {"content": {"role": "model", "parts": parts}, "index": 0}
+            if finish:
+                result["finishReason"] = finish
+            return result
+
+        call_parts = [{"functionCall": {"name": c["name"], "args": c["args"]}} for c in reply.tool_calls]
+
+        if not stream:
+            await mock.sleep(reply.ttft + reply.completion_tokens / reply.tokens_per_second)
+            parts = ([{"text": reply.text}] if reply.text else []) + call_parts
+            return {
+                "candidates": [candidate(parts, "STOP")],
+                "usageMetadata": _usage_gemini(conversation, reply),
+                "modelVersion": model
+            }
+
+        async def events():
+            await mock.sleep(reply.ttft)
+            chunks = mock.chunks(reply)
+            for chunk in chunks:
+                data = {"candidates": [candidate([{"text": chunk}], None)], "modelVersion": model}
+                yield f"data: {json.dumps(data)}\n\n"
+                await mock.sleep(len(TOKEN_PATTERN.findall(chunk)) / reply.tokens_per_second)
+            final = {
+                "candidates": [candidate(call_parts or [{"text": ""}], "STOP")],
+                "usageMetadata": _usage_gemini(conversation, reply),
+                "modelVersion": model
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    # ---------------------------------------------------------------- OpenAI
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "mock-model", "object": "model", "owned_by": "mock-llm"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        conversation = from_openai(body)
+        stream = bool(body.get("stream"))
+        reply = mock.reply("openai", conversation, stream)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        tool_calls = [
+            {
+                "id": f"call_{uuid.uuid4().hex[:24]}",
+                "type": "function",
+                "function": {"name": c["name"], "arguments": json.dumps(c["args"])}
+            }
+            for c in reply.tool_calls
+        ]
+        finish_reason = "tool_calls" if tool_calls else "stop"
+
+        if not stream:
+            await mock.sleep(reply.ttft + reply.completion_tokens / reply.tokens_per_second)
+            message = {"role": "assistant", "content": reply.text or None}
+            if tool_calls:
+                message["tool_calls"] = tool_calls
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": conversation.model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                "usage": _usage_openai(conversation, reply)
+            })
+
+        def chunk(delta: Dict[str, Any], finish: Optional[str] = None, usage: bool = False) -> str:
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": conversation.model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]
+            }
+            if usage:
+                data["usage"] = _usage_openai(conversation, reply)
+            return f"data: {json.dumps(data)}\n\n"
+
+        async def events():
+            await mock.sleep(reply.ttft)
+            yield chunk({"role": "assistant", "content": ""})
+            for text in mock.chunks(reply):
+                yield chunk({"content": text})
+                await mock.sleep(len(TOKEN_PATTERN.findall(text)) / reply.tokens_per_second)
+            for index, call in enumerate(tool_calls):
+                yield chunk({"tool_calls": [{"index": index, **call}]})
+            yield chunk({}, finish_reason, usage=True)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--script", default=str(SCRIPTS_DIR / "default.json"))
+    parser.add_argument("--seed", type=int, default=None, help="fix the latency/token-rate samples")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="0 disables all simulated delays")
+    args = parser.parse_args()
+
+    mock = MockLLM(Script.load(args.script), seed=args.seed, time_scale=args.time_scale)
+    print(f"🧪 Mock LLM server on http://{args.host}:{args.port} (script: {args.script})")
+    uvicorn.run(create_app(mock), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
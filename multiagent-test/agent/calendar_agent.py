@@ -11,6 +11,12 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os
+
+# Point Gemini calls at the offline mock server (mock-llm/) when configured
+if os.getenv("MOCK_LLM_URL"):
+    os.environ["GOOGLE_GEMINI_BASE_URL"] = os.environ["MOCK_LLM_URL"]
+    os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "false"
+    os.environ.setdefault("GOOGLE_API_KEY", "mock-key")
 from typing import Dict
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware